@@ -42,15 +42,42 @@ import logging
 # Argument Parser Library
 from argparse import ArgumentParser
 
+# Function Tools Library
+from functools import lru_cache
+
+# Multiprocessing Library
+from multiprocessing import get_context
+
 # Operating System Library
 from os import path as os_path
 
 # System Library
+import sys
 from sys import argv as sys_argv
 from sys import exit as sys_exit
 
+# JSON Library
+from json import dump as json_dump
+from json import dumps as json_dumps
+
 # BinEdit Library
-from bineditlib import BinEdit
+from bineditlib import BATCH_OPERATIONS, BLOCK_SIZE, ENTROPY_BLOCK_SIZE
+from bineditlib import STATS_BLOCK_SIZE, BinEdit, manifest_paths
+
+# BinEdit Metrics Library
+from bineditmetrics import Metrics
+
+# BinEdit Daemon Mode Library
+from bineditserve import DEFAULT_CACHE_SIZE, default_socket_path, serve
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Options of files paths
+PATH_OPTIONS = ("input", "output", "output2", "manifest", "diff", "patch",
+                "report", "stamp", "metrics_output", "profile", "compare")
+
 
 ###############################################################################
 # Logger Setup
@@ -78,7 +105,8 @@ class TEXT():
         "Read and show hexadecimal and ascii of a binary file."
 
     OPT_CLEAR = \
-        "Clear data bytes from a binary file."
+        "Clear data bytes from a binary file (in place, or into --output " \
+        "if provided)."
 
     OPT_GET = \
         "Extract data from a binary file address to a new binary file."
@@ -89,11 +117,134 @@ class TEXT():
     OPT_SPLIT = \
         "Split data from a single binary file into two binary files."
 
+    OPT_MANIFEST = \
+        "Run the steps of a layout manifest file (JSON or TOML, \"-\" for " \
+        "stdin)."
+
+    OPT_DIFF = \
+        "Create a patch file (--output) with the differences between an " \
+        "old and a new binary file."
+
+    OPT_PATCH = \
+        "Apply a patch file to a binary file (--input) into an output " \
+        "binary file (--output, or in place if not provided)."
+
+    OPT_BLOCK_SIZE = \
+        f"Size of the blocks to find in the old binary file (for " \
+        f"\"--diff\" command, default {BLOCK_SIZE}), of the statistics " \
+        f"blocks (for \"--stats\" command, default {STATS_BLOCK_SIZE}) or " \
+        f"of the entropy strip blocks (for \"--entropy\", default " \
+        f"{ENTROPY_BLOCK_SIZE})."
+
+    OPT_CHECKSUM = \
+        "Compute checksums of a binary file address range (comma " \
+        "separated algorithms, i.e. crc32,sha256)."
+
+    OPT_STAMP_ADDRESS = \
+        "Address where to write the first checksum (for \"--checksum\" " \
+        "command)."
+
+    OPT_WORKERS = \
+        "Number of worker threads or processes to use (default: number " \
+        "of CPUs)."
+
+    OPT_FIND = \
+        "Find byte patterns in a binary file: hexadecimal (with \"??\" " \
+        "wildcard bytes, i.e. \"DE AD ?? EF\") or ASCII (i.e. " \
+        "\"ascii:v1.0\")."
+
+    OPT_BATCH = \
+        "Run an operation over many binary files in parallel (--input " \
+        "glob pattern, i.e. \"readbacks/*.bin\"). For \"get\" (and " \
+        "optionally \"show\"), --output is a path template with {name} " \
+        "and {stem} of each input file. " \
+        "For \"checksum\" and \"find\", algorithms and patterns are " \
+        "taken from --checksum and --find."
+
+    OPT_REPORT = \
+        "Path of the JSON report file for \"--batch\" command (default: " \
+        "standard output)."
+
+    OPT_STAMP = \
+        "Generate variants of a base binary file (--input) stamping the " \
+        "field values of each row of a CSV or JSONL file, into output " \
+        "files (--output path template with {index} and fields names, " \
+        "i.e. \"out/fw_{serial}.bin\")."
+
+    OPT_FIELD = \
+        "Field to stamp (for \"--stamp\" command), as name=address:type " \
+        "where type is hex, ascii, u8, u16le, u16be, u32le, u32be, u64le " \
+        "or u64be (i.e. serial=0x0803FF00:u32le)."
+
+    OPT_BLANK_MAP = \
+        "Show the used and erased ranges of a binary file (or of an " \
+        "address range with --address and --size)."
+
+    OPT_ERASE_VALUE = \
+        "Byte value of erased memory (for \"--blank_map\" and " \
+        "\"--check_blank\", default 0xFF)."
+
+    OPT_SECTOR_SIZE = \
+        "Sector size to extend used ranges to its boundaries (for " \
+        "\"--blank_map\" command, default 1)."
+
+    OPT_CHECK_BLANK = \
+        "Fail if the output file target range is not erased (for " \
+        "\"--add\" command)."
+
+    OPT_METRICS = \
+        "Report per operation metrics (elapsed time, phases timings, " \
+        "bytes read and written, syscalls and peak memory) in the given " \
+        "format (default output: standard error)."
+
+    OPT_METRICS_OUTPUT = \
+        "Path of the metrics report file (for \"--metrics\")."
+
+    OPT_PROFILE = \
+        "Capture a cProfile of the operations into a pstats file."
+
+    OPT_TRACE_MEMORY = \
+        "Trace memory allocations with tracemalloc, reporting the peak " \
+        "traced memory and top allocations (for \"--metrics\")."
+
+    OPT_COMPARE = \
+        "Compare two binary files (or an address range of them with " \
+        "--address and --size), showing the lines with differences of " \
+        "both files side by side and the differing ranges."
+
+    OPT_STATS = \
+        "Show byte statistics of a binary file (or of an address range " \
+        "with --address and --size): byte values histogram, and Shannon " \
+        "entropy and fractions of 0x00 and 0xFF bytes of the range and " \
+        "of each block (see --block_size)."
+
+    OPT_ENTROPY = \
+        "Show a compact entropy strip along the lines (for \"--show\" " \
+        "command), with a character per block from \" \" (0 bits/byte) " \
+        "to \"@\" (8 bits/byte)."
+
+    OPT_SERVE = \
+        "Run as a daemon that serves binedit commands on a Unix socket, " \
+        "keeping recently used images in memory (use bineditclient.py " \
+        "to run commands on it)."
+
+    OPT_SOCKET = \
+        "Unix socket path of the daemon (for \"--serve\", default: " \
+        "BINEDIT_SOCKET environment variable or " \
+        "$XDG_RUNTIME_DIR/binedit-<uid>.sock)."
+
+    OPT_CACHE_SIZE = \
+        f"Maximum size in bytes of the daemon images cache (for " \
+        f"\"--serve\", default: {DEFAULT_CACHE_SIZE})."
+
     OPT_INPUT = \
-        "Input binary file to use."
+        "Input binary file to use (\"-\" for stdin, for \"--show\", " \
+        "\"--get\", \"--clear\", \"--split\", \"--add\", \"--checksum\" " \
+        "and \"--stats\" commands)."
 
     OPT_OUTPUT = \
-        "Output binary file to use."
+        "Output binary file to use (\"-\" for stdout, for \"--get\", " \
+        "\"--clear\" and \"--split\" commands)."
 
     OPT_OUTPUT2 = \
         "Second Output binary file to use (i.e. for \"--split\" command)"
@@ -110,17 +261,33 @@ class TEXT():
     OPT_SIZE = \
         "Specify size of bytes to manipulate."
 
+    OPT_FILL = \
+        "Byte value used to fill a created binary file (default 0xFF)."
+
 
 ###############################################################################
 # Auxiliary Function
 ###############################################################################
 
+def abs_path(cwd, x):
+    if x == "-":
+        return x
+    return os_path.join(cwd, x)
+
+
 def auto_int(x):
     return int(x, 0)
 
 
-def parse_options():
-    '''Get and parse program input arguments.'''
+def parse_field(x):
+    name, _, address_type = x.partition("=")
+    address, _, field_type = address_type.partition(":")
+    return (name, int(address, 0), field_type or "hex")
+
+
+@lru_cache(maxsize=None)
+def get_parser():
+    '''Get the program input arguments parser (created once).'''
     parser = ArgumentParser()
     parser.version = VERSION
     parser.add_argument("-v", "--version", action="version")
@@ -130,6 +297,57 @@ def parse_options():
     parser.add_argument("--get", help=TEXT.OPT_GET, action="store_true")
     parser.add_argument("--add", help=TEXT.OPT_ADD, action="store_true")
     parser.add_argument("--split", help=TEXT.OPT_SPLIT, action="store_true")
+    parser.add_argument("--manifest", help=TEXT.OPT_MANIFEST,
+                        action="store", type=str)
+    parser.add_argument("--diff", help=TEXT.OPT_DIFF, action="store",
+                        nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--patch", help=TEXT.OPT_PATCH,
+                        action="store", type=str)
+    parser.add_argument("--block_size", help=TEXT.OPT_BLOCK_SIZE,
+                        action="store", type=auto_int, default=None)
+    parser.add_argument("--checksum", help=TEXT.OPT_CHECKSUM,
+                        action="store", type=str)
+    parser.add_argument("--stamp_address", help=TEXT.OPT_STAMP_ADDRESS,
+                        action="store", type=auto_int, default=None)
+    parser.add_argument("--workers", help=TEXT.OPT_WORKERS,
+                        action="store", type=auto_int, default=0)
+    parser.add_argument("--find", help=TEXT.OPT_FIND, action="store",
+                        nargs="+", metavar="PATTERN")
+    parser.add_argument("--batch", help=TEXT.OPT_BATCH, action="store",
+                        choices=BATCH_OPERATIONS)
+    parser.add_argument("--report", help=TEXT.OPT_REPORT,
+                        action="store", type=str)
+    parser.add_argument("--stamp", help=TEXT.OPT_STAMP,
+                        action="store", type=str)
+    parser.add_argument("--field", help=TEXT.OPT_FIELD,
+                        action="append", type=parse_field, default=[])
+    parser.add_argument("--blank_map", help=TEXT.OPT_BLANK_MAP,
+                        action="store_true")
+    parser.add_argument("--erase_value", help=TEXT.OPT_ERASE_VALUE,
+                        action="store", type=auto_int, default=0xFF)
+    parser.add_argument("--sector_size", help=TEXT.OPT_SECTOR_SIZE,
+                        action="store", type=auto_int, default=1)
+    parser.add_argument("--check_blank", help=TEXT.OPT_CHECK_BLANK,
+                        action="store_true")
+    parser.add_argument("--metrics", help=TEXT.OPT_METRICS,
+                        action="store", choices=["json"])
+    parser.add_argument("--metrics_output", help=TEXT.OPT_METRICS_OUTPUT,
+                        action="store", type=str)
+    parser.add_argument("--profile", help=TEXT.OPT_PROFILE,
+                        action="store", type=str)
+    parser.add_argument("--trace_memory", help=TEXT.OPT_TRACE_MEMORY,
+                        action="store_true")
+    parser.add_argument("--compare", help=TEXT.OPT_COMPARE, action="store",
+                        nargs=2, metavar=("A", "B"))
+    parser.add_argument("--stats", help=TEXT.OPT_STATS, action="store_true")
+    parser.add_argument("--entropy", help=TEXT.OPT_ENTROPY,
+                        action="store_true")
+    parser.add_argument("--serve", help=TEXT.OPT_SERVE, action="store_true")
+    parser.add_argument("--socket", help=TEXT.OPT_SOCKET, action="store",
+                        type=str)
+    parser.add_argument("--cache_size", help=TEXT.OPT_CACHE_SIZE,
+                        action="store", type=auto_int,
+                        default=DEFAULT_CACHE_SIZE)
     parser.add_argument("--input", help=TEXT.OPT_INPUT,
                         action="store", type=str)
     parser.add_argument("--output", help=TEXT.OPT_OUTPUT,
@@ -144,7 +362,18 @@ def parse_options():
                         action="store", type=auto_int, default=0)
     parser.add_argument("-s", "--size", help=TEXT.OPT_SIZE,
                         action="store", type=auto_int, default=0)
-    args = parser.parse_args()
+    parser.add_argument("--fill", help=TEXT.OPT_FILL,
+                        action="store", type=auto_int, default=0xFF)
+    return parser
+
+
+def parse_options(argv=None, cwd=None):
+    '''
+    Get and parse program input arguments. If a working directory is
+    provided, relative files paths are converted to absolute ones.
+    '''
+    parser = get_parser()
+    args = parser.parse_args(argv)
     # Check required options combinations
     if (args.create) and \
     ((args.input is None) or (args.size is None)):
@@ -164,42 +393,207 @@ def parse_options():
     if (args.split) and \
     ((args.input is None) or (args.output is None) or (args.output2 is None)):
         parser.error("Arguments Required: --input, --output, --output2")
+    if (args.diff) and (args.output is None):
+        parser.error("Arguments Required: --output")
+    if (args.patch) and (args.input is None):
+        parser.error("Arguments Required: --input")
+    if (args.checksum) and (args.input is None):
+        parser.error("Arguments Required: --input")
+    if (args.find) and (args.input is None):
+        parser.error("Arguments Required: --input")
+    if (args.batch) and (args.input is None):
+        parser.error("Arguments Required: --input")
+    if (args.blank_map) and (args.input is None):
+        parser.error("Arguments Required: --input")
+    if (args.stats) and (args.input is None):
+        parser.error("Arguments Required: --input")
+    if (args.stamp) and \
+    ((args.input is None) or (args.output is None) or (not args.field)):
+        parser.error("Arguments Required: --input, --output, --field")
     # Data conversions
     if args.address and args.base_address:
         args.address = args.address - args.base_address
     if args.output_address and args.base_address:
         args.output_address = args.output_address - args.base_address
+    if args.base_address:
+        args.field = [(name, address - args.base_address, field_type)
+                      for name, address, field_type in args.field]
+    if (args.stamp_address is not None) and args.base_address:
+        args.stamp_address = args.stamp_address - args.base_address
+    if cwd is not None:
+        for option in PATH_OPTIONS:
+            value = getattr(args, option)
+            if isinstance(value, list):
+                setattr(args, option, [abs_path(cwd, x) for x in value])
+            elif value is not None:
+                setattr(args, option, abs_path(cwd, value))
     return args
 
 
+def args_paths(args):
+    '''Get the files paths of the parsed arguments.'''
+    paths = []
+    for option in PATH_OPTIONS:
+        value = getattr(args, option)
+        if isinstance(value, list):
+            paths.extend(value)
+        elif value is not None:
+            paths.append(value)
+    return [x for x in paths if x != "-"]
+
+
+def read_only_command(args):
+    '''Check if the command of the parsed arguments doesn't write files.'''
+    if args.checksum:
+        return args.stamp_address is None
+    if args.batch:
+        return args.batch != "get"
+    return args.show or args.find or args.blank_map or args.compare or \
+        args.stats
+
+
 ###############################################################################
 # Main Function
 ###############################################################################
 
-def main(argc, argv):
+def main(argc, argv, session=None):
+    '''
+    Main Function. Commands run by the daemon (see bineditserve) get a
+    session with the client working directory, the images cache and
+    the files locks.
+    '''
     binedit = BinEdit()
-    args = parse_options()
-    if args.create:
+    args = parse_options(argv, session and session.cwd)
+    if args.serve:
+        return serve(args.socket or default_socket_path(), args.cache_size,
+                     main)
+    metrics = None
+    if args.metrics or args.profile or args.trace_memory:
+        metrics = Metrics(args.profile is not None, args.trace_memory)
+        binedit.instrument(metrics)
+    if session is None:
+        return_code = run_command(binedit, args)
+    else:
+        binedit.image_cache = session.image_cache
+        binedit.process_context = get_context("spawn")
+        paths = args_paths(args)
+        # Load the manifest to resolve and lock its files too
+        manifest = None
+        if args.manifest:
+            manifest = binedit.load_manifest(args.manifest, session.cwd)
+            if manifest is None:
+                return 1
+            paths.extend(manifest_paths(manifest))
+        with session.file_locks.hold(paths):
+            return_code = run_command(binedit, args, manifest)
+            if not read_only_command(args):
+                for file_path in paths:
+                    session.image_cache.invalidate(file_path)
+    if metrics is not None:
+        if args.profile:
+            metrics.save_profile(args.profile)
+        if args.metrics_output:
+            with open(args.metrics_output, "w") as metrics_file_writer:
+                json_dump(metrics.report(), metrics_file_writer, indent=4)
+        elif args.metrics or args.trace_memory:
+            print(json_dumps(metrics.report(), indent=4), file=sys.stderr)
+    return return_code
+
+
+def run_command(binedit, args, manifest=None):
+    if args.batch:
+        logger.debug("Running batch operation...")
+        options = {"address": args.address, "size": args.size,
+                   "base_address": args.base_address,
+                   "output": args.output or "",
+                   "algorithms": (args.checksum or "crc32").split(","),
+                   "patterns": args.find or []}
+        report = binedit.batch([args.input], args.batch, options,
+                               args.workers)
+        if report is None:
+            return 1
+        if args.report:
+            with open(args.report, "w") as report_file_writer:
+                json_dump(report, report_file_writer, indent=4)
+        else:
+            print(json_dumps(report, indent=4))
+        logger.info(f"Batch {args.batch}: {report['files']} files, "
+                    f"{report['failed']} failed")
+    elif args.create:
         logger.debug("Creating binary file...")
-        binedit.create_file(args.input, args.size)
+        binedit.create_file(args.input, args.size, args.fill)
     elif args.show:
         logger.debug("Showing binary file...")
+        entropy_block = 0
+        if args.entropy:
+            entropy_block = args.block_size or ENTROPY_BLOCK_SIZE
         binedit.show_file(args.input, args.address, args.size,
-                          args.base_address)
+                          args.base_address, entropy_block)
     elif args.clear:
         logger.debug("Clearing data from binary file...")
-        binedit.clear_data(args.input, args.address, args.size)
+        binedit.clear_data(args.input, args.address, args.size,
+                           args.output or "")
     elif args.get:
         logger.debug("Getting data from binary file...")
-        binedit.extract_data(args.input, args.address, args.size, args.output)
+        binedit.extract_data(args.input, args.address, args.size, args.output,
+                             args.base_address)
     elif args.add:
         logger.debug("Adding data from source file into target file")
         binedit.join_files(args.input, args.address, args.size, args.output,
-                           args.output_address)
+                           args.output_address, args.base_address,
+                           args.check_blank, args.erase_value)
     elif args.split:
         logger.debug("Splitting data from file...")
         binedit.split_files(args.input, args.address, args.output,
                             args.output2)
+    elif args.diff:
+        logger.debug("Creating patch file...")
+        binedit.diff_files(args.diff[0], args.diff[1], args.output,
+                           args.block_size or BLOCK_SIZE)
+    elif args.patch:
+        logger.debug("Applying patch file...")
+        binedit.patch_file(args.input, args.patch, args.output or "")
+    elif args.checksum:
+        logger.debug("Computing checksums of binary file...")
+        algorithms = args.checksum.split(",")
+        digests = binedit.checksum(args.input, args.address, args.size,
+                                   algorithms, args.stamp_address,
+                                   workers=args.workers)
+        if digests is not None:
+            for algorithm in algorithms:
+                print(f"{algorithm}: {digests[algorithm].hex().upper()}")
+    elif args.find:
+        logger.debug("Searching patterns in binary file...")
+        binedit.find_file(args.input, args.find, args.address, args.size,
+                          args.base_address, args.workers)
+    elif args.blank_map:
+        logger.debug("Getting blank map of binary file...")
+        binedit.blank_map_file(args.input, args.address, args.size,
+                               args.erase_value, args.sector_size,
+                               args.base_address)
+    elif args.stats:
+        logger.debug("Getting byte statistics of binary file...")
+        binedit.stats_file(args.input, args.address, args.size,
+                           args.block_size or STATS_BLOCK_SIZE,
+                           args.base_address)
+    elif args.compare:
+        logger.debug("Comparing binary files...")
+        if not binedit.compare_files(args.compare[0], args.compare[1],
+                                     args.address, args.size,
+                                     args.base_address):
+            return 1
+    elif args.stamp:
+        logger.debug("Stamping variants of binary file...")
+        fields = {name: (address, field_type)
+                  for name, address, field_type in args.field}
+        report = binedit.stamp_variants(args.input, args.stamp, args.output,
+                                        fields, args.workers)
+        if report is not None:
+            logger.info(f"Stamp: {report['files']} files, "
+                        f"{report['failed']} failed")
+    elif args.manifest:
+        logger.debug("Running layout manifest...")
+        binedit.run_manifest(args.manifest, manifest)
     return 0
 
 
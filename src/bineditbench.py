@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditbench.py
+Description:
+    Benchmark suite for binedit library.
+    It supports the next features:
+      - Generate synthetic binary images of different sizes (i.e. from
+        64KB to several GB) with data and erased (0xFF) regions.
+      - Time each BinEdit operation (create, show, hexdump, clear,
+        extract, join and split), getting its throughput (MB/s) and
+        peak memory usage (RSS), running each one in a new process.
+      - Save results to a JSON file.
+      - Compare two results files to flag performance regressions.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Argument Parser Library
+from argparse import ArgumentParser
+
+# Context Utilities Library
+from contextlib import redirect_stdout
+
+# Date and Time Library
+from datetime import datetime
+
+# Multiprocessing Library
+from multiprocessing import get_context
+
+# Operating System Library
+from os import devnull
+from os import path as os_path
+from os import urandom
+
+# Platform Information Library
+from platform import machine, python_version
+
+# Resource Usage Library
+from resource import RUSAGE_SELF, getrusage
+
+# System Library
+from sys import argv as sys_argv
+from sys import exit as sys_exit
+from sys import stdout as sys_stdout
+
+# Temporary Files Library
+from tempfile import TemporaryDirectory
+
+# Time Library
+from time import perf_counter
+
+# JSON Library
+from json import dump as json_dump
+from json import load as json_load
+
+# BinEdit Library
+from bineditlib import CHUNK_SIZE, BinEdit
+from bineditlib import VERSION as LIB_VERSION
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Operations to benchmark (in run order, "clear" modifies the image)
+OPERATIONS = ("create", "show", "hexdump", "extract", "join", "split",
+              "clear")
+
+# Default images sizes to benchmark
+DEFAULT_SIZES = "64K,1M,16M,256M"
+
+# Maximum number of bytes to convert by hexdump (it builds all the lines
+# in memory)
+HEXDUMP_MAX_SIZE = 64 * 1024 * 1024
+
+# Size units multipliers
+SIZE_UNITS = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logging.basicConfig(
+    format="%(message)s",
+    level=logging.INFO
+)
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Texts
+###############################################################################
+
+class TEXT():
+
+    OPT_SIZES = \
+        f"Comma separated images sizes to benchmark, with K, M or G " \
+        f"suffix (default: {DEFAULT_SIZES})."
+
+    OPT_OPERATIONS = \
+        f"Comma separated operations to benchmark (default: " \
+        f"{','.join(OPERATIONS)})."
+
+    OPT_REPEAT = \
+        "Number of runs of each operation, the best one is used " \
+        "(default: 3)."
+
+    OPT_OUTPUT = \
+        "Path of the JSON results file (default: standard output)."
+
+    OPT_WORKDIR = \
+        "Directory for the synthetic images (default: a temporary " \
+        "directory)."
+
+    OPT_COMPARE = \
+        "Compare two JSON results files (base and new), flagging the " \
+        "regressions of the new one."
+
+    OPT_THRESHOLD = \
+        "Percentage of throughput decrease or peak memory increase " \
+        "flagged as regression (default: 10)."
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def parse_size(x):
+    '''Get a number of bytes from a size text (i.e. "64K", "2G").'''
+    x = x.strip().upper()
+    if x[-1:] in SIZE_UNITS:
+        return int(x[:-1], 0) * SIZE_UNITS[x[-1]]
+    return int(x, 0)
+
+
+def create_image(file_path: str, num_bytes: int):
+    '''
+    Create a synthetic binary image, with blocks of random data and
+    erased (0xFF) blocks.
+    '''
+    data_block = urandom(CHUNK_SIZE)
+    erased_block = b"\xFF" * CHUNK_SIZE
+    with open(file_path, "wb") as bin_file_writer:
+        for offset in range(0, num_bytes, CHUNK_SIZE):
+            block = data_block if (offset // CHUNK_SIZE) % 4 else erased_block
+            bin_file_writer.write(block[:min(CHUNK_SIZE, num_bytes - offset)])
+
+
+###############################################################################
+# Benchmark Functions
+###############################################################################
+
+def run_operation(operation: str, workdir: str, num_bytes: int):
+    '''
+    Run and time a BinEdit operation over the images of a working
+    directory (used as a new process task, so its peak memory usage
+    belongs to the operation).
+    Returns the seconds, bytes processed and peak RSS in KB.
+    '''
+    binedit = BinEdit()
+    image = os_path.join(workdir, "image.bin")
+    output = os_path.join(workdir, "output.bin")
+    output2 = os_path.join(workdir, "output2.bin")
+    address = num_bytes // 4
+    processed = num_bytes
+    success = True
+    if operation == "hexdump":
+        processed = min(num_bytes, HEXDUMP_MAX_SIZE)
+        with open(image, "rb") as bin_file_reader:
+            data = bin_file_reader.read(processed)
+    start_time = perf_counter()
+    if operation == "create":
+        success = binedit.create_file(output, num_bytes)
+    elif operation == "show":
+        with open(devnull, "w") as null_writer, redirect_stdout(null_writer):
+            success = binedit.show_file(image, 0, 0, 0)
+    elif operation == "hexdump":
+        binedit.hexdump(data)
+    elif operation == "extract":
+        processed = num_bytes // 2
+        success = binedit.extract_data(image, address, processed, output)
+    elif operation == "join":
+        processed = num_bytes // 2
+        success = binedit.join_files(image, address, processed, output2,
+                                     address)
+    elif operation == "split":
+        success = binedit.split_files(image, num_bytes // 2, output, output2)
+    elif operation == "clear":
+        processed = num_bytes // 2
+        success = binedit.clear_data(image, address, processed)
+    seconds = perf_counter() - start_time
+    if not success:
+        raise RuntimeError(f"Fail to run operation {operation}")
+    return (seconds, processed, getrusage(RUSAGE_SELF).ru_maxrss)
+
+
+def run_benchmark(sizes: list, operations: list, repeat: int,
+                  workdir: str = None):
+    '''
+    Run the benchmark of some operations over synthetic images of some
+    sizes. Each operation run is done in a new process.
+    Returns the results dictionary.
+    '''
+    results = {
+        "version": LIB_VERSION,
+        "python": python_version(),
+        "machine": machine(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "results": []
+    }
+    with TemporaryDirectory(dir=workdir) as tmp_dir, \
+         get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for num_bytes in sizes:
+            logger.info(f"Creating image of {num_bytes} bytes...")
+            create_image(os_path.join(tmp_dir, "image.bin"), num_bytes)
+            create_image(os_path.join(tmp_dir, "output2.bin"), num_bytes)
+            for operation in operations:
+                runs = [pool.apply(run_operation,
+                                   (operation, tmp_dir, num_bytes))
+                        for _ in range(repeat)]
+                seconds, processed, _ = min(runs)
+                peak_rss = max([run[2] for run in runs])
+                mb_per_s = processed / (1024 * 1024) / max(seconds, 1e-9)
+                results["results"].append({
+                    "operation": operation,
+                    "size": num_bytes,
+                    "seconds": round(seconds, 6),
+                    "mb_per_s": round(mb_per_s, 2),
+                    "peak_rss_kb": peak_rss
+                })
+                logger.info(f"{operation:<8} {num_bytes:>12} bytes: "
+                            f"{seconds:10.6f} s {mb_per_s:10.2f} MB/s "
+                            f"{peak_rss:>10} KB")
+    return results
+
+
+def compare_results(base: dict, new: dict, threshold: float):
+    '''
+    Compare two benchmark results, showing the throughput and peak
+    memory changes of each operation and size.
+    Returns the number of regressions (throughput decrease or peak
+    memory increase larger than the threshold percentage).
+    '''
+    base_results = {(result["operation"], result["size"]): result
+                    for result in base["results"]}
+    regressions = 0
+    for result in new["results"]:
+        key = (result["operation"], result["size"])
+        if key not in base_results:
+            continue
+        base_result = base_results[key]
+        speed_change = (result["mb_per_s"] / max(base_result["mb_per_s"],
+                        1e-9) - 1) * 100
+        rss_change = (result["peak_rss_kb"] / max(base_result["peak_rss_kb"],
+                      1) - 1) * 100
+        flag = ""
+        if (speed_change < -threshold) or (rss_change > threshold):
+            flag = "REGRESSION"
+            regressions = regressions + 1
+        print(f"{result['operation']:<8} {result['size']:>12} bytes: "
+              f"{base_result['mb_per_s']:10.2f} -> {result['mb_per_s']:10.2f}"
+              f" MB/s ({speed_change:+7.1f}%) "
+              f"{base_result['peak_rss_kb']:>10} -> "
+              f"{result['peak_rss_kb']:>10} KB ({rss_change:+7.1f}%) {flag}")
+    return regressions
+
+
+###############################################################################
+# Main Function
+###############################################################################
+
+def parse_options():
+    '''Get and parse program input arguments.'''
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", help=TEXT.OPT_SIZES, action="store",
+                        type=str, default=DEFAULT_SIZES)
+    parser.add_argument("--operations", help=TEXT.OPT_OPERATIONS,
+                        action="store", type=str, default=",".join(OPERATIONS))
+    parser.add_argument("--repeat", help=TEXT.OPT_REPEAT, action="store",
+                        type=int, default=3)
+    parser.add_argument("--output", help=TEXT.OPT_OUTPUT, action="store",
+                        type=str)
+    parser.add_argument("--workdir", help=TEXT.OPT_WORKDIR, action="store",
+                        type=str)
+    parser.add_argument("--compare", help=TEXT.OPT_COMPARE, action="store",
+                        nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", help=TEXT.OPT_THRESHOLD,
+                        action="store", type=float, default=10.0)
+    args = parser.parse_args()
+    operations = args.operations.split(",")
+    for operation in operations:
+        if operation not in OPERATIONS:
+            parser.error(f"Invalid operation: {operation}")
+    args.operations = [operation for operation in OPERATIONS
+                       if operation in operations]
+    args.sizes = [parse_size(size) for size in args.sizes.split(",")]
+    return args
+
+
+def main(argc, argv):
+    '''Main Function.'''
+    args = parse_options()
+    if args.compare:
+        with open(args.compare[0], "r") as base_file_reader, \
+             open(args.compare[1], "r") as new_file_reader:
+            regressions = compare_results(json_load(base_file_reader),
+                                          json_load(new_file_reader),
+                                          args.threshold)
+        logger.info(f"Regressions: {regressions}")
+        return 1 if regressions else 0
+    results = run_benchmark(args.sizes, args.operations, args.repeat,
+                            args.workdir)
+    if args.output:
+        with open(args.output, "w") as results_file_writer:
+            json_dump(results, results_file_writer, indent=4)
+    else:
+        json_dump(results, sys_stdout, indent=4)
+        print()
+    return 0
+
+
+###############################################################################
+# Runnable Main Script Detection
+###############################################################################
+
+if __name__ == '__main__':
+    return_code = main(len(sys_argv) - 1, sys_argv[1:])
+    sys_exit(return_code)
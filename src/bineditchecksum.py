@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditchecksum.py
+Description:
+    Checksum algorithms for binedit library.
+    It supports the next features:
+      - CRC32 and Adler-32 (zlib), with CRC32 combination of chunks
+        computed in parallel.
+      - Table-driven CRC catalog algorithms (i.e. CRC-16/CCITT-FALSE,
+        CRC-16/MODBUS, CRC-32/MPEG-2).
+      - Any hash algorithm supported by hashlib (i.e. SHA-256).
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Hash Library
+import hashlib
+
+# Data Compression Library (CRC32 and Adler-32 checksums)
+from zlib import adler32, crc32
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# CRC catalog algorithms parameters:
+# (width, polynomial, init, reflect input, reflect output, xor output)
+CRC_ALGORITHMS = {
+    "crc16-ccitt": (16, 0x1021, 0xFFFF, False, False, 0x0000),
+    "crc16-modbus": (16, 0x8005, 0xFFFF, True, True, 0x0000),
+    "crc32-mpeg2": (32, 0x04C11DB7, 0xFFFFFFFF, False, False, 0x00000000),
+}
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def _reflect(value: int, width: int):
+    '''Reverse the bits order of a value.'''
+    return int(f"{value:0{width}b}"[::-1], 2)
+
+
+def _gf2_matrix_times(matrix: list, vector: int):
+    '''Multiply a GF(2) 32x32 matrix by a vector.'''
+    result = 0
+    i = 0
+    while vector:
+        if vector & 1:
+            result = result ^ matrix[i]
+        vector = vector >> 1
+        i = i + 1
+    return result
+
+
+def _gf2_matrix_square(matrix: list):
+    '''Square a GF(2) 32x32 matrix.'''
+    return [_gf2_matrix_times(matrix, matrix[n]) for n in range(32)]
+
+
+def crc32_combine(crc_1: int, crc_2: int, len_2: int):
+    '''
+    Get the CRC32 of two concatenated data blocks from the CRC32 of each
+    one and the length of the second one (port of zlib crc32_combine()).
+    '''
+    if len_2 == 0:
+        return crc_1
+    # Operator for one zero bit in odd, then two and four zero bits
+    odd = [0xEDB88320] + [1 << n for n in range(31)]
+    even = _gf2_matrix_square(odd)
+    odd = _gf2_matrix_square(even)
+    # Apply len_2 zeros to crc_1
+    while True:
+        even = _gf2_matrix_square(odd)
+        if len_2 & 1:
+            crc_1 = _gf2_matrix_times(even, crc_1)
+        len_2 = len_2 >> 1
+        if len_2 == 0:
+            break
+        odd = _gf2_matrix_square(even)
+        if len_2 & 1:
+            crc_1 = _gf2_matrix_times(odd, crc_1)
+        len_2 = len_2 >> 1
+        if len_2 == 0:
+            break
+    return crc_1 ^ crc_2
+
+
+def checksum_algorithms():
+    '''Get the names of all the supported checksum algorithms.'''
+    return sorted(["crc32", "adler32"] + list(CRC_ALGORITHMS)
+                  + list(hashlib.algorithms_available))
+
+
+def new_checksum(algorithm: str):
+    '''
+    Get a new checksum object of an algorithm (with hashlib interface:
+    update() and digest() methods). Raises ValueError if the algorithm
+    is not supported.
+    '''
+    algorithm = algorithm.lower()
+    if algorithm == "crc32":
+        return ZlibChecksum(crc32, 0)
+    if algorithm == "adler32":
+        return ZlibChecksum(adler32, 1)
+    if algorithm in CRC_ALGORITHMS:
+        return Crc(*CRC_ALGORITHMS[algorithm])
+    try:
+        return hashlib.new(algorithm)
+    except ValueError:
+        raise ValueError(f"Unsupported checksum algorithm: {algorithm}") \
+            from None
+
+
+###############################################################################
+# Checksum Classes
+###############################################################################
+
+class ZlibChecksum():
+    '''zlib CRC32 or Adler-32 checksum, with hashlib interface.'''
+
+    digest_size = 4
+
+    def __init__(self, function, value: int):
+        '''ZlibChecksum Constructor.'''
+        self.function = function
+        self.value = value
+
+
+    def update(self, data: bytes):
+        '''Add data to the checksum.'''
+        self.value = self.function(data, self.value)
+
+
+    def digest(self):
+        '''Get the checksum value bytes (big endian).'''
+        return self.value.to_bytes(self.digest_size, "big")
+
+
+class Crc():
+    '''Table-driven CRC catalog algorithm, with hashlib interface.'''
+
+    def __init__(self, width: int, poly: int, init: int, refin: bool,
+                 refout: bool, xorout: int):
+        '''Crc Constructor.'''
+        self.width = width
+        self.mask = (1 << width) - 1
+        self.refin = refin
+        self.refout = refout
+        self.xorout = xorout
+        self.digest_size = width // 8
+        self.table = Crc._table(width, poly, refin)
+        self.value = _reflect(init, width) if refin else init
+
+
+    @staticmethod
+    def _table(width: int, poly: int, refin: bool):
+        '''Build the CRC lookup table of a byte.'''
+        table = []
+        mask = (1 << width) - 1
+        if refin:
+            poly = _reflect(poly, width)
+        for byte in range(256):
+            if refin:
+                crc = byte
+                for _ in range(8):
+                    crc = (crc >> 1) ^ poly if crc & 1 else crc >> 1
+            else:
+                crc = byte << (width - 8)
+                for _ in range(8):
+                    if crc & (1 << (width - 1)):
+                        crc = ((crc << 1) ^ poly) & mask
+                    else:
+                        crc = (crc << 1) & mask
+            table.append(crc)
+        return table
+
+
+    def update(self, data: bytes):
+        '''Add data to the checksum.'''
+        crc = self.value
+        table = self.table
+        if self.refin:
+            for byte in bytes(data):
+                crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+        else:
+            shift = self.width - 8
+            mask = self.mask
+            for byte in bytes(data):
+                crc = table[((crc >> shift) ^ byte) & 0xFF] \
+                      ^ ((crc << 8) & mask)
+        self.value = crc
+
+
+    def digest(self):
+        '''Get the checksum value bytes (big endian).'''
+        crc = self.value
+        if self.refin != self.refout:
+            crc = _reflect(crc, self.width)
+        crc = crc ^ self.xorout
+        return crc.to_bytes(self.digest_size, "big")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditclient.py
+Description:
+    Thin client of binedit daemon mode (see "binedit --serve").
+    It forwards the binedit command line arguments to the server, and
+    shows the command output. If the server is not running (or the
+    command uses the standard input), the command is run by binedit.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# JSON Library
+from json import dumps as json_dumps
+from json import loads as json_loads
+
+# Operating System Library
+from os import execv, getcwd
+from os import path as os_path
+
+# Network Socket Library
+from socket import AF_UNIX, SOCK_STREAM, socket
+
+# System Library
+import sys
+
+# BinEdit Daemon Mode Library
+from bineditserve import default_socket_path, socket_owned
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# binedit script path, to run commands without server
+BINEDIT_PATH = os_path.join(os_path.dirname(os_path.realpath(__file__)),
+                            "binedit.py")
+
+
+###############################################################################
+# Client Functions
+###############################################################################
+
+def request(argv: list):
+    '''
+    Run a command in the server. Returns the response dictionary, or
+    None if the server is not running (or its socket is not owned by
+    the user).
+    '''
+    socket_path = default_socket_path()
+    if not os_path.exists(socket_path):
+        return None
+    if not socket_owned(socket_path):
+        sys.stderr.write(f"Ignoring server socket {socket_path} not owned "
+                         f"by the user\n")
+        return None
+    try:
+        client = socket(AF_UNIX, SOCK_STREAM)
+        client.connect(socket_path)
+    except OSError:
+        return None
+    with client, client.makefile("rwb") as stream:
+        stream.write(json_dumps({"argv": argv, "cwd": getcwd()}).encode()
+                     + b"\n")
+        stream.flush()
+        return json_loads(stream.readline())
+
+
+###############################################################################
+# Main Function
+###############################################################################
+
+def main(argc, argv):
+    '''Main Function.'''
+    response = None
+    if "-" not in argv:
+        response = request(argv)
+    if response is None:
+        execv(sys.executable, [sys.executable, BINEDIT_PATH] + argv)
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["code"]
+
+
+###############################################################################
+# Runnable Main Script Detection
+###############################################################################
+
+if __name__ == '__main__':
+    return_code = main(len(sys.argv) - 1, sys.argv[1:])
+    sys.exit(return_code)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditcompress.py
+Description:
+    Compressed files streaming for binedit library.
+    It supports the next features:
+      - Detect gzip, xz and bzip2 input files by their headers, and
+        output files by their extension (.gz, .xz, .bz2).
+      - Stream readers and writers that decompress or compress the data
+        in a background thread, so (de)compression of multiple files and
+        the data processing run concurrently.
+      - Sequential streams (i.e. standard input or named pipes) readers,
+        detecting compressed streams by their first bytes.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Compression Libraries
+import bz2
+import gzip
+import lzma
+
+# In-memory Streams Library
+from io import UnsupportedOperation
+
+# Operating System Library
+from os import path as os_path
+
+# Queues Library
+from queue import Empty, Full, Queue
+
+# Regular Expressions Library
+from re import compile as re_compile
+
+# Threading Library
+from threading import Event, Thread
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Size of data chunks read from a stream
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Maximum number of data chunks queued between a stream and its thread
+STREAM_QUEUE_SIZE = 4
+
+# Compression formats headers: magic bytes and the next header fields,
+# validated to not detect raw data that starts with the magic bytes
+# (gzip: deflate method and no reserved flags, xz: stream flags, bzip2:
+# block size digit and block or end of stream magic)
+COMPRESSION_HEADERS = {
+    "gz": re_compile(b"\x1F\x8B\x08[\x00-\x1F]"),
+    "xz": re_compile(b"\xFD7zXZ\x00\x00[\x00-\x0F]"),
+    "bz2": re_compile(b"BZh[1-9](\x31\x41\x59\x26\x53\x59"
+                      b"|\x17\x72\x45\x38\x50\x90)"),
+}
+
+# Compression formats extensions
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gz",
+    ".xz": "xz",
+    ".bz2": "bz2",
+}
+
+# Number of bytes to detect a compression format (bzip2 header)
+MAGIC_SIZE = 10
+
+# Compression formats open functions
+COMPRESSION_OPEN = {
+    "gz": gzip.open,
+    "xz": lzma.open,
+    "bz2": bz2.open,
+}
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def compression_format(file_path: str):
+    '''
+    Get the compression format of an existing file from its header
+    ("gz", "xz" or "bz2"), or None if it is not compressed (or it isn't
+    a regular file).
+    '''
+    if not os_path.isfile(file_path):
+        return None
+    with open(file_path, "rb") as file_reader:
+        return _magic_compression(file_reader.read(MAGIC_SIZE))
+
+
+def _magic_compression(magic: bytes):
+    '''Get the compression format of the first bytes of a file, or None.'''
+    for compression, header_regex in COMPRESSION_HEADERS.items():
+        if header_regex.match(magic):
+            return compression
+    return None
+
+
+def output_compression(file_path: str):
+    '''
+    Get the compression format of an output file from its extension, or
+    None if it is not compressed.
+    '''
+    return COMPRESSION_EXTENSIONS.get(os_path.splitext(file_path)[1].lower())
+
+
+def open_reader(file_path: str, compression: str):
+    '''Open a compressed file as a decompressed data stream reader.'''
+    return StreamReader(COMPRESSION_OPEN[compression](file_path, "rb"))
+
+
+def open_stream(file_reader):
+    '''
+    Open a sequential binary stream (i.e. standard input or a named
+    pipe) as a data stream reader, where compressed streams (detected by
+    their first bytes, peeked without consuming them) are decompressed.
+    '''
+    compression = _magic_compression(file_reader.peek(MAGIC_SIZE))
+    if compression is None:
+        return StreamReader(file_reader)
+    return StreamReader(COMPRESSION_OPEN[compression](file_reader, "rb"),
+                        file_reader)
+
+
+def open_writer(file_path: str, compression: str):
+    '''Open a compressed file as a data stream writer that compress it.'''
+    return StreamWriter(COMPRESSION_OPEN[compression](file_path, "wb"))
+
+
+###############################################################################
+# Stream Reader Class
+###############################################################################
+
+class StreamReader():
+    '''
+    Binary file reader of a stream, where the data is read (i.e. and
+    decompressed) by chunks in a background thread. Only sequential
+    reads are supported (skip() moves forward).
+    '''
+
+    def __init__(self, file_reader, source_reader=None):
+        '''
+        StreamReader Constructor. The source reader, if provided, is the
+        stream under the file reader (i.e. the compressed stream of a
+        decompressor), closed along it.
+        '''
+        self.file_reader = file_reader
+        self.source_reader = source_reader
+        self.queue = Queue(STREAM_QUEUE_SIZE)
+        self.stop = Event()
+        self.chunk = memoryview(b"")
+        self.position = 0
+        self.end_of_file = False
+        self.thread = Thread(target=self._read_chunks, daemon=True)
+        self.thread.start()
+
+
+    def __enter__(self):
+        '''Context manager enter.'''
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        '''Context manager exit.'''
+        self.close()
+
+
+    def _read_chunks(self):
+        '''Background thread that reads the stream chunks into the queue.'''
+        try:
+            while not self.stop.is_set():
+                chunk = self.file_reader.read(STREAM_CHUNK_SIZE)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as error:
+            self._put(error)
+
+
+    def _put(self, item):
+        '''Put an item into the queue, unless the reader is closed.'''
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+
+    def _next_chunk(self):
+        '''Get the next chunk of the stream (empty on end of file).'''
+        if self.end_of_file:
+            return False
+        item = self.queue.get()
+        if isinstance(item, Exception):
+            self.end_of_file = True
+            raise item
+        if not item:
+            self.end_of_file = True
+            return False
+        self.chunk = memoryview(item)
+        return True
+
+
+    def read(self, num_bytes: int = -1):
+        '''Read up to a number of bytes (all if negative).'''
+        data = bytearray()
+        while (num_bytes < 0) or (len(data) < num_bytes):
+            if (len(self.chunk) == 0) and (not self._next_chunk()):
+                break
+            to_read = len(self.chunk)
+            if num_bytes >= 0:
+                to_read = min(to_read, num_bytes - len(data))
+            data.extend(self.chunk[:to_read])
+            self.chunk = self.chunk[to_read:]
+        self.position = self.position + len(data)
+        return bytes(data)
+
+
+    def readinto(self, buffer):
+        '''Read data into a buffer, returns the number of bytes read.'''
+        with memoryview(buffer) as view:
+            read_bytes = 0
+            while read_bytes < len(view):
+                if (len(self.chunk) == 0) and (not self._next_chunk()):
+                    break
+                to_read = min(len(self.chunk), len(view) - read_bytes)
+                view[read_bytes:read_bytes + to_read] = self.chunk[:to_read]
+                self.chunk = self.chunk[to_read:]
+                read_bytes = read_bytes + to_read
+        self.position = self.position + read_bytes
+        return read_bytes
+
+
+    def skip(self, num_bytes: int):
+        '''
+        Skip a number of bytes of the stream. Returns the number of
+        bytes skipped (less than requested on end of file).
+        '''
+        skipped_bytes = 0
+        while skipped_bytes < num_bytes:
+            if (len(self.chunk) == 0) and (not self._next_chunk()):
+                break
+            to_skip = min(len(self.chunk), num_bytes - skipped_bytes)
+            self.chunk = self.chunk[to_skip:]
+            skipped_bytes = skipped_bytes + to_skip
+        self.position = self.position + skipped_bytes
+        return skipped_bytes
+
+
+    def tell(self):
+        '''Get the current stream position.'''
+        return self.position
+
+
+    def fileno(self):
+        '''Streams don't have a file descriptor to use.'''
+        raise UnsupportedOperation("fileno")
+
+
+    def close(self):
+        '''Stop the background thread and close the stream.'''
+        self.stop.set()
+        while self.thread.is_alive():
+            try:
+                self.queue.get(timeout=0.1)
+            except Empty:
+                pass
+        self.thread.join()
+        self.file_reader.close()
+        if self.source_reader is not None:
+            self.source_reader.close()
+
+
+###############################################################################
+# Stream Writer Class
+###############################################################################
+
+class StreamWriter():
+    '''
+    Binary file writer of a stream, where the data is written (i.e. and
+    compressed) in a background thread. Only sequential writes are
+    supported.
+    '''
+
+    def __init__(self, file_writer):
+        '''StreamWriter Constructor.'''
+        self.file_writer = file_writer
+        self.queue = Queue(STREAM_QUEUE_SIZE)
+        self.position = 0
+        self.error = None
+        self.thread = Thread(target=self._write_chunks, daemon=True)
+        self.thread.start()
+
+
+    def __enter__(self):
+        '''Context manager enter.'''
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        '''Context manager exit.'''
+        self.close()
+
+
+    def _write_chunks(self):
+        '''Background thread that writes the queued chunks to the stream.'''
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.file_writer.write(chunk)
+            except Exception as error:
+                self.error = error
+
+
+    def write(self, data):
+        '''Write data, returns the number of bytes written.'''
+        if self.error is not None:
+            raise self.error
+        data = bytes(data)
+        self.queue.put(data)
+        self.position = self.position + len(data)
+        return len(data)
+
+
+    def tell(self):
+        '''Get the current stream position.'''
+        return self.position
+
+
+    def flush(self):
+        '''Data is flushed on close.'''
+        return
+
+
+    def fileno(self):
+        '''Streams don't have a file descriptor to use.'''
+        raise UnsupportedOperation("fileno")
+
+
+    def close(self):
+        '''Write the pending data and close the stream.'''
+        self.queue.put(None)
+        self.thread.join()
+        self.file_writer.close()
+        if self.error is not None:
+            raise self.error
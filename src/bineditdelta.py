@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditdelta.py
+Description:
+    Binary delta (diff and patch) engine for binedit library.
+    It supports the next features:
+      - Create a patch file with the differences between two binary
+        files, using block hashing with a rolling checksum to find the
+        data that can be copied from the old file (streaming both files,
+        and skipping ahead over data without matches).
+      - Apply a patch file in a single pass, writing only the changed
+        ranges into the target file.
+    Patch file format:
+      - Header: magic "BEDP", version (1 byte), block size (4 bytes),
+        old file size (8 bytes) and new file size (8 bytes).
+      - Operations (in new file order), each one starting with a byte:
+          "C": Copy data from old file (offset and size, 8 bytes each).
+          "I": Insert data (size, 8 bytes, followed by the data).
+          "F": Fill with a byte value (value, 1 byte, and size, 8 bytes).
+          "E": End of patch.
+      - All the numbers are stored in little endian format.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Array Library
+from array import array
+
+# Bisection Algorithm Library
+from bisect import bisect_right
+
+# Hash Library
+from hashlib import blake2b
+
+# Regular Expressions Library
+from re import compile as re_compile
+from re import DOTALL
+
+# Binary Data Structures Library
+from struct import Struct
+
+# Data Compression Library (Adler-32 checksum)
+from zlib import adler32
+
+# Operating System Library
+from os import pread, pwrite
+from os import path as os_path
+from os import stat as os_stat
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Patch file format identification
+PATCH_MAGIC = b"BEDP"
+PATCH_VERSION = 1
+
+# Default size of the blocks to find in the old file
+BLOCK_SIZE = 512
+
+# Size of data chunks used to read the new file and write insert data
+CHUNK_SIZE = 1024 * 1024
+
+# Adler-32 checksum modulo
+ADLER_MOD = 65521
+
+# Size of the strong hash digest of the blocks
+DIGEST_SIZE = 16
+
+# Maximum number of blocks skipped ahead when the data doesn't match
+# (matches shorter than it inside unmatched data can be missed)
+MAX_SKIP_BLOCKS = 32
+
+# Minimum size of runs of a same byte value to store them as fill
+MIN_FILL_SIZE = 64
+
+# Patch file binary structures
+HEADER = Struct("<4sBIQQ")
+OP_COPY = Struct("<QQ")
+OP_INSERT = Struct("<Q")
+OP_FILL = Struct("<BQ")
+
+# Regular expression to find runs of a same byte value
+FILL_RUN = re_compile(rb"(.)\1{%d,}" % (MIN_FILL_SIZE - 1), DOTALL)
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def _strong_hash(data: bytes):
+    '''Get the strong hash of a data block.'''
+    return blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+###############################################################################
+# Old File Index Class
+###############################################################################
+
+class BlockIndex():
+    '''
+    Index of the blocks of a file (old file of a diff), with the weak
+    (Adler-32) and strong hash of each block, and the blocks of each
+    weak hash value (blocks with the same content are indexed once).
+    '''
+
+    def __init__(self, file_path: str, block_size: int):
+        '''BlockIndex Constructor (reads the file by chunks).'''
+        self.block_size = block_size
+        self.weaks = array("I")
+        self.digests = bytearray()
+        self.blocks = {}
+        chunk_size = max(CHUNK_SIZE // block_size, 1) * block_size
+        with open(file_path, "rb") as bin_file_reader:
+            chunk = bin_file_reader.read(chunk_size)
+            while chunk:
+                for offset in range(0, len(chunk) - block_size + 1,
+                                    block_size):
+                    self._add(chunk[offset:offset + block_size])
+                chunk = bin_file_reader.read(chunk_size)
+
+
+    def _add(self, block: bytes):
+        '''Add the next block of the file to the index.'''
+        block_num = len(self.weaks)
+        weak = adler32(block)
+        digest = _strong_hash(block)
+        self.weaks.append(weak)
+        self.digests.extend(digest)
+        same_weak_blocks = self.blocks.setdefault(weak, [])
+        for other_num in same_weak_blocks:
+            if self.digest(other_num) == digest:
+                return
+        same_weak_blocks.append(block_num)
+
+
+    def digest(self, block_num: int):
+        '''Get the strong hash of a block.'''
+        offset = block_num * DIGEST_SIZE
+        return bytes(self.digests[offset:offset + DIGEST_SIZE])
+
+
+    def match(self, weak: int, window: bytes, preferred_offsets: tuple):
+        '''
+        Find the offset of a block of the file with the same content as
+        a window of data, checking first the preferred offsets (i.e.
+        same offset in both files, or next to the previous copy).
+        Returns None if there is no block with that content.
+        '''
+        digest = None
+        for offset in preferred_offsets:
+            if offset % self.block_size != 0:
+                continue
+            block_num = offset // self.block_size
+            if (block_num < len(self.weaks)) \
+            and (self.weaks[block_num] == weak):
+                if digest is None:
+                    digest = _strong_hash(window)
+                if self.digest(block_num) == digest:
+                    return offset
+        if weak not in self.blocks:
+            return None
+        if digest is None:
+            digest = _strong_hash(window)
+        for block_num in self.blocks[weak]:
+            if self.digest(block_num) == digest:
+                return block_num * self.block_size
+        return None
+
+
+###############################################################################
+# Patch Writer Class
+###############################################################################
+
+class PatchWriter():
+    '''
+    Patch file writer, that merges contiguous copy operations and
+    buffers insert data (storing runs of a same byte value as fill).
+    '''
+
+    def __init__(self, patch_file_writer):
+        '''PatchWriter Constructor.'''
+        self.writer = patch_file_writer
+        self.copy_offset = 0
+        self.copy_size = 0
+        self.literal = bytearray()
+
+
+    def copy(self, offset: int, num_bytes: int):
+        '''Add a copy from old file operation.'''
+        self.flush_literal()
+        if (self.copy_size > 0) \
+        and (self.copy_offset + self.copy_size == offset):
+            self.copy_size = self.copy_size + num_bytes
+            return
+        self.flush_copy()
+        self.copy_offset = offset
+        self.copy_size = num_bytes
+
+
+    def insert(self, data: bytes):
+        '''Add data to insert.'''
+        if len(data) == 0:
+            return
+        self.flush_copy()
+        self.literal.extend(data)
+        if len(self.literal) >= CHUNK_SIZE:
+            self.flush_literal()
+
+
+    def flush_copy(self):
+        '''Write the pending copy operation.'''
+        if self.copy_size > 0:
+            self.writer.write(b"C")
+            self.writer.write(OP_COPY.pack(self.copy_offset, self.copy_size))
+        self.copy_size = 0
+
+
+    def flush_literal(self):
+        '''Write the pending insert data (as insert and fill operations).'''
+        if not self.literal:
+            return
+        data = memoryview(self.literal)
+        offset = 0
+        for run in FILL_RUN.finditer(self.literal):
+            self._write_insert(data[offset:run.start()])
+            self.writer.write(b"F")
+            self.writer.write(OP_FILL.pack(self.literal[run.start()],
+                                           run.end() - run.start()))
+            offset = run.end()
+        self._write_insert(data[offset:])
+        data.release()
+        self.literal = bytearray()
+
+
+    def close(self):
+        '''Write all the pending operations and the end of patch.'''
+        self.flush_copy()
+        self.flush_literal()
+        self.writer.write(b"E")
+
+
+    def _write_insert(self, data: bytes):
+        '''Write an insert data operation.'''
+        if len(data) > 0:
+            self.writer.write(b"I")
+            self.writer.write(OP_INSERT.pack(len(data)))
+            self.writer.write(data)
+
+
+###############################################################################
+# Diff and Patch Functions
+###############################################################################
+
+def create_patch(path_file_old: str, path_file_new: str,
+                 path_file_patch: str, block_size: int = BLOCK_SIZE):
+    '''
+    Create a patch file with the differences between an old and a new
+    binary file. The old file is indexed by blocks, and the new file is
+    read by chunks and scanned with a rolling checksum to find blocks
+    that can be copied from the old file. When a full block of window
+    positions doesn't match, the scan skips blocks ahead (up to
+    MAX_SKIP_BLOCKS), and the next match is extended backward over the
+    skipped data.
+    '''
+    index = BlockIndex(path_file_old, block_size)
+    old_size = os_stat(path_file_old).st_size
+    new_size = os_stat(path_file_new).st_size
+    with open(path_file_new, "rb") as bin_file_reader, \
+         open(path_file_patch, "wb") as patch_file_writer:
+        patch_file_writer.write(HEADER.pack(PATCH_MAGIC, PATCH_VERSION,
+                                            block_size, old_size, new_size))
+        patch = PatchWriter(patch_file_writer)
+        # Data buffer of the new file, where buf_offset is the new file
+        # offset of the buffer start, and pos the window start position
+        buf = bytearray()
+        buf_offset = 0
+        pos = 0
+        literal_start = 0
+        weak = None
+        end_of_file = False
+        # Number of consecutive window positions without a match, and
+        # number of blocks to skip after a full block of them
+        misses = 0
+        skip_blocks = 1
+        while True:
+            # Keep at least a full window of data in the buffer
+            if (not end_of_file) and (len(buf) - pos < block_size + 1):
+                patch.insert(buf[literal_start:pos])
+                del buf[:pos]
+                buf_offset = buf_offset + pos
+                pos = 0
+                literal_start = 0
+                chunk = bin_file_reader.read(CHUNK_SIZE)
+                if not chunk:
+                    end_of_file = True
+                buf.extend(chunk)
+            if len(buf) - pos < block_size:
+                break
+            if weak is None:
+                weak = adler32(buf[pos:pos + block_size])
+            offset = None
+            if weak in index.blocks:
+                new_offset = buf_offset + pos
+                offset = index.match(weak, buf[pos:pos + block_size],
+                    (new_offset, patch.copy_offset + patch.copy_size))
+            if offset is not None:
+                # Extend the match backward over the skipped data
+                start = pos
+                while (start - block_size >= literal_start) \
+                and (offset >= block_size):
+                    window = buf[start - block_size:start]
+                    if index.match(adler32(window), window,
+                            (offset - block_size,)) != offset - block_size:
+                        break
+                    start = start - block_size
+                    offset = offset - block_size
+                patch.insert(buf[literal_start:start])
+                patch.copy(offset, pos + block_size - start)
+                pos = pos + block_size
+                literal_start = pos
+                weak = None
+                misses = 0
+                skip_blocks = 1
+                continue
+            # No match in a full block of window positions (so in any
+            # alignment of the old blocks), skip some blocks ahead (more
+            # after each skip), as matches are extended backward
+            misses = misses + 1
+            if misses >= block_size:
+                jump = min(skip_blocks * block_size,
+                           len(buf) - pos - block_size)
+                if jump > 0:
+                    pos = pos + jump
+                    weak = None
+                    misses = 0
+                    skip_blocks = min(skip_blocks * 2, MAX_SKIP_BLOCKS)
+                    continue
+            # No match, roll the checksum window one byte
+            if len(buf) - pos > block_size:
+                out_byte = buf[pos]
+                in_byte = buf[pos + block_size]
+                a = weak & 0xFFFF
+                b = weak >> 16
+                a = (a - out_byte + in_byte) % ADLER_MOD
+                b = (b - (block_size * out_byte) + a - 1) % ADLER_MOD
+                weak = (b << 16) | a
+            else:
+                weak = None
+            pos = pos + 1
+        patch.insert(buf[literal_start:])
+        patch.close()
+
+
+def read_patch_ops(patch_file_reader):
+    '''
+    Generator that yields the operations of a patch file, as tuples of
+    (operation, new file offset, size, value), where value is the old
+    file offset for copies, the fill byte for fills, or the patch file
+    offset of the data for inserts (the insert data is skipped).
+    '''
+    new_offset = 0
+    while True:
+        op = patch_file_reader.read(1)
+        if op == b"C":
+            old_offset, num_bytes = OP_COPY.unpack(
+                patch_file_reader.read(OP_COPY.size))
+            yield (op, new_offset, num_bytes, old_offset)
+        elif op == b"I":
+            num_bytes, = OP_INSERT.unpack(
+                patch_file_reader.read(OP_INSERT.size))
+            data_offset = patch_file_reader.tell()
+            yield (op, new_offset, num_bytes, data_offset)
+            patch_file_reader.seek(data_offset + num_bytes)
+        elif op == b"F":
+            value, num_bytes = OP_FILL.unpack(
+                patch_file_reader.read(OP_FILL.size))
+            yield (op, new_offset, num_bytes, value)
+        elif op == b"E":
+            return
+        else:
+            raise ValueError("Invalid or truncated patch file")
+        new_offset = new_offset + num_bytes
+
+
+def read_patch_header(patch_file_reader):
+    '''Read and check a patch file header (returns old and new sizes).'''
+    magic, version, block_size, old_size, new_size = HEADER.unpack(
+        patch_file_reader.read(HEADER.size))
+    if (magic != PATCH_MAGIC) or (version != PATCH_VERSION):
+        raise ValueError("Invalid patch file format")
+    return (old_size, new_size)
+
+
+def apply_patch(binedit, path_file_old: str, path_file_patch: str,
+                path_file_output: str):
+    '''
+    Apply a patch file to an old binary file, in a single pass that
+    writes only the changed ranges. If the output file is a different
+    file, it is first created as a copy of the old file (by the kernel
+    if supported). If it is the same file, the patch is applied in
+    place, which is only possible if no copy operation reads data
+    previously overwritten by the patch (copies that overlap their own
+    destination ahead of the source are done backwards).
+    '''
+    in_place = os_path.exists(path_file_output) \
+        and os_path.samefile(path_file_old, path_file_output)
+    with open(path_file_patch, "rb") as patch_file_reader:
+        old_size, new_size = read_patch_header(patch_file_reader)
+        if os_stat(path_file_old).st_size != old_size:
+            raise ValueError("Patch file doesn't match the old file size")
+        if in_place:
+            _check_in_place(patch_file_reader)
+            patch_file_reader.seek(HEADER.size)
+        mode = "r+b" if in_place else "wb"
+        with open(path_file_old, "rb") as bin_file_reader, \
+             open(path_file_output, mode) as bin_file_writer:
+            # Start from a copy of the old file data
+            if not in_place:
+                binedit._copy_data(bin_file_reader, bin_file_writer,
+                                   min(old_size, new_size))
+            # Write the changed ranges
+            for op, new_offset, num_bytes, value in \
+                    read_patch_ops(patch_file_reader):
+                if (op == b"C") and (value == new_offset):
+                    continue
+                bin_file_writer.seek(new_offset)
+                if in_place and (op == b"C") \
+                and (value < new_offset < value + num_bytes):
+                    _copy_backward(bin_file_writer.fileno(), value,
+                                   new_offset, num_bytes)
+                elif op == b"C":
+                    bin_file_reader.seek(value)
+                    binedit._copy_data(bin_file_reader, bin_file_writer,
+                                       num_bytes)
+                elif op == b"F":
+                    binedit._write_fill(bin_file_writer, num_bytes, value)
+                else:
+                    patch_file_reader.seek(value)
+                    binedit._copy_data(patch_file_reader, bin_file_writer,
+                                       num_bytes)
+            bin_file_writer.truncate(new_size)
+
+
+def _copy_backward(file_descriptor: int, src_offset: int, dst_offset: int,
+                   num_bytes: int):
+    '''
+    Copy a range of a file into a higher overlapping offset of the same
+    file, by chunks from the end of the range, so no chunk is read after
+    being overwritten.
+    '''
+    end = num_bytes
+    while end > 0:
+        start = max(end - CHUNK_SIZE, 0)
+        data = memoryview(pread(file_descriptor, end - start,
+                                src_offset + start))
+        if len(data) != end - start:
+            raise ValueError("Patch copy out of the old file data")
+        while data:
+            written_bytes = pwrite(file_descriptor, data,
+                                   dst_offset + end - len(data))
+            data = data[written_bytes:]
+        end = start
+
+
+def _check_in_place(patch_file_reader):
+    '''
+    Check that a patch can be applied in place, that is, that no copy
+    operation reads a range of the old file that was previously written
+    (by previous operations, as a copy that overlaps its own destination
+    is done in the safe direction).
+    '''
+    starts = []
+    ends = []
+    for op, new_offset, num_bytes, value in read_patch_ops(patch_file_reader):
+        if (op == b"C") and (value == new_offset):
+            continue
+        if op == b"C":
+            i = bisect_right(starts, value + num_bytes - 1) - 1
+            if (i >= 0) and (ends[i] > value):
+                raise ValueError("Patch can't be applied in place, use a "
+                                 "different output file")
+        # Written ranges are in increasing offset order
+        if starts and (ends[-1] == new_offset):
+            ends[-1] = new_offset + num_bytes
+        else:
+            starts.append(new_offset)
+            ends.append(new_offset + num_bytes)
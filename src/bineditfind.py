@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditfind.py
+Description:
+    Byte patterns search for binedit library.
+    It supports the next features:
+      - Hexadecimal patterns with "??" wildcard bytes (i.e. "DE AD ?? EF").
+      - ASCII patterns (i.e. "ascii:v1.2.3").
+      - Search of multiple patterns (all the matches, including the
+        overlapped ones) over a memory mapped file address range.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Heap Queue Library
+from heapq import merge as heapq_merge
+
+# Memory-mapped Files Library
+from mmap import mmap, ACCESS_READ
+
+# Regular Expressions Library
+from re import compile as re_compile
+from re import escape as re_escape
+from re import DOTALL
+
+
+###############################################################################
+# Pattern Class
+###############################################################################
+
+class Pattern():
+    '''
+    Byte pattern to search, from a text with the format:
+      - "ascii:<text>": ASCII text.
+      - "hex:<hex>" or "<hex>": hexadecimal bytes, optionally separated
+        by spaces, where "??" is a wildcard byte.
+      - Any other text that is not valid hexadecimal is used as ASCII.
+    '''
+
+    def __init__(self, text: str):
+        '''Pattern Constructor (raises ValueError if invalid).'''
+        self.text = text
+        self.literal = None
+        self.regex = None
+        if text.startswith("ascii:"):
+            self.literal = text[len("ascii:"):].encode("ascii")
+        elif text.startswith("hex:"):
+            self._parse_hex(text[len("hex:"):])
+        else:
+            try:
+                self._parse_hex(text)
+            except ValueError:
+                self.literal = text.encode("ascii")
+        if self.literal is not None:
+            self.size = len(self.literal)
+        if self.size == 0:
+            raise ValueError(f"Empty search pattern: {text}")
+
+
+    def _parse_hex(self, text: str):
+        '''Parse an hexadecimal pattern with "??" wildcards.'''
+        text = text.replace(" ", "")
+        if (len(text) == 0) or (len(text) % 2 != 0):
+            raise ValueError(f"Invalid hexadecimal pattern: {text}")
+        hex_bytes = [text[i:i + 2] for i in range(0, len(text), 2)]
+        if "??" not in hex_bytes:
+            self.literal = bytes.fromhex(text)
+            return
+        regex = b""
+        for hex_byte in hex_bytes:
+            if hex_byte == "??":
+                regex = regex + b"."
+            else:
+                regex = regex + re_escape(bytes.fromhex(hex_byte))
+        # Lookahead to find overlapped matches too
+        self.regex = re_compile(b"(?=" + regex + b")", DOTALL)
+        self.size = len(hex_bytes)
+
+
+    def find(self, data, start: int, end: int, limit: int):
+        '''
+        Generator that yields the offsets of all the pattern matches in
+        a data buffer, that starts between start and end offsets, and
+        ends before the limit offset.
+        '''
+        limit = min(end + self.size - 1, limit)
+        if self.regex is not None:
+            for match in self.regex.finditer(data, start, limit):
+                if match.start() + self.size > limit:
+                    break
+                yield match.start()
+            return
+        offset = data.find(self.literal, start, limit)
+        while offset != -1:
+            yield offset
+            offset = data.find(self.literal, offset + 1, limit)
+
+
+###############################################################################
+# Search Functions
+###############################################################################
+
+def find_in_data(data, patterns: list, start: int, end: int, limit: int):
+    '''
+    Generator that yields all the matches of multiple patterns that
+    starts in a range of a data buffer and ends before the limit offset
+    (data after the end is used for matches that cross it), as tuples of
+    (offset, pattern index) sorted by offset. The matches of each
+    pattern are merged as they are found, so they are not collected.
+    '''
+    yield from heapq_merge(*[_pattern_matches(pattern, pattern_num, data,
+                                              start, end, limit)
+                             for pattern_num, pattern in enumerate(patterns)])
+
+
+def _pattern_matches(pattern: Pattern, pattern_num: int, data, start: int,
+                     end: int, limit: int):
+    '''Generator that yields the (offset, pattern index) of a pattern.'''
+    for offset in pattern.find(data, start, end, limit):
+        yield (offset, pattern_num)
+
+
+def find_in_file(file_path: str, pattern_texts: list, start: int, end: int,
+                 limit: int):
+    '''
+    Find all the matches of multiple patterns that starts in an address
+    range of a file, by memory mapping it (used as process pool task).
+    Returns a list of (offset, pattern index) sorted by offset.
+    '''
+    patterns = [Pattern(text) for text in pattern_texts]
+    with open(file_path, "rb") as bin_file_reader, \
+         mmap(bin_file_reader.fileno(), 0, access=ACCESS_READ) as file_data:
+        return list(find_in_data(file_data, patterns, start, end, limit))
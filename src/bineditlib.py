@@ -42,9 +42,148 @@ import logging
 # Error Traceback Library
 from traceback import format_exc
 
+# Function Tools Library
+from functools import lru_cache, wraps
+
+# Concurrent Execution Library
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Context Utilities Library
+from contextlib import ExitStack, closing, contextmanager, nullcontext
+from contextlib import redirect_stdout
+
+# In-memory Text Streams Library
+from io import StringIO
+
+# Threading Library
+from threading import Lock
+
+# Time Library
+from time import perf_counter
+
+# Glob Patterns Library
+from glob import glob
+
+# Regular Expressions Library
+from re import compile as re_compile
+from re import escape as re_escape
+
+# Memory-mapped Files Library
+from mmap import mmap, ACCESS_READ
+
+# JSON Library
+from json import load as json_load
+from json import loads as json_loads
+
+# CSV Files Library
+from csv import DictReader
+
+# System Library
+import sys
+
 # Operating System Library
+from os import SEEK_END
+from os import cpu_count
+from os import pread, pwrite
+from os import path as os_path
+from os import remove as os_remove
+from os import replace as os_replace
 from os import stat as os_stat
 
+# Shell Utilities Library
+from shutil import copymode
+
+# Temporary Files Library
+from tempfile import NamedTemporaryFile
+
+# File Space Preallocation (not available in all systems)
+try:
+    from os import posix_fallocate as _posix_fallocate
+except ImportError:
+    _posix_fallocate = None
+
+# TOML Library (not available before Python 3.11)
+try:
+    from tomllib import load as toml_load
+except ImportError:
+    toml_load = None
+
+# File Clone Control (not available in all systems)
+try:
+    from fcntl import ioctl
+except ImportError:
+    ioctl = None
+
+# Kernel-side File Data Copy (not available in all systems)
+try:
+    from os import copy_file_range as _copy_file_range
+except ImportError:
+    _copy_file_range = None
+
+
+###############################################################################
+# Local Libraries
+###############################################################################
+
+# Sparse Binary Image Library
+from bineditsparse import SparseImage, sparse_format
+
+# Binary Delta Library
+from bineditdelta import BLOCK_SIZE, apply_patch, create_patch
+
+# Patterns Search Library
+from bineditfind import Pattern, find_in_data, find_in_file
+
+# Compressed Files Streaming Library
+from bineditcompress import StreamReader, compression_format, open_reader
+from bineditcompress import open_stream, open_writer, output_compression
+
+# Byte Statistics Library
+from bineditstats import block_stats, entropy, entropy_char
+
+# Checksum Algorithms Library
+from bineditchecksum import Crc, ZlibChecksum, crc32_combine, new_checksum
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Size of data chunks used to process files in a streaming way
+CHUNK_SIZE = 1024 * 1024
+
+# Linux ioctl request to clone a file sharing its data blocks (reflink)
+FICLONE = 0x40049409
+
+# Stamp fields encoding types (integer types: (size, byte order))
+STAMP_INT_TYPES = {
+    "u8": (1, "little"),
+    "u16le": (2, "little"), "u16be": (2, "big"),
+    "u32le": (4, "little"), "u32be": (4, "big"),
+    "u64le": (8, "little"), "u64be": (8, "big"),
+}
+
+# Operations recorded by an instrumented BinEdit (see instrument())
+INSTRUMENTED_OPERATIONS = (
+    "create_file", "clear_data", "extract_data", "join_files", "split_files",
+    "split_regions", "diff_files", "patch_file", "checksum", "find_file",
+    "compare", "compare_files", "batch", "stamp_variants", "blank_map",
+    "blank_map_file", "run_manifest", "show_file", "hexdump", "clear_buffer",
+    "extract_buffer", "join_buffer", "split_buffer", "stats", "stats_file"
+)
+
+# Phase context used when metrics are not enabled (does nothing)
+NO_METRICS_PHASE = nullcontext()
+
+# Size of data chunks of a file to search patterns in parallel
+FIND_CHUNK_SIZE = 64 * CHUNK_SIZE
+
+# Default size of the blocks of byte statistics
+STATS_BLOCK_SIZE = 64 * 1024
+
+# Default size of the blocks of the show command entropy strip
+ENTROPY_BLOCK_SIZE = 256
+
 
 ###############################################################################
 # Logger Setup
@@ -53,6 +192,370 @@ from os import stat as os_stat
 logger = logging.getLogger(__name__)
 
 
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+@lru_cache(maxsize=None)
+def _hexdump_filter(sep: str):
+    '''
+    Get the translate tables that converts bytes into the hexdump ascii
+    representation (printable characters or the separator).
+    Returns a bytes translate table and, if the separator is not a
+    single ascii character, a str translate table to apply after it.
+    '''
+    printable = [(x <= 127) and (len(repr(chr(x))) == 3) for x in range(256)]
+    if (len(sep) == 1) and (ord(sep) <= 127):
+        table = bytes([printable[x] and x or ord(sep) for x in range(256)])
+        return (table, None)
+    table = bytes([printable[x] and x or 0 for x in range(256)])
+    return (table, {0: sep})
+
+
+@lru_cache(maxsize=None)
+def _used_regex(erase_value: int):
+    '''Get the regex that matches runs of non-erased bytes.'''
+    return re_compile(b"[^" + re_escape(bytes([erase_value])) + b"]+")
+
+
+def _resolve_manifest_paths(manifest: dict, cwd: str):
+    '''
+    Resolve the relative files paths of a layout manifest (regions files,
+    steps regions that are not named regions, and steps inputs and
+    outputs) against a working directory, in place ("-" is kept).
+    '''
+    def resolve(file_path):
+        if (not isinstance(file_path, str)) or (file_path == "-"):
+            return file_path
+        return os_path.join(cwd, file_path)
+    regions = manifest.get("regions", {})
+    for region in regions.values():
+        if "file" in region:
+            region["file"] = resolve(region["file"])
+    for step in manifest.get("steps", []):
+        if ("region" in step) and (step["region"] not in regions):
+            step["region"] = resolve(step["region"])
+        for key in ("input", "output"):
+            if key in step:
+                step[key] = resolve(step[key])
+
+
+def manifest_paths(manifest: dict):
+    '''Get the files paths used by a layout manifest ("-" excluded).'''
+    regions = manifest.get("regions", {})
+    paths = [region.get("file") for region in regions.values()]
+    for step in manifest.get("steps", []):
+        if step.get("region") not in regions:
+            paths.append(step.get("region"))
+        paths.extend([step.get("input"), step.get("output")])
+    return [x for x in paths if isinstance(x, str) and (x != "-")]
+
+
+###############################################################################
+# Write Plan Class
+###############################################################################
+
+class WritePlan():
+    '''
+    Pending writes to a binary file, stored as a sorted list of non
+    overlapping segments [start, end, source, source_offset], where the
+    source is a fill byte value (int), a source binary file path (str) or
+    the data bytes to write (bytes).
+    Overlapping writes replace the older data and adjacent writes of the
+    same source are merged, so each byte is written once on flush.
+    '''
+
+    def __init__(self, file_path: str):
+        '''WritePlan Constructor.'''
+        self.file_path = file_path
+        self.create = False
+        self.segments = []
+        try:
+            self.file_size = os_stat(file_path).st_size
+        except OSError:
+            self.file_size = None
+        self.size = self.file_size
+
+
+    def create_file(self, num_bytes: int, fill_value: int = 0xFF):
+        '''Plan the creation of the file filled with the given value.'''
+        self.create = True
+        self.size = num_bytes
+        self.segments = []
+        self.add(0, num_bytes, fill_value)
+
+
+    def add(self, start: int, end: int, source, source_offset: int = 0):
+        '''Plan a write of a fill value, source file range or data bytes.'''
+        if start >= end:
+            return
+        segments = []
+        for seg_start, seg_end, seg_source, seg_offset in self.segments:
+            if (seg_end <= start) or (seg_start >= end):
+                segments.append([seg_start, seg_end, seg_source, seg_offset])
+                continue
+            # Keep the parts of the old segment out of the new one
+            if seg_start < start:
+                segments.append([seg_start, start, seg_source, seg_offset])
+            if seg_end > end:
+                if not isinstance(seg_source, int):
+                    seg_offset = seg_offset + (end - seg_start)
+                segments.append([end, seg_end, seg_source, seg_offset])
+        segments.append([start, end, source, source_offset])
+        segments.sort(key=lambda segment: segment[0])
+        # Merge adjacent segments of the same source
+        self.segments = []
+        for segment in segments:
+            if self.segments:
+                last = self.segments[-1]
+                if (last[1] == segment[0]) \
+                and (type(last[2]) == type(segment[2])) \
+                and (last[2] == segment[2]) \
+                and (isinstance(last[2], int)
+                     or (last[3] + (last[1] - last[0]) == segment[3])):
+                    last[1] = segment[1]
+                    continue
+            self.segments.append(segment)
+        if (self.size is None) or (end > self.size):
+            self.size = end
+
+
+    def pending(self):
+        '''Check if there are pending writes to flush.'''
+        return self.create or (len(self.segments) > 0)
+
+
+    def reads_from(self, file_path: str):
+        '''
+        Check if the pending writes read data from a source file (read
+        on flush, so it must not be modified before).
+        '''
+        file_path = os_path.abspath(file_path)
+        for _, _, source, _ in self.segments:
+            if isinstance(source, str) and \
+            (os_path.abspath(source) == file_path):
+                return True
+        return False
+
+
+    def discard(self):
+        '''Discard all the pending writes.'''
+        self.create = False
+        self.segments = []
+        self.size = self.file_size
+
+
+    def read(self, binedit, address: int, num_bytes: int):
+        '''
+        Read data from the file as it would be after flushing the
+        pending writes (only the requested range is read).
+        '''
+        end = min(address + num_bytes, self.size)
+        if address >= end:
+            return bytes()
+        data = bytearray(end - address)
+        # Read the current file content (if not planned to be recreated)
+        if (not self.create) and (self.file_size is not None) \
+        and (address < self.file_size):
+            with open(self.file_path, "rb") as bin_file_reader:
+                bin_file_reader.seek(address)
+                bin_file_reader.readinto(
+                    memoryview(data)[:min(end, self.file_size) - address])
+        # Apply the pending writes of the range
+        for start, seg_end, source, source_offset in self.segments:
+            if (seg_end <= address) or (start >= end):
+                continue
+            source_offset = source_offset + max(address - start, 0)
+            start = max(start, address)
+            seg_end = min(seg_end, end)
+            if isinstance(source, int):
+                data[start - address:seg_end - address] = \
+                    bytes([source]) * (seg_end - start)
+            elif isinstance(source, str):
+                with open(source, "rb") as bin_file_reader:
+                    bin_file_reader.seek(source_offset)
+                    bin_file_reader.readinto(memoryview(data)
+                        [start - address:seg_end - address])
+            else:
+                data[start - address:seg_end - address] = memoryview(
+                    source)[source_offset:source_offset + seg_end - start]
+        return bytes(data)
+
+
+    def flush(self, binedit):
+        '''Apply all the pending writes opening each file just once.'''
+        if not self.pending():
+            return True
+        src_readers = {}
+        try:
+            mode = "wb" if self.create else "r+b"
+            with open(self.file_path, mode) as bin_file_writer:
+                if self.create:
+                    binedit._preallocate(bin_file_writer, self.size)
+                for start, end, source, source_offset in self.segments:
+                    bin_file_writer.seek(start)
+                    if isinstance(source, int):
+                        if self.create and (source == 0x00):
+                            continue
+                        binedit._write_fill(bin_file_writer, end - start,
+                                            source)
+                        continue
+                    if not isinstance(source, str):
+                        bin_file_writer.write(memoryview(source)
+                            [source_offset:source_offset + end - start])
+                        continue
+                    if source not in src_readers:
+                        src_readers[source] = open(source, "rb")
+                    src_readers[source].seek(source_offset)
+                    binedit._copy_data(src_readers[source], bin_file_writer,
+                                       end - start)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to write binary file {self.file_path}\n")
+            return False
+        finally:
+            for bin_file_reader in src_readers.values():
+                bin_file_reader.close()
+        self.create = False
+        self.segments = []
+        self.file_size = self.size
+        return True
+
+
+###############################################################################
+# BinImage Class
+###############################################################################
+
+class BinImage():
+    '''
+    Editing session of a binary file (see BinEdit.open()).
+    The file content is read lazily, and the edits are recorded as
+    pending writes that are committed together when leaving the context
+    (only the edited ranges are written), or discarded if an exception
+    is raised (the file is never modified before commit).
+    '''
+
+    def __init__(self, file_path: str, binedit=None):
+        '''BinImage Constructor.'''
+        self.file_path = file_path
+        self.binedit = binedit if binedit is not None else BinEdit()
+        self.plan = WritePlan(file_path)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is not None:
+            self.rollback()
+        elif not self.commit():
+            raise OSError(f"Fail to commit binary file {self.file_path}")
+        return False
+
+
+    @property
+    def size(self):
+        '''Current size of the image (None if the file doesn't exist).'''
+        return self.plan.size
+
+
+    def create(self, num_bytes: int, fill_value: int = 0xFF):
+        '''Create the image with the specified size and fill value.'''
+        if num_bytes == 0:
+            logger.error("Number of bytes required to create bin file")
+            return False
+        if (fill_value < 0x00) or (fill_value > 0xFF):
+            logger.error("Invalid fill value to create bin file")
+            return False
+        self.plan.create_file(num_bytes, fill_value)
+        return True
+
+
+    def read(self, address: int = 0, num_bytes: int = 0):
+        '''
+        Read data from the image address, including pending edits (a
+        number of bytes of zero means up to the end of the image).
+        '''
+        if self.size is None:
+            print(f"Fail to read binary file {self.file_path}")
+            return None
+        if num_bytes == 0:
+            num_bytes = self.size
+        try:
+            return self.plan.read(self.binedit, address, num_bytes)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to read binary file {self.file_path}\n")
+        return None
+
+
+    def clear(self, address: int, num_bytes: int):
+        '''Clear data bytes from the image address (set to 0xFF).'''
+        if num_bytes == 0:
+            logger.error("Number of bytes required to create bin file")
+            return False
+        if (self.size is None) or (address >= self.size):
+            logger.error("Address higher than file content")
+            return False
+        self.plan.add(address, min(address + num_bytes, self.size), 0xFF)
+        return True
+
+
+    def patch(self, address: int, data: bytes):
+        '''
+        Write data bytes into the image address (the image is padded with
+        0xFF if the address is out of it).
+        '''
+        if self.size is None:
+            print(f"Fail to read target binary file {self.file_path}")
+            return False
+        if address > self.size:
+            self.plan.add(self.size, address, 0xFF)
+        self.plan.add(address, address + len(data), bytes(data))
+        return True
+
+
+    def join(self, path_file_src: str, address_file_src: int,
+             num_bytes: int, address: int):
+        '''
+        Insert binary data from a source binary file, by address and
+        number of bytes, into the image address (the image is padded
+        with 0xFF if the address is out of it). The source data is read
+        on commit, so the source file must not be modified before it.
+        '''
+        try:
+            file_src_size = os_stat(path_file_src).st_size
+        except Exception:
+            logger.error(format_exc())
+            print(f"Fail to read source binary file {path_file_src}")
+            return False
+        if address_file_src >= file_src_size:
+            print(f"Address requested to read from source binary file larger "
+                  f"than file size (max address: 0x{file_src_size - 1:02x}")
+            return False
+        if (num_bytes == 0) or (address_file_src + num_bytes > file_src_size):
+            num_bytes = file_src_size - address_file_src
+        if self.size is None:
+            print(f"Fail to read target binary file {self.file_path}")
+            return False
+        if address > self.size:
+            self.plan.add(self.size, address, 0xFF)
+        self.plan.add(address, address + num_bytes, path_file_src,
+                      address_file_src)
+        return True
+
+
+    def commit(self):
+        '''Write all the pending edits to the file.'''
+        return self.plan.flush(self.binedit)
+
+
+    def rollback(self):
+        '''Discard all the pending edits.'''
+        self.plan.discard()
+
+
 ###############################################################################
 # BinEdit Class
 ###############################################################################
@@ -64,7 +567,56 @@ class BinEdit():
 
     def __init__(self):
         '''BinEdit Constructor.'''
-        return
+        self.metrics = None
+        self.image_cache = None
+        # Multiprocessing context of the process pools (None for the
+        # default one, i.e. "spawn" in the threaded daemon mode, where
+        # forking could copy locks held by other threads)
+        self.process_context = None
+
+
+    def instrument(self, metrics):
+        '''
+        Enable the collection of metrics of each operation (elapsed time,
+        phases timings, I/O and peak memory) into a Metrics object (see
+        bineditmetrics), or disable it if None is provided. Operations
+        methods are only wrapped when enabled, so disabled metrics don't
+        add any cost.
+        '''
+        self.metrics = metrics
+        for name in INSTRUMENTED_OPERATIONS:
+            self.__dict__.pop(name, None)
+            if metrics is not None:
+                setattr(self, name, self._instrumented(name,
+                                                       getattr(self, name)))
+
+
+    def _instrumented(self, name: str, method):
+        '''Wrap a method to record its metrics as an operation.'''
+        @wraps(method)
+        def instrumented_method(*args, **kwargs):
+            with self.metrics.operation(name):
+                return method(*args, **kwargs)
+        return instrumented_method
+
+
+    def _phase(self, name: str):
+        '''Get a context manager that times a phase of an operation.'''
+        if self.metrics is None:
+            return NO_METRICS_PHASE
+        return self.metrics.phase(name)
+
+
+    @staticmethod
+    def open(file_path: str):
+        '''
+        Open an editing session of a binary file, to be used as a context
+        manager, where all the edits are committed at once on exit:
+            with BinEdit.open("fw.bin") as image:
+                image.clear(0x7C00, 4)
+                image.join("app.bin", 0, 0, 0x8000)
+        '''
+        return BinImage(file_path)
 
 
     def version(self):
@@ -75,10 +627,11 @@ class BinEdit():
         print(f"Date: {DATE}")
 
 
-    def create_file(self, file_path: str, num_bytes: int):
+    def create_file(self, file_path: str, num_bytes: int,
+                    fill_value: int = 0xFF):
         '''
         Create a binary file of specified size with full content set to
-        0xFF.
+        0xFF (or the provided fill value).
         '''
         # Check arguments
         if file_path == "":
@@ -87,11 +640,19 @@ class BinEdit():
         if num_bytes == 0:
             logger.error("Number of bytes required to create bin file")
             return False
-        # Create the file
+        if (fill_value < 0x00) or (fill_value > 0xFF):
+            logger.error("Invalid fill value to create bin file")
+            return False
+        # Create the file (compressed files are streamed)
         try:
-            clear_bytes = bytearray([0xFF] * num_bytes)
+            if output_compression(file_path) is not None:
+                with self._open_output(file_path) as bin_file_writer:
+                    self._write_fill(bin_file_writer, num_bytes, fill_value)
+                return True
             with open(file_path, "wb") as bin_file_writer:
-                bin_file_writer.write(clear_bytes)
+                self._preallocate(bin_file_writer, num_bytes)
+                if fill_value != 0x00:
+                    self._write_fill(bin_file_writer, num_bytes, fill_value)
         except Exception:
             logger.error(format_exc())
             logger.error(f"Fail to create binary file {file_path}\n")
@@ -99,10 +660,16 @@ class BinEdit():
         return True
 
 
-    def clear_data(self, file_path: str, address: int, num_bytes: int):
+    def clear_data(self, file_path: str, address: int, num_bytes: int,
+                   path_file_output: str = ""):
         '''
         Clear data bytes from the provided binary file at the
         specified address and umber of bytes (clear means set to 0xFF).
+        The file is cleared in place, unless an output file is provided
+        (or the input is a stream, i.e. "-" standard input or a named
+        pipe, written to "-" standard output by default), where the
+        cleared data is streamed in a single pass. An output file that is
+        the input file itself is cleared in place.
         '''
         # Check arguments
         if file_path == "":
@@ -111,76 +678,105 @@ class BinEdit():
         if num_bytes == 0:
             logger.error("Number of bytes required to create bin file")
             return False
-        # Read the full file content and check it
-        file_bytes = self._read_file(file_path)
-        if file_bytes is None:
+        # Opening the output would truncate the input if they are the same
+        if self._same_file(file_path, path_file_output):
+            path_file_output = ""
+        # Stream the cleared data into the output file, or rewrite
+        # compressed files through streams
+        if (path_file_output == "") and self._is_stream(file_path) \
+        and (compression_format(file_path) is None):
+            path_file_output = "-"
+        if (path_file_output != "") \
+        or (compression_format(file_path) is not None):
+            return self._rewrite_stream(file_path, address, num_bytes, 0xFF,
+                                        path_file_output=path_file_output)
+        # Get the file size and check it
+        try:
+            file_size = os_stat(file_path).st_size
+        except Exception:
+            logger.error(format_exc())
             print(f"Fail to read source binary file {file_path}")
             return False
-        if address >= len(file_bytes):
+        if address >= file_size:
             logger.error("Address higher than file content")
             return False
         # Limit size of bytes to use if request more than file size
-        file_size = len(file_bytes)
         if address + num_bytes > file_size:
             num_bytes = file_size - address
-        # Clear the data
-        clear_bytes = bytearray([0xFF] * num_bytes)
-        bytes_to_write = bytearray()
-        if address == 0:
-            bytes_to_write.extend(clear_bytes)
-            bytes_to_write.extend(file_bytes[num_bytes:])
-        else:
-            bytes_to_write.extend(file_bytes[:address])
-            bytes_to_write.extend(clear_bytes)
-            bytes_to_write.extend(file_bytes[address+num_bytes:])
-        # Write data to file
-        return self._write_file(file_path, bytes_to_write)
+        # Clear the data in place (only the requested range is written)
+        try:
+            with open(file_path, "r+b") as bin_file_writer:
+                bin_file_writer.seek(address)
+                self._write_fill(bin_file_writer, num_bytes, 0xFF)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to write binary file {file_path}\n")
+            return False
+        return True
 
 
     def extract_data(self, path_file_input: str, address: int, num_bytes: int,
-                     path_file_output: str):
+                     path_file_output: str, base_address: int = 0):
         '''
         Extract data from provided binary file and specified address into a
-        new binary file.
+        new binary file. Intel HEX and S-record files are supported (by
+        extension), where the address is relative to the base address.
         '''
         # Check arguments
         if path_file_input == "" or path_file_output == "":
             logger.error("Files path required to extract data from bin file")
             return False
-        # If number of bytes is zero, use file full size from address
-        if num_bytes == 0:
-            num_bytes = os_stat(path_file_input).st_size - address
-        # Read the full file content and check it
-        file_bytes = self._read_file(path_file_input)
-        if file_bytes is None:
-            print(f"Fail to read source binary file {path_file_input}")
-            return False
-        # Get the requested data section and write it to file
-        extract_bytes = file_bytes[address:num_bytes]
-        return self._write_file(path_file_output, extract_bytes)
+        # Use the sparse image model for HEX and S-record files
+        if (sparse_format(path_file_input) is not None) \
+        or (sparse_format(path_file_output) is not None):
+            return self._extract_sparse(path_file_input, address, num_bytes,
+                                        path_file_output, base_address)
+        # Extract the requested data section into the output file
+        return self.split_regions(path_file_input,
+                                  [(address, num_bytes, path_file_output)])
 
 
     def join_files(self, path_file_src: str, address_file_src: int,
                   num_bytes: int, path_file_target: str,
-                  address_file_target: int):
+                  address_file_target: int, base_address: int = 0,
+                  check_blank: bool = False, erase_value: int = 0xFF):
         '''
         Insert binary data from a source binary file, by address and
         number of bytes, into a target binary file address. The target
-        file data will be overwritten.
+        file data will be overwritten, unless check blank is requested,
+        which fails if the target range is not erased. Intel HEX and
+        S-record files are supported (by extension), where addresses are
+        relative to the base address.
         '''
         # Check arguments
         if path_file_src == "" or path_file_target == "":
             logger.error("Files path required to join bin file")
             return False
-        # If number of bytes is zero, use source file full size
-        if num_bytes == 0:
-            num_bytes = os_stat(path_file_src).st_size
-        # Read the full source file content and check it
-        file_src_bytes = self._read_file(path_file_src)
-        if file_src_bytes is None:
+        # Use the sparse image model for HEX and S-record files
+        if (sparse_format(path_file_src) is not None) \
+        or (sparse_format(path_file_target) is not None):
+            return self._join_sparse(path_file_src, address_file_src,
+                                     num_bytes, path_file_target,
+                                     address_file_target, base_address,
+                                     check_blank, erase_value)
+        # Stream the data if the source is a stream or any of the files is
+        # compressed
+        if self._is_stream(path_file_src) \
+        or (compression_format(path_file_target) is not None):
+            return self._join_stream(path_file_src, address_file_src,
+                                     num_bytes, path_file_target,
+                                     address_file_target, check_blank,
+                                     erase_value)
+        # Get the source file size and check it
+        try:
+            file_src_size = os_stat(path_file_src).st_size
+        except Exception:
+            logger.error(format_exc())
             print(f"Fail to read source binary file {path_file_src}")
             return False
-        file_src_size = len(file_src_bytes)
+        # If number of bytes is zero, use source file full size
+        if num_bytes == 0:
+            num_bytes = file_src_size
         if address_file_src >= file_src_size:
             print(f"Address requested to read from source binary file larger "
                   f"than file size (max address: 0x{file_src_size - 1:02x}")
@@ -188,36 +784,28 @@ class BinEdit():
         # Limit size of bytes to read if request more than file size
         if address_file_src + num_bytes > file_src_size:
             num_bytes = file_src_size - address_file_src
-        # Read the full target file content and check it
-        file_target_bytes = self._read_file(path_file_target)
-        if file_target_bytes is None:
-            print(f"Fail to read target binary file {path_file_target}")
-            return False
-        file_target_size = len(file_target_bytes)
-        # Fix address to end of target file if large address requested
-        src_bytes = bytearray()
-        num_padding_bytes = 0
-        if address_file_target > file_target_size:
-            num_padding_bytes = address_file_target - file_target_size
-            src_bytes = bytearray([0xFF] * (num_padding_bytes))
-        # Join binary files data
-        src_bytes.extend(
-            file_src_bytes[address_file_src:address_file_src+num_bytes])
-        num_bytes = num_bytes + num_padding_bytes
-        join_bytes = bytearray()
-        if address_file_target == 0:
-            join_bytes.extend(src_bytes)
-            join_bytes.extend(file_target_bytes[num_bytes:])
-        elif address_file_target >= file_target_size:
-            join_bytes.extend(file_target_bytes)
-            join_bytes.extend(src_bytes)
-        else:
-            join_bytes.extend(file_target_bytes[:address_file_target])
-            join_bytes.extend(src_bytes)
-            join_bytes.extend(
-                file_target_bytes[address_file_target+num_bytes:])
-        # Write data to file
-        return self._write_file(path_file_target, join_bytes)
+        if check_blank and (not self._check_blank(path_file_target,
+                address_file_target, num_bytes, erase_value, base_address)):
+            return False
+        # Write the source data into the target file address (only the
+        # source data range and any needed padding is written)
+        try:
+            with open(path_file_src, "rb") as bin_file_reader, \
+                 open(path_file_target, "r+b") as bin_file_writer:
+                file_target_size = bin_file_writer.seek(0, SEEK_END)
+                # Pad with 0xFF up to the address if it is out of target
+                if address_file_target > file_target_size:
+                    self._write_fill(bin_file_writer,
+                        address_file_target - file_target_size, 0xFF)
+                bin_file_reader.seek(address_file_src)
+                bin_file_writer.seek(address_file_target)
+                self._copy_data(bin_file_reader, bin_file_writer, num_bytes)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to join binary file {path_file_src} into "
+                         f"{path_file_target}\n")
+            return False
+        return True
 
 
     def split_files(self, path_file_input: str, address: int,
@@ -235,124 +823,1887 @@ class BinEdit():
         if address == 0:
             logger.error("Invalid address")
             return False
-        # Read the full file content and check it
-        file_bytes = self._read_file(path_file_input)
-        if file_bytes is None:
+        # Split the data into both files
+        return self.split_regions(path_file_input,
+                                  [(0, address, path_file_output_1),
+                                   (address, 0, path_file_output_2)])
+
+
+    def split_regions(self, path_file_input: str, regions: list):
+        '''
+        Extract multiple address regions of the provided binary file into
+        new binary files in a single pass over the input file. Each
+        region is a tuple of (address, number of bytes, output file path),
+        where a number of bytes of zero means up to the end of the file.
+        '''
+        # Check arguments
+        if path_file_input == "":
+            logger.error("Files path required to split bin file")
+            return False
+        for address, num_bytes, path_file_output in regions:
+            if path_file_output == "":
+                logger.error("Files path required to split bin file")
+                return False
+        # Get the file size and check regions (unknown for streams)
+        try:
+            file_size = None
+            if not self._is_stream(path_file_input):
+                file_size = os_stat(path_file_input).st_size
+        except Exception:
+            logger.error(format_exc())
             print(f"Fail to read binary file {path_file_input}")
             return False
-        file_size = len(file_bytes)
-        if address >= file_size:
-            print(f"Address requested to read from binary file larger "
-                  f"than file size (max address: 0x{file_size - 1:02x}")
+        for address, num_bytes, path_file_output in regions:
+            if (file_size is not None) and (address >= file_size):
+                print(f"Address requested to read from binary file larger "
+                      f"than file size (max address: 0x{file_size - 1:02x}")
+                return False
+        # Copy each region (in address order) into its output file, where
+        # streams are read in a single pass (compressed files are reopened
+        # if regions overlap)
+        try:
+            with ExitStack() as stack:
+                bin_file_reader = stack.enter_context(
+                    self._open_input(path_file_input))
+                for address, num_bytes, path_file_output in sorted(
+                        regions, key=lambda region: region[0]):
+                    if file_size is None:
+                        if num_bytes == 0:
+                            num_bytes = sys.maxsize
+                        if address < bin_file_reader.tell():
+                            if compression_format(path_file_input) is None:
+                                raise ValueError("Overlapped regions can't "
+                                                 "be read from a stream")
+                            stack.close()
+                            bin_file_reader = stack.enter_context(
+                                self._open_input(path_file_input))
+                        to_skip = address - bin_file_reader.tell()
+                        if self._skip_stream(bin_file_reader, to_skip) \
+                                < to_skip:
+                            print("Address requested to read from binary "
+                                  "file larger than file size")
+                            return False
+                    else:
+                        # Limit size of bytes to read up to the end of file
+                        if (num_bytes == 0) \
+                        or (address + num_bytes > file_size):
+                            num_bytes = file_size - address
+                        bin_file_reader.seek(address)
+                    with self._open_output(path_file_output) \
+                         as bin_file_writer:
+                        self._copy_data(bin_file_reader, bin_file_writer,
+                                        num_bytes)
+        except BrokenPipeError:
+            # The output reader has finished (i.e. "binedit ... | head")
             return False
-        # Split the data and write to files
-        bytes_1 = file_bytes[:address-1]
-        bytes_2 = file_bytes[address:]
-        write_success = []
-        write_success.append(self._write_file(path_file_output_1, bytes_1))
-        write_success.append(self._write_file(path_file_output_2, bytes_2))
-        if False in write_success:
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to split binary file {path_file_input}\n")
             return False
         return True
 
 
-    def show_file(self, file_path: str, from_address: int,
-                  num_bytes: int, addr_offset: int):
+    def clear_buffer(self, data, address: int, num_bytes: int,
+                     fill_value: int = 0xFF):
         '''
-        Show in hexadecimal and ascii, the content of a binary file
-        from given address up to specified size of bytes.
+        Clear data bytes of a writable bytes-like object (i.e. bytearray,
+        writable memoryview or mmap) in place, at the specified address
+        and number of bytes (clear means set to the fill value, 0xFF by
+        default). Returns a memoryview of the cleared range.
         '''
-        # Check arguments
-        if file_path == "":
-            logger.error("File path required to create bin file")
-            return False
-        # Read the full file content and check it
-        file_bytes = self._read_file(file_path)
-        if file_bytes is None:
-            print(f"Fail to read binary file {file_path}")
-            return False
-        file_size = len(file_bytes)
-        if from_address >= file_size:
-            print(f"Address requested to read from binary file larger "
-                  f"than file size (max address: 0x{file_size - 1:02x}")
-            return False
-        # Limit size of bytes to read if request more than file size
         if num_bytes == 0:
-            num_bytes = file_size
-        if from_address + num_bytes > file_size:
-            num_bytes = file_size - from_address
-        # Show the bytes
-        show_bytes = file_bytes[from_address:from_address+num_bytes]
-        print("\n".join(self.hexdump(show_bytes, addr_offset, 16, 2)))
-        return True
+            logger.error("Number of bytes required to clear buffer")
+            return None
+        view = self._buffer_view(data, address, num_bytes, True)
+        if view is None:
+            return None
+        fill_chunk = bytes([fill_value]) * min(len(view), CHUNK_SIZE)
+        for offset in range(0, len(view), CHUNK_SIZE):
+            chunk_end = min(offset + CHUNK_SIZE, len(view))
+            view[offset:chunk_end] = fill_chunk[:chunk_end - offset]
+        return view
 
 
-    def hexdump(self, src: bytes, addr_offs: int = 0,
-                bytes_per_line: int = 16, bytes_per_group: int = 4,
-                sep: str = '.'):
+    def extract_buffer(self, data, address: int, num_bytes: int = 0):
         '''
-        Convert a byte array into a string that contains an
-        hexadecimal and ascii representation format of the bytes.
+        Get the data of a bytes-like object address range (a number of
+        bytes of zero means up to the end of the data), as a memoryview
+        of it (no data is copied).
         '''
-        FILTER = "".join([(len(repr(chr(x))) == 3) and chr(x)
-                          or sep for x in range(256)])
-        lines = []
-        max_addr_len = len(hex(len(src)))
-        if 8 > max_addr_len:
-            max_addr_len = 8
-        for addr in range(0, len(src), bytes_per_line):
-            hex_str = ""
-            ascii_str = ""
-            # The chars we need to process for this line
-            chars = src[addr : addr + bytes_per_line]
-            # Create hex string
-            tmp = "".join(["{:02X}".format(x) for x in chars])
-            idx = 0
-            for c in tmp:
-                hex_str = hex_str + c
-                idx = idx + 1
-                # 2 hex digits per byte
-                if idx % bytes_per_group * 2 == 0 and idx < bytes_per_line * 2:
-                    hex_str = hex_str + " "
-            # Pad out the line to fill up the line to take up the right
-            # amount of space to line up with a full line
-            hex_str = hex_str.ljust(
-                (bytes_per_line * 2)
-                + int(bytes_per_line * 2 / bytes_per_group)
-                - 1)
-            # create ascii_str string
-            tmp = "".join(
-                ["{}".format((x <= 127 and FILTER[x]) or sep) for x in chars])
-            # insert space every bytes_per_group
-            idx = 0
-            for c in tmp:
-                ascii_str = ascii_str + c
-                idx = idx + 1
-            _addr = addr + addr_offs
-            line_str = f"{_addr:0{max_addr_len}X}  {hex_str}  | {ascii_str} |"
-            lines.append(line_str)
-        return lines
+        return self._buffer_view(data, address, num_bytes)
 
 
-    def _read_file(self, file_path: str):
-        '''Read full content of a binary file.'''
-        read_bytes = None
+    def join_buffer(self, data_src, address_src: int, num_bytes: int,
+                    data_target, address_target: int):
+        '''
+        Insert data from a source bytes-like object address range (a
+        number of bytes of zero means up to the end of the data) into a
+        writable target one address, overwriting its data. A bytearray
+        target is extended (padded with 0xFF) if required, while other
+        targets must be large enough. Returns a memoryview of the
+        written target range.
+        '''
+        view_src = self._buffer_view(data_src, address_src, num_bytes)
+        if view_src is None:
+            return None
+        target_size = len(memoryview(data_target))
+        end = address_target + len(view_src)
+        if end > target_size:
+            if not isinstance(data_target, bytearray):
+                logger.error(f"Target buffer too small (size: {target_size},"
+                             f" required: {end})")
+                return None
+            try:
+                data_target.extend(b"\xFF" * (end - target_size))
+            except BufferError:
+                logger.error(format_exc())
+                logger.error("Fail to extend target buffer (it has views)")
+                return None
+        view_target = self._buffer_view(data_target, address_target,
+                                        len(view_src), True)
+        if view_target is None:
+            return None
+        view_target[:] = view_src
+        return view_target
+
+
+    def split_buffer(self, data, address: int):
+        '''
+        Split a bytes-like object by specified address into two parts.
+        Returns the memoryviews of both parts (no data is copied).
+        '''
+        if address == 0:
+            logger.error("Invalid address")
+            return None
+        view_1 = self._buffer_view(data, 0, address)
+        view_2 = self._buffer_view(data, address)
+        if (view_1 is None) or (view_2 is None):
+            return None
+        return (view_1, view_2)
+
+
+    def _buffer_view(self, data, address: int, num_bytes: int = 0,
+                     writable: bool = False):
+        '''
+        Get a bytes memoryview of a bytes-like object address range (a
+        number of bytes of zero means up to the end of the data), that
+        is limited to the data size. Returns None if the range is out of
+        the data or a writable view is required for read-only data.
+        '''
         try:
-            with open(file_path, "rb") as bin_file_reader:
-                read_bytes = bin_file_reader.read()
-        except Exception:
+            view = memoryview(data).cast("B")
+        except (TypeError, ValueError):
             logger.error(format_exc())
-            logger.error(f"Fail to read binary file {file_path}\n")
-        return read_bytes
+            logger.error("Invalid buffer, a contiguous bytes-like object "
+                         "is required")
+            return None
+        if writable and view.readonly:
+            logger.error("Invalid buffer, a writable bytes-like object is "
+                         "required")
+            return None
+        if address >= len(view):
+            print(f"Address requested to read from buffer larger than "
+                  f"buffer size (max address: 0x{len(view) - 1:02x}")
+            return None
+        if (num_bytes == 0) or (address + num_bytes > len(view)):
+            num_bytes = len(view) - address
+        return view[address:address + num_bytes]
 
 
-    def _write_file(self, file_path: str, data: bytearray):
-        '''Write to a binary file.'''
+    def blank_map(self, file_path: str, address: int = 0,
+                  num_bytes: int = 0, erase_value: int = 0xFF,
+                  sector_size: int = 1, base_address: int = 0):
+        '''
+        Get the used and erased (full of the erase value) ranges of a
+        binary file address range (a number of bytes of zero means up to
+        the end of the file). Used ranges are extended to the sector
+        size boundaries (relative to address zero). The file is memory
+        mapped and scanned by chunks, where fully erased chunks are
+        detected with a single comparison. Intel HEX and S-record files
+        are supported (by extension), where gaps are erased ranges.
+        Returns a dictionary with the lists of "used" and "erased" ranges
+        as (start address, end address) tuples.
+        '''
+        # Check arguments
+        if file_path == "":
+            logger.error("File path required to get blank map of bin file")
+            return None
+        if sector_size < 1:
+            logger.error("Invalid sector size")
+            return None
+        # Get the used ranges of the file data
         try:
-            with open(file_path, "wb") as bin_file_writer:
-                bin_file_writer.write(data)
+            if sparse_format(file_path) is not None:
+                image, abs_address = self._load_sparse_range(file_path,
+                    address, num_bytes, base_address)
+                end = abs_address + num_bytes
+                if num_bytes == 0:
+                    end = max(image.max_address, abs_address)
+                used = []
+                for start, segment in image.segments_in(abs_address, end):
+                    used.extend([(start - base_address + used_start,
+                                  start - base_address + used_end)
+                                 for used_start, used_end in self._used_ranges(
+                                     segment, 0, len(segment), erase_value)])
+                end = end - base_address
+            else:
+                file_size = os_stat(file_path).st_size
+                if address >= file_size:
+                    print(f"Address requested to read from binary file "
+                          f"larger than file size (max address: "
+                          f"0x{file_size - 1:02x}")
+                    return None
+                # Limit size of bytes to read if request more than file size
+                if (num_bytes == 0) or (address + num_bytes > file_size):
+                    num_bytes = file_size - address
+                end = address + num_bytes
+                with self._file_data(file_path) as file_data:
+                    used = self._used_ranges(file_data, address, end,
+                                             erase_value)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to get blank map of binary file {file_path}\n")
+            return None
+        # Extend used ranges to sectors boundaries and merge them
+        sectors = []
+        for used_start, used_end in used:
+            used_start = max(used_start - used_start % sector_size, address)
+            used_end = min(used_end + (-used_end % sector_size), end)
+            if sectors and (used_start <= sectors[-1][1]):
+                sectors[-1] = (sectors[-1][0], used_end)
+            else:
+                sectors.append((used_start, used_end))
+        # The erased ranges are the gaps between the used ones
+        erased = []
+        erased_start = address
+        for used_start, used_end in sectors:
+            if used_start > erased_start:
+                erased.append((erased_start, used_start))
+            erased_start = used_end
+        if erased_start < end:
+            erased.append((erased_start, end))
+        return {"used": sectors, "erased": erased}
+
+
+    def _used_ranges(self, data, start: int, end: int,
+                    erase_value: int = 0xFF):
+        '''
+        Get the coalesced ranges of non-erased bytes of a data buffer
+        range, as a list of (start offset, end offset) tuples. Erased
+        chunks are skipped with a single comparison against a prebuilt
+        erased block, and the runs of the other chunks are found by a
+        regular expression (so no bytes are handled in Python loops).
+        '''
+        erased_block = bytes([erase_value]) * CHUNK_SIZE
+        used_regex = _used_regex(erase_value)
+        used = []
+        with memoryview(data) as data_view:
+            for offset in range(start, end, CHUNK_SIZE):
+                chunk_end = min(offset + CHUNK_SIZE, end)
+                if chunk_end - offset < CHUNK_SIZE:
+                    erased_block = erased_block[:chunk_end - offset]
+                if bytes(data_view[offset:chunk_end]) == erased_block:
+                    continue
+                for match in used_regex.finditer(data, offset, chunk_end):
+                    if used and (used[-1][1] == match.start()):
+                        used[-1] = (used[-1][0], match.end())
+                    else:
+                        used.append((match.start(), match.end()))
+        return used
+
+
+    def blank_map_file(self, file_path: str, address: int = 0,
+                       num_bytes: int = 0, erase_value: int = 0xFF,
+                       sector_size: int = 1, base_address: int = 0):
+        '''
+        Show the used and erased ranges of a binary file address range,
+        with addresses relative to the base address.
+        '''
+        blank_map = self.blank_map(file_path, address, num_bytes,
+                                   erase_value, sector_size, base_address)
+        if blank_map is None:
+            return False
+        ranges = [(start, end, "used") for start, end in blank_map["used"]]
+        ranges.extend([(start, end, "erased")
+                       for start, end in blank_map["erased"]])
+        for start, end, state in sorted(ranges):
+            print(f"0x{base_address + start:08X}-"
+                  f"0x{base_address + end - 1:08X} {state:<6} "
+                  f"({end - start} bytes)")
+        return True
+
+
+    def _check_blank(self, file_path: str, address: int, num_bytes: int,
+                     erase_value: int = 0xFF, base_address: int = 0):
+        '''
+        Check that a target file address range is erased before writing
+        into it (bytes out of the file data are considered erased).
+        '''
+        if not os_path.exists(file_path):
+            return True
+        if sparse_format(file_path) is None:
+            file_size = os_stat(file_path).st_size
+            if address >= file_size:
+                return True
+            num_bytes = min(num_bytes, file_size - address)
+        blank_map = self.blank_map(file_path, address, num_bytes,
+                                   erase_value, 1, base_address)
+        if blank_map is None:
+            return False
+        if blank_map["used"]:
+            start, end = blank_map["used"][0]
+            print(f"Target binary file {file_path} range is not blank "
+                  f"(used data at 0x{base_address + start:08X}-"
+                  f"0x{base_address + end - 1:08X})")
+            return False
+        return True
+
+
+    def stats(self, file_path: str, address: int = 0, num_bytes: int = 0,
+              block_size: int = STATS_BLOCK_SIZE):
+        '''
+        Get the byte statistics of a binary file address range (a number
+        of bytes of zero means up to the end of the file): the byte
+        values histogram, and the Shannon entropy (bits per byte) and
+        fractions of 0x00 and 0xFF bytes of the whole range and of each
+        block of it. The file is read by chunks of whole blocks, where
+        the statistics of all the blocks of a chunk are computed in bulk
+        (see bineditstats). Compressed files are supported.
+        Returns a dictionary with the range "address", "size",
+        "histogram", "entropy", "fraction_00" and "fraction_ff", and the
+        list of "blocks" with their "address", "size", "entropy",
+        "fraction_00" and "fraction_ff".
+        '''
+        # Check arguments
+        if file_path == "":
+            logger.error("File path required to get stats of bin file")
+            return None
+        if block_size < 1:
+            logger.error("Invalid block size")
+            return None
+        histogram = [0] * 256
+        blocks = []
+        block_address = address
+        chunk_size = max(CHUNK_SIZE // block_size, 1) * block_size
+        try:
+            if not self._is_stream(file_path):
+                file_size = os_stat(file_path).st_size
+                if address >= file_size:
+                    print(f"Address requested to read from binary file "
+                          f"larger than file size (max address: "
+                          f"0x{file_size - 1:02x}")
+                    return None
+            chunks = self._read_chunks(file_path, address, num_bytes,
+                                       chunk_size)
+            with closing(chunks):
+                while True:
+                    with self._phase("read"):
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    with self._phase("stats"):
+                        chunk_histogram, chunk_blocks = \
+                            block_stats(chunk, block_size)
+                    for value, count in enumerate(chunk_histogram):
+                        histogram[value] = histogram[value] + count
+                    for size, bits, zeros, ffs in chunk_blocks:
+                        blocks.append({
+                            "address": block_address,
+                            "size": size,
+                            "entropy": bits,
+                            "fraction_00": zeros / size,
+                            "fraction_ff": ffs / size
+                        })
+                        block_address = block_address + size
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to get stats of binary file {file_path}\n")
+            return None
+        size = block_address - address
+        if size == 0:
+            print("Address requested to read from binary file larger than "
+                  "file size")
+            return None
+        return {
+            "address": address,
+            "size": size,
+            "histogram": histogram,
+            "entropy": entropy(histogram, size),
+            "fraction_00": histogram[0x00] / size,
+            "fraction_ff": histogram[0xFF] / size,
+            "blocks": blocks
+        }
+
+
+    def stats_file(self, file_path: str, address: int = 0,
+                   num_bytes: int = 0, block_size: int = STATS_BLOCK_SIZE,
+                   base_address: int = 0):
+        '''
+        Show the byte statistics of a binary file address range (see
+        stats()): the whole range summary and histogram, and a line per
+        block with its entropy (value and entropy ramp character) and
+        fractions of 0x00 and 0xFF bytes, with addresses relative to the
+        base address.
+        '''
+        stats = self.stats(file_path, address, num_bytes, block_size)
+        if stats is None:
+            return False
+        try:
+            start = base_address + stats["address"]
+            end = start + stats["size"] - 1
+            print(f"Range: 0x{start:08X}-0x{end:08X} ({stats['size']} bytes)")
+            print(f"Entropy: {stats['entropy']:.4f} bits/byte")
+            print(f"0x00: {stats['fraction_00'] * 100:.2f} %")
+            print(f"0xFF: {stats['fraction_ff'] * 100:.2f} %")
+            print("Histogram:")
+            count_len = len(str(max(stats["histogram"])))
+            for value in range(0, 256, 16):
+                counts = " ".join([f"{count:>{count_len}}" for count
+                                   in stats["histogram"][value:value + 16]])
+                print(f"  {value:02X}: {counts}")
+            print(f"Blocks ({block_size} bytes):")
+            for block in stats["blocks"]:
+                start = base_address + block["address"]
+                end = start + block["size"] - 1
+                print(f"  0x{start:08X}-0x{end:08X} "
+                      f"{entropy_char(block['entropy'])} "
+                      f"entropy {block['entropy']:.4f} "
+                      f"0x00 {block['fraction_00'] * 100:6.2f} % "
+                      f"0xFF {block['fraction_ff'] * 100:6.2f} %")
+        except BrokenPipeError:
+            # The output reader has finished (i.e. "binedit ... | head")
+            return True
+        return True
+
+
+    def diff_files(self, path_file_old: str, path_file_new: str,
+                   path_file_patch: str, block_size: int = BLOCK_SIZE):
+        '''
+        Create a patch file with the differences between an old and a new
+        binary file (i.e. for firmware updates), where data blocks of the
+        old file found in the new one are stored as copy operations.
+        '''
+        # Check arguments
+        if (path_file_old == "") or (path_file_new == "") \
+        or (path_file_patch == ""):
+            logger.error("Files path required to diff bin files")
+            return False
+        if block_size == 0:
+            logger.error("Invalid block size")
+            return False
+        # Create the patch
+        try:
+            create_patch(path_file_old, path_file_new, path_file_patch,
+                         block_size)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to create patch file {path_file_patch}\n")
+            return False
+        return True
+
+
+    def patch_file(self, path_file_old: str, path_file_patch: str,
+                   path_file_output: str = ""):
+        '''
+        Apply a patch file (see diff_files()) to an old binary file, into
+        an output binary file (or in place if no output file is given),
+        writing only the changed ranges.
+        '''
+        # Check arguments
+        if (path_file_old == "") or (path_file_patch == ""):
+            logger.error("Files path required to patch bin file")
+            return False
+        if path_file_output == "":
+            path_file_output = path_file_old
+        # Apply the patch
+        try:
+            apply_patch(self, path_file_old, path_file_patch,
+                        path_file_output)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to apply patch file {path_file_patch}\n")
+            return False
+        return True
+
+
+    def checksum(self, file_path: str, address: int = 0, num_bytes: int = 0,
+                 algorithms: tuple = ("crc32",), stamp_address: int = None,
+                 stamp_byteorder: str = "little", workers: int = 0):
+        '''
+        Compute checksums (CRC32, CRC catalog algorithms, or any hashlib
+        algorithm) of a binary file address range (a number of bytes of
+        zero means up to the end of the file). The file is memory mapped
+        and the checksums are computed by chunks in a thread pool, where
+        CRC32 is split in parts computed in parallel and then combined.
+        If a stamp address is provided, the first checksum is written
+        into it (CRC values with the given byte order).
+        Returns a dictionary with the checksum bytes of each algorithm.
+        '''
+        # Check arguments
+        if file_path == "":
+            logger.error("File path required to checksum bin file")
+            return None
+        if len(algorithms) == 0:
+            logger.error("Checksum algorithm required")
+            return None
+        try:
+            checksums = {algorithm: new_checksum(algorithm)
+                         for algorithm in algorithms}
+        except ValueError as error:
+            logger.error(error)
+            return None
+        # Streams and compressed files are read sequentially
+        if self._is_stream(file_path):
+            if stamp_address is not None:
+                logger.error("Checksum stamp is not supported for "
+                             "streams and compressed files")
+                return None
+            return self._checksum_stream(file_path, address, num_bytes,
+                                         checksums)
+        try:
+            file_size = os_stat(file_path).st_size
+        except Exception:
+            logger.error(format_exc())
+            print(f"Fail to read binary file {file_path}")
+            return None
+        if address >= file_size:
+            print(f"Address requested to read from binary file larger "
+                  f"than file size (max address: 0x{file_size - 1:02x}")
+            return None
+        # Limit size of bytes to read if request more than file size
+        if (num_bytes == 0) or (address + num_bytes > file_size):
+            num_bytes = file_size - address
+        if (stamp_address is not None) \
+        and (stamp_address < address + num_bytes) \
+        and (stamp_address + checksums[algorithms[0]].digest_size > address):
+            logger.error("Stamp address inside the checksum address range")
+            return None
+        # Compute the checksums
+        if workers == 0:
+            workers = cpu_count() or 1
+        try:
+            with self._file_data(file_path) as file_data, \
+                 ThreadPoolExecutor(workers) as pool:
+                crc32_parts = {}
+                futures = {}
+                for algorithm, checksum in checksums.items():
+                    if algorithm.lower() != "crc32":
+                        futures[algorithm] = pool.submit(self._checksum_range,
+                            file_data, address, num_bytes, checksum)
+                        continue
+                    # Split CRC32 in parts to compute them in parallel
+                    crc32_parts[algorithm] = []
+                    part_size = max(CHUNK_SIZE, -(-num_bytes // workers))
+                    for part in range(address, address + num_bytes,
+                                      part_size):
+                        part_checksum = new_checksum("crc32")
+                        part_bytes = min(part_size,
+                                         address + num_bytes - part)
+                        crc32_parts[algorithm].append((part_checksum,
+                            part_bytes,
+                            pool.submit(self._checksum_range, file_data,
+                                        part, part_bytes, part_checksum)))
+                    futures[algorithm] = None
+                digests = {}
+                for algorithm, future in futures.items():
+                    if future is not None:
+                        future.result()
+                        digests[algorithm] = checksums[algorithm].digest()
+                        continue
+                    value = 0
+                    for part_checksum, part_bytes, part_future in \
+                            crc32_parts[algorithm]:
+                        part_future.result()
+                        value = crc32_combine(value, part_checksum.value,
+                                              part_bytes)
+                    digests[algorithm] = value.to_bytes(4, "big")
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to checksum binary file {file_path}\n")
+            return None
+        # Write the first checksum into the stamp address
+        if stamp_address is not None:
+            stamp = digests[algorithms[0]]
+            if (stamp_byteorder == "little") \
+            and isinstance(checksums[algorithms[0]], (Crc, ZlibChecksum)):
+                stamp = stamp[::-1]
+            try:
+                with open(file_path, "r+b") as bin_file_writer:
+                    bin_file_writer.seek(stamp_address)
+                    bin_file_writer.write(stamp)
+            except Exception:
+                logger.error(format_exc())
+                logger.error(f"Fail to write binary file {file_path}\n")
+                return None
+        return digests
+
+
+    def _checksum_stream(self, file_path: str, address: int,
+                         num_bytes: int, checksums: dict):
+        '''
+        Compute checksums of a stream (i.e. compressed) binary file
+        address range, by chunks read sequentially.
+        Returns a dictionary with the checksum bytes of each algorithm.
+        '''
+        read_bytes = 0
+        try:
+            for chunk in self._read_chunks(file_path, address, num_bytes):
+                for checksum in checksums.values():
+                    checksum.update(chunk)
+                read_bytes = read_bytes + len(chunk)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to checksum binary file {file_path}\n")
+            return None
+        if read_bytes == 0:
+            print("Address requested to read from binary file larger than "
+                  "file size")
+            return None
+        return {algorithm: checksum.digest()
+                for algorithm, checksum in checksums.items()}
+
+
+    def _checksum_range(self, file_data, address: int, num_bytes: int,
+                        checksum):
+        '''
+        Feed a range of a memory mapped file to a checksum object by
+        chunks. Used as thread pool task, so the checksum must release
+        the GIL (as hashlib and zlib do) to run in parallel.
+        '''
+        with memoryview(file_data) as file_view:
+            for offset in range(address, address + num_bytes, CHUNK_SIZE):
+                chunk = file_view[offset:min(offset + CHUNK_SIZE,
+                                             address + num_bytes)]
+                checksum.update(chunk)
+                chunk.release()
+
+
+    def find(self, file_path: str, patterns: list, from_address: int = 0,
+             num_bytes: int = 0, addr_offset: int = 0, workers: int = 0):
+        '''
+        Generator that yields the matches of multiple byte patterns (see
+        bineditfind.Pattern) in a binary file address range (a number of
+        bytes of zero means up to the end of the file), as tuples of
+        (address + address offset, pattern text), in address order.
+        The file is memory mapped, and large ranges are split in chunks
+        searched in parallel by a process pool. Raises ValueError for
+        invalid patterns and OSError if the file can't be read.
+        '''
+        pattern_texts = list(patterns)
+        patterns = [Pattern(text) for text in pattern_texts]
+        file_size = os_stat(file_path).st_size
+        if (num_bytes == 0) or (from_address + num_bytes > file_size):
+            num_bytes = max(file_size - from_address, 0)
+        end = from_address + num_bytes
+        if num_bytes == 0:
+            return
+        if workers == 0:
+            workers = cpu_count() or 1
+        # Small ranges, single worker or cached images, search in this
+        # process
+        if (workers == 1) or (num_bytes <= FIND_CHUNK_SIZE) \
+        or (self.image_cache is not None):
+            with self._file_data(file_path) as file_data:
+                for offset, pattern_num in find_in_data(
+                        file_data, patterns, from_address, end, end):
+                    yield (offset + addr_offset, pattern_texts[pattern_num])
+            return
+        # Search chunks in parallel, yielding the results in order and
+        # keeping a bounded number of pending chunks
+        with ProcessPoolExecutor(workers,
+                                 mp_context=self.process_context) as pool:
+            pending = []
+            chunk_starts = iter(range(from_address, end, FIND_CHUNK_SIZE))
+            for chunk_start in chunk_starts:
+                pending.append(pool.submit(find_in_file, file_path,
+                    pattern_texts, chunk_start,
+                    min(chunk_start + FIND_CHUNK_SIZE, end), end))
+                if len(pending) < workers * 2:
+                    continue
+                for offset, pattern_num in pending.pop(0).result():
+                    yield (offset + addr_offset, pattern_texts[pattern_num])
+            for future in pending:
+                for offset, pattern_num in future.result():
+                    yield (offset + addr_offset, pattern_texts[pattern_num])
+
+
+    def find_file(self, file_path: str, patterns: list, from_address: int,
+                  num_bytes: int, addr_offset: int, workers: int = 0):
+        '''
+        Show the addresses of all the matches of multiple byte patterns
+        in a binary file address range, as they are found.
+        '''
+        # Check arguments
+        if file_path == "":
+            logger.error("File path required to search in bin file")
+            return False
+        if len(patterns) == 0:
+            logger.error("Search pattern required")
+            return False
+        # Search and show the matches
+        try:
+            for address, pattern in self.find(file_path, patterns,
+                                              from_address, num_bytes,
+                                              addr_offset, workers):
+                print(f"0x{address:08X}: {pattern}")
+        except ValueError as error:
+            logger.error(error)
+            return False
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to search in binary file {file_path}\n")
+            return False
+        return True
+
+
+    def compare(self, path_file_a: str, path_file_b: str,
+                from_address: int = 0, num_bytes: int = 0):
+        '''
+        Get the differing ranges of two binary files address range (a
+        number of bytes of zero means up to the end of the largest file),
+        as a list of (start address, end address) tuples, where data
+        out of a file is different from any data of the other one.
+        Both files are memory mapped and compared by blocks, where equal
+        blocks are skipped with a single comparison, and the differing
+        bytes of the other blocks are found from their XOR. Raises
+        OSError if a file can't be read.
+        '''
+        size_a = os_stat(path_file_a).st_size
+        size_b = os_stat(path_file_b).st_size
+        end = max(size_a, size_b)
+        if (num_bytes != 0) and (from_address + num_bytes < end):
+            end = from_address + num_bytes
+        common_end = min(end, size_a, size_b)
+        ranges = []
+        with ExitStack() as stack:
+            data_a = stack.enter_context(self._file_data(path_file_a)) \
+                if size_a else b""
+            data_b = stack.enter_context(self._file_data(path_file_b)) \
+                if size_b else b""
+            for offset in range(from_address, common_end, CHUNK_SIZE):
+                block_end = min(offset + CHUNK_SIZE, common_end)
+                block_a = data_a[offset:block_end]
+                block_b = data_b[offset:block_end]
+                if block_a == block_b:
+                    continue
+                xor_block = (int.from_bytes(block_a, "little")
+                             ^ int.from_bytes(block_b, "little")).to_bytes(
+                                 len(block_a), "little")
+                for start, diff_end in self._used_ranges(xor_block, 0,
+                        len(xor_block), 0x00):
+                    if ranges and (ranges[-1][1] == offset + start):
+                        ranges[-1] = (ranges[-1][0], offset + diff_end)
+                    else:
+                        ranges.append((offset + start, offset + diff_end))
+        # Data out of the smallest file
+        if end > max(common_end, from_address):
+            start = max(common_end, from_address)
+            if ranges and (ranges[-1][1] == start):
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+
+    def compare_files(self, path_file_a: str, path_file_b: str,
+                      from_address: int = 0, num_bytes: int = 0,
+                      addr_offset: int = 0):
+        '''
+        Show the differences of two binary files address range, as
+        paired hexdump lines (first file and second file data) of the
+        lines with differing bytes, and a summary of differing ranges.
+        Returns True if the files are equal, and False if they differ
+        or can't be compared.
+        '''
+        bytes_per_line = 16
+        bytes_per_group = 2
+        # Check arguments
+        if (path_file_a == "") or (path_file_b == ""):
+            logger.error("Files path required to compare bin files")
+            return False
+        # Get the differing ranges and show them
+        try:
+            ranges = self.compare(path_file_a, path_file_b, from_address,
+                                  num_bytes)
+            if not ranges:
+                print("Files are equal")
+                return True
+            addr_len = self._hexdump_addr_len(ranges[-1][1] - from_address)
+            line_len = addr_len + 2 + bytes_per_line * 2 \
+                       + bytes_per_line // bytes_per_group - 1 + 4 \
+                       + bytes_per_line + 2
+            with ExitStack() as stack:
+                datas = [stack.enter_context(self._file_data(file_path))
+                         if os_stat(file_path).st_size else b""
+                         for file_path in (path_file_a, path_file_b)]
+                line = -1
+                for start, end in ranges:
+                    # Show each line with differences once
+                    line = max(line, start - start % bytes_per_line)
+                    while line < end:
+                        lines = []
+                        for data in datas:
+                            chunk = data[line:line + bytes_per_line]
+                            if chunk:
+                                lines.extend(self.hexdump_lines(chunk,
+                                    addr_offset + line, bytes_per_line,
+                                    bytes_per_group, addr_len=addr_len))
+                            else:
+                                lines.append(
+                                    f"{addr_offset + line:0{addr_len}X}")
+                        print(f"{lines[0]:<{line_len}}  "
+                              f"{lines[1][addr_len + 2:]}".rstrip())
+                        line = line + bytes_per_line
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to compare binary files {path_file_a} and "
+                         f"{path_file_b}\n")
+            return False
+        # Show the summary of differing ranges
+        diff_bytes = sum([end - start for start, end in ranges])
+        print(f"\nDiffering ranges: {len(ranges)} ({diff_bytes} bytes)")
+        for start, end in ranges:
+            print(f"0x{addr_offset + start:08X}-0x{addr_offset + end - 1:08X}"
+                  f" ({end - start} bytes)")
+        return False
+
+
+    def batch(self, inputs: list, operation: str, options: dict = None,
+              workers: int = 0):
+        '''
+        Run an operation (show, get, clear, checksum or find) over many
+        binary files in parallel with a process pool, where inputs are
+        file paths or glob patterns. Options are the operation arguments:
+        "address", "size", "base_address", "output" (path template for
+        get, and optionally for show, with "{name}" and "{stem}" of the
+        input file), "algorithms" (for checksum) and "patterns" (for
+        find). Without an output template, the output of each file kept
+        in the report is limited to BATCH_OUTPUT_LIMIT characters.
+        Errors of a file doesn't abort the batch, and a report dictionary
+        with the result, output and errors of each file is returned.
+        '''
+        if options is None:
+            options = {}
+        report = {"operation": operation, "files": 0, "failed": 0,
+                  "results": []}
+        # Check arguments
+        if operation not in BATCH_OPERATIONS:
+            logger.error(f"Invalid batch operation: {operation}")
+            return None
+        if (operation == "get") and (options.get("output", "") == ""):
+            logger.error("Output path template required to get data")
+            return None
+        # Get the files list (expanding glob patterns)
+        file_paths = []
+        for path in inputs:
+            path_matches = sorted(glob(path))
+            if not path_matches:
+                path_matches = [path]
+            file_paths.extend(path_matches)
+        if workers == 0:
+            workers = cpu_count() or 1
+        # Run the operation on each file
+        with ProcessPoolExecutor(workers,
+                                 mp_context=self.process_context) as pool:
+            futures = [pool.submit(_batch_task, operation, file_path, options)
+                       for file_path in file_paths]
+            for file_path, future in zip(file_paths, futures):
+                try:
+                    result = future.result()
+                except Exception:
+                    result = {"file": file_path, "success": False,
+                              "output": "", "errors": format_exc()}
+                report["results"].append(result)
+                report["files"] = report["files"] + 1
+                if not result["success"]:
+                    report["failed"] = report["failed"] + 1
+        return report
+
+
+    def stamp_variants(self, path_file_base: str, path_file_values: str,
+                       path_output_template: str, fields: dict,
+                       workers: int = 0):
+        '''
+        Generate per-device variants of a base binary file, stamping the
+        field values of each row of a CSV or JSONL file (i.e. serial
+        number, MAC, calibration data) into the given addresses.
+        Fields are a dictionary of name: (address, type), where the type
+        is "hex", "ascii" or an integer type (u8, u16le, u32be, etc.).
+        The output path template is formatted with the row values and
+        "{index}" (row number). Each output is cloned from the base file
+        (reflink sharing the data blocks, or kernel-side copy when not
+        supported, or a write of the base data loaded once), and then
+        only the field bytes are written. Outputs are generated by a
+        thread pool, and errors of a row doesn't abort the generation.
+        Returns a report dictionary with the errors of each failed row.
+        '''
+        report = {"files": 0, "failed": 0, "errors": []}
+        # Check arguments
+        if (path_file_base == "") or (path_file_values == "") \
+        or (path_output_template == ""):
+            logger.error("Files path required to stamp bin files")
+            return None
+        if len(fields) == 0:
+            logger.error("Fields required to stamp bin files")
+            return None
+        for name, (address, field_type) in fields.items():
+            if (field_type not in STAMP_INT_TYPES) \
+            and (field_type not in ("hex", "ascii")):
+                logger.error(f"Invalid field type {field_type} of {name}")
+                return None
+        if workers == 0:
+            workers = cpu_count() or 1
+        try:
+            base_size = os_stat(path_file_base).st_size
+            with open(path_file_base, "rb") as base_file_reader, \
+                 ThreadPoolExecutor(workers) as pool:
+                base = {"fd": base_file_reader.fileno(), "size": base_size,
+                        "data": None, "lock": Lock()}
+                pending = []
+                for index, row in enumerate(self._read_rows(path_file_values)):
+                    pending.append((index, pool.submit(self._stamp_variant,
+                        base, path_output_template, fields, index, row)))
+                    # Limit the number of pending rows in memory
+                    if len(pending) >= workers * 64:
+                        self._stamp_report(report, pending.pop(0))
+                for index_future in pending:
+                    self._stamp_report(report, index_future)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to stamp variants of {path_file_base}\n")
+            return None
+        return report
+
+
+    def _read_rows(self, path_file_values: str):
+        '''
+        Generator that yields the rows of a CSV (with header) or JSONL
+        file as dictionaries.
+        '''
+        with open(path_file_values, "r", newline="") as values_file_reader:
+            if path_file_values.lower().endswith((".jsonl", ".json")):
+                for line in values_file_reader:
+                    if line.strip():
+                        yield json_loads(line)
+                return
+            for row in DictReader(values_file_reader):
+                yield row
+
+
+    def _stamp_report(self, report: dict, index_future: tuple):
+        '''Add the result of a stamped variant to the report.'''
+        index, future = index_future
+        report["files"] = report["files"] + 1
+        try:
+            future.result()
+        except Exception as error:
+            report["failed"] = report["failed"] + 1
+            report["errors"].append({"index": index, "error": str(error)})
+            logger.error(f"Fail to stamp variant {index}: {error}")
+
+
+    def _stamp_variant(self, base: dict, path_output_template: str,
+                       fields: dict, index: int, row: dict):
+        '''
+        Create a variant output file of a base file, stamping the fields
+        values of a row (used as thread pool task).
+        '''
+        # Encode the fields before creating the file
+        stamps = []
+        for name, (address, field_type) in fields.items():
+            if name not in row:
+                raise ValueError(f"Missing field {name}")
+            data = self._encode_field(row[name], field_type)
+            if address + len(data) > base["size"]:
+                raise ValueError(f"Field {name} out of the base file")
+            stamps.append((address, data))
+        path_file_output = path_output_template.format(index=index, **row)
+        with open(path_file_output, "wb") as bin_file_writer:
+            self._clone_file(base, bin_file_writer.fileno())
+            for address, data in stamps:
+                pwrite(bin_file_writer.fileno(), data, address)
+
+
+    def _encode_field(self, value, field_type: str):
+        '''Get the bytes of a stamp field value.'''
+        if field_type == "hex":
+            return bytes.fromhex(str(value).replace(":", "").replace(" ", ""))
+        if field_type == "ascii":
+            return str(value).encode("ascii")
+        size, byteorder = STAMP_INT_TYPES[field_type]
+        if isinstance(value, str):
+            value = int(value, 0)
+        return value.to_bytes(size, byteorder)
+
+
+    def _clone_file(self, base: dict, output_fd: int):
+        '''
+        Clone the content of a base file into an empty output file, by
+        reflink (sharing the data blocks), kernel-side copy, or writing
+        the base data (loaded just once and shared by all the clones).
+        '''
+        if (ioctl is not None) and (base["data"] is None):
+            try:
+                ioctl(output_fd, FICLONE, base["fd"])
+                return
+            except OSError:
+                pass
+        if (_copy_file_range is not None) and (base["data"] is None):
+            try:
+                copied_bytes = 0
+                while copied_bytes < base["size"]:
+                    read_bytes = _copy_file_range(base["fd"], output_fd,
+                        base["size"] - copied_bytes, copied_bytes,
+                        copied_bytes)
+                    if not read_bytes:
+                        break
+                    copied_bytes = copied_bytes + read_bytes
+                if copied_bytes == base["size"]:
+                    return
+            except OSError:
+                pass
+        with base["lock"]:
+            if base["data"] is None:
+                data = bytearray()
+                while len(data) < base["size"]:
+                    chunk = pread(base["fd"], base["size"] - len(data),
+                                  len(data))
+                    if not chunk:
+                        break
+                    data.extend(chunk)
+                base["data"] = bytes(data)
+        with memoryview(base["data"]) as data:
+            written_bytes = 0
+            while written_bytes < len(data):
+                written_bytes = written_bytes + pwrite(output_fd,
+                    data[written_bytes:], written_bytes)
+
+
+    def run_manifest(self, manifest_path: str, manifest: dict = None):
+        '''
+        Run a layout manifest file (JSON, or TOML if supported) that
+        describes a list of create, add, clear and get steps against
+        named regions of binary files with base addresses. Each target
+        file writes are planned and merged, and flushed once at the end
+        (or before a get step that reads from it). As add steps read
+        their source on flush, the targets of a file are flushed before
+        any step that modifies it. An already loaded manifest (see
+        load_manifest()) can be provided instead of loading the file.
+        '''
+        if manifest is None:
+            manifest = self.load_manifest(manifest_path)
+        if manifest is None:
+            return False
+        regions = manifest.get("regions", {})
+        images = {}
+        for step_num, step in enumerate(manifest.get("steps", [])):
+            try:
+                op = step["op"]
+                region = regions.get(step["region"],
+                                     {"file": step["region"]})
+                file_path = region["file"]
+                base_address = self._manifest_int(
+                    region.get("base_address", 0))
+                address = self._manifest_int(step.get("address", base_address))
+                address = address - base_address
+                num_bytes = self._manifest_int(step.get("size", 0))
+            except (KeyError, TypeError, ValueError):
+                logger.error(format_exc())
+                logger.error(f"Invalid manifest step {step_num}: {step}")
+                return False
+            # Flush the images that read from the modified file
+            modified_path = step.get("output", "") if op == "get" \
+                else file_path
+            for other_path, other_image in images.items():
+                if (other_path != modified_path) \
+                and other_image.plan.reads_from(modified_path) \
+                and (not other_image.commit()):
+                    return False
+            if file_path not in images:
+                images[file_path] = BinImage(file_path, self)
+            image = images[file_path]
+            if op == "create":
+                if num_bytes == 0:
+                    num_bytes = self._manifest_int(region.get("size", 0))
+                step_success = image.create(num_bytes, self._manifest_int(
+                    step.get("fill", region.get("fill", 0xFF))))
+            elif op == "clear":
+                step_success = image.clear(address, num_bytes)
+            elif op == "add":
+                path_file_src = step.get("input", "")
+                if (path_file_src in images) \
+                and (not images[path_file_src].commit()):
+                    return False
+                step_success = image.join(path_file_src,
+                    self._manifest_int(step.get("input_address", 0)),
+                    num_bytes, address)
+            elif op == "get":
+                path_file_output = step.get("output", "")
+                step_success = image.commit() \
+                    and self.extract_data(file_path, address, num_bytes,
+                                          path_file_output)
+                images.pop(path_file_output, None)
+            else:
+                logger.error(f"Invalid manifest step {step_num} operation: "
+                             f"{op}")
+                return False
+            if not step_success:
+                logger.error(f"Fail to run manifest step {step_num}: {step}")
+                return False
+        # Write all the planned edits
+        commit_success = [image.commit() for image in images.values()]
+        return False not in commit_success
+
+
+    def load_manifest(self, manifest_path: str, cwd: str = None):
+        '''
+        Load a layout manifest file, as TOML if it has a ".toml"
+        extension and TOML is supported, or as JSON otherwise. The path
+        "-" reads a JSON manifest from the standard input. If a working
+        directory is provided, the relative files paths of the manifest
+        (regions files, and steps inputs and outputs) are resolved
+        against it.
+        '''
+        try:
+            if manifest_path == "-":
+                manifest = json_load(sys.stdin)
+            elif manifest_path.endswith(".toml"):
+                if toml_load is None:
+                    logger.error("TOML manifests are not supported "
+                                 "(requires Python 3.11+)")
+                    return None
+                with open(manifest_path, "rb") as manifest_reader:
+                    manifest = toml_load(manifest_reader)
+            else:
+                with open(manifest_path, "r") as manifest_reader:
+                    manifest = json_load(manifest_reader)
+            if cwd is not None:
+                _resolve_manifest_paths(manifest, cwd)
+            return manifest
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to load manifest file {manifest_path}\n")
+        return None
+
+
+    def _manifest_int(self, value):
+        '''Get an integer value from a manifest (number or string).'''
+        if isinstance(value, str):
+            return int(value, 0)
+        return int(value)
+
+
+    def show_file(self, file_path: str, from_address: int,
+                  num_bytes: int, addr_offset: int, entropy_block: int = 0):
+        '''
+        Show in hexadecimal and ascii, the content of a binary file
+        from given address up to specified size of bytes.
+        The file is memory mapped and shown by chunks, so memory usage
+        doesn't depend on the file size.
+        If an entropy block size is provided (multiple of the line
+        size), a compact entropy strip is shown along the lines, with
+        the entropy ramp character of the block of each line.
+        '''
+        bytes_per_line = 16
+        bytes_per_group = 2
+        # Check arguments
+        if file_path == "":
+            logger.error("File path required to create bin file")
+            return False
+        if (entropy_block < 0) or (entropy_block % bytes_per_line):
+            logger.error(f"Entropy block size must be a multiple of "
+                         f"{bytes_per_line}")
+            return False
+        # Get the file size and check it (unknown for streams)
+        try:
+            file_size = None
+            if not self._is_stream(file_path):
+                file_size = os_stat(file_path).st_size
+        except Exception:
+            logger.error(format_exc())
+            print(f"Fail to read binary file {file_path}")
+            return False
+        if (file_size is not None) and (from_address >= file_size):
+            print(f"Address requested to read from binary file larger "
+                  f"than file size (max address: 0x{file_size - 1:02x}")
+            return False
+        # Limit size of bytes to read if request more than file size
+        if (num_bytes == 0) and (file_size is not None):
+            num_bytes = file_size
+        if (file_size is not None) and (from_address + num_bytes > file_size):
+            num_bytes = file_size - from_address
+        # Show the bytes
+        addr_len = self._hexdump_addr_len(num_bytes)
+        line_block = entropy_block or bytes_per_line
+        chunk_size = max(CHUNK_SIZE // line_block, 1) * line_block
+        try:
+            chunks = self._read_chunks(file_path, from_address, num_bytes,
+                                       chunk_size)
+            with closing(chunks):
+                addr = addr_offset
+                while True:
+                    with self._phase("read"):
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    with self._phase("hexdump"):
+                        lines = self.hexdump_lines(chunk, addr,
+                            bytes_per_line, bytes_per_group,
+                            addr_len=addr_len)
+                        if entropy_block:
+                            lines = self._entropy_strip(lines, chunk,
+                                                        entropy_block,
+                                                        bytes_per_line)
+                        lines = "\n".join(lines)
+                    with self._phase("output"):
+                        print(lines)
+                    addr = addr + len(chunk)
+                if addr == addr_offset:
+                    print("Address requested to read from binary file "
+                          "larger than file size")
+                    return False
+        except BrokenPipeError:
+            # The output reader has finished (i.e. "binedit ... | head")
+            return True
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to read binary file {file_path}\n")
+            return False
+        return True
+
+
+    def _entropy_strip(self, lines, data, block_size: int,
+                       bytes_per_line: int):
+        '''
+        Generator that yields the hexdump lines of some data followed by
+        the entropy ramp character of the block of each line.
+        '''
+        with self._phase("stats"):
+            strip = [entropy_char(bits) for _, bits, _, _
+                     in block_stats(data, block_size)[1]]
+        lines_per_block = block_size // bytes_per_line
+        for index, line in enumerate(lines):
+            yield f"{line} [{strip[index // lines_per_block]}]"
+
+
+    def hexdump(self, src: bytes, addr_offs: int = 0,
+                bytes_per_line: int = 16, bytes_per_group: int = 4,
+                sep: str = '.'):
+        '''
+        Convert a byte array (or any bytes-like object) into a string
+        that contains an hexadecimal and ascii representation format of
+        the bytes.
+        '''
+        with self._phase("hexdump"):
+            return list(self.hexdump_lines(src, addr_offs, bytes_per_line,
+                                           bytes_per_group, sep))
+
+
+    def hexdump_lines(self, src: bytes, addr_offs: int = 0,
+                      bytes_per_line: int = 16, bytes_per_group: int = 4,
+                      sep: str = '.', addr_len: int = 0):
+        '''
+        Generator that yields the hexadecimal and ascii representation
+        lines of a bytes-like object (see hexdump()). The full hex and ascii
+        strings are converted in bulk, and then sliced by lines.
+        The address length can be provided to keep lines of multiple
+        chunks of data aligned.
+        '''
+        if not isinstance(src, (bytes, bytearray)):
+            src = memoryview(src).cast("B")
+        if addr_len == 0:
+            addr_len = self._hexdump_addr_len(len(src))
+        hex_len = (bytes_per_line * 2) \
+                  + int(bytes_per_line * 2 / bytes_per_group) - 1
+        ascii_src = bytes(src).translate(_hexdump_filter(sep)[0])
+        ascii_src = ascii_src.decode("latin-1")
+        if _hexdump_filter(sep)[1] is not None:
+            ascii_src = ascii_src.translate(_hexdump_filter(sep)[1])
+        for addr in range(0, len(src), bytes_per_line):
+            chars = src[addr : addr + bytes_per_line]
+            # Create hex string with a space every bytes_per_group digits
+            if bytes_per_group % 2 == 0:
+                hex_str = chars.hex(" ", -(bytes_per_group // 2))
+            else:
+                hex_str = chars.hex()
+                hex_str = " ".join([hex_str[i : i + bytes_per_group]
+                                    for i in range(0, len(hex_str),
+                                                   bytes_per_group)])
+            hex_str = hex_str.upper().ljust(hex_len)
+            ascii_str = ascii_src[addr : addr + bytes_per_line]
+            _addr = addr + addr_offs
+            yield f"{_addr:0{addr_len}X}  {hex_str}  | {ascii_str} |"
+
+
+    def _hexdump_addr_len(self, num_bytes: int):
+        '''Get hexdump address column length for a number of bytes.'''
+        addr_len = len(hex(num_bytes))
+        if 8 > addr_len:
+            addr_len = 8
+        return addr_len
+
+
+    def _load_sparse_range(self, file_path: str, address: int,
+                           num_bytes: int, base_address: int):
+        '''
+        Load an address range of a file into a sparse image. HEX and
+        S-record files use absolute addresses (base address + address),
+        while only the requested range of flat binary files is read and
+        placed at its absolute address. A number of bytes of zero means
+        up to the end of the file data.
+        Returns the image and the absolute address of the range.
+        '''
+        image = SparseImage()
+        abs_address = base_address + address
+        if sparse_format(file_path) is not None:
+            image.load(file_path)
+            if num_bytes == 0:
+                num_bytes = max(image.max_address - abs_address, 0)
+            return (image.sub_image(abs_address, num_bytes), abs_address)
+        file_size = os_stat(file_path).st_size
+        if address >= file_size:
+            raise ValueError(f"Address requested to read from binary file "
+                             f"larger than file size (max address: "
+                             f"0x{file_size - 1:02x}")
+        if (num_bytes == 0) or (address + num_bytes > file_size):
+            num_bytes = file_size - address
+        with open(file_path, "rb") as bin_file_reader:
+            bin_file_reader.seek(address)
+            offset = 0
+            while offset < num_bytes:
+                chunk = bin_file_reader.read(
+                    min(CHUNK_SIZE, num_bytes - offset))
+                if not chunk:
+                    break
+                image.write(abs_address + offset, chunk)
+                offset = offset + len(chunk)
+        return (image, abs_address)
+
+
+    def _extract_sparse(self, path_file_input: str, address: int,
+                        num_bytes: int, path_file_output: str,
+                        base_address: int):
+        '''
+        Extract data from an address range into a new file, where any of
+        them is an Intel HEX or S-record file.
+        '''
+        try:
+            image, abs_address = self._load_sparse_range(
+                path_file_input, address, num_bytes, base_address)
+            image.save(path_file_output, abs_address)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to extract data from {path_file_input}\n")
+            return False
+        return True
+
+
+    def _join_sparse(self, path_file_src: str, address_file_src: int,
+                     num_bytes: int, path_file_target: str,
+                     address_file_target: int, base_address: int,
+                     check_blank: bool = False, erase_value: int = 0xFF):
+        '''
+        Insert data from a source file address range into a target file
+        address, where any of them is an Intel HEX or S-record file.
+        Only the source data segments are written, gaps are kept as
+        they are in the target file. If check blank is requested, it
+        fails if the target ranges of the segments are not erased.
+        '''
+        try:
+            image, abs_address = self._load_sparse_range(
+                path_file_src, address_file_src, num_bytes, base_address)
+            delta = (base_address + address_file_target) - abs_address
+            if check_blank:
+                for start, segment in image.segments_in(
+                        image.min_address, image.max_address):
+                    if not self._check_blank(path_file_target,
+                            start + delta - base_address, len(segment),
+                            erase_value, base_address):
+                        return False
+            # Sparse target, load it and write the source data segments
+            if sparse_format(path_file_target) is not None:
+                target_image = SparseImage()
+                if os_path.exists(path_file_target):
+                    target_image.load(path_file_target)
+                for start, segment in image.segments_in(
+                        image.min_address, image.max_address):
+                    target_image.write(start + delta, segment)
+                target_image.save(path_file_target)
+                return True
+            # Flat target, write the source data segments in place
+            with open(path_file_target, "r+b") as bin_file_writer:
+                file_target_size = bin_file_writer.seek(0, SEEK_END)
+                for start, segment in image.segments_in(
+                        image.min_address, image.max_address):
+                    offset = start + delta - base_address
+                    if offset > file_target_size:
+                        bin_file_writer.seek(file_target_size)
+                        self._write_fill(bin_file_writer,
+                                         offset - file_target_size, 0xFF)
+                    bin_file_writer.seek(offset)
+                    bin_file_writer.write(segment)
+                    file_target_size = max(file_target_size,
+                                           offset + len(segment))
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to join binary file {path_file_src} into "
+                         f"{path_file_target}\n")
+            return False
+        return True
+
+
+    @contextmanager
+    def _file_data(self, file_path: str):
+        '''
+        Context manager to access the full data of a binary file, from
+        the image cache if it is enabled and the file fits in it (see
+        bineditserve.ImageCache), or memory mapped otherwise. Raises
+        ValueError for streams (they can only be read sequentially).
+        '''
+        if self._is_stream(file_path):
+            raise ValueError(f"Stream or compressed file not supported by "
+                             f"this operation: {file_path}")
+        if self.image_cache is not None:
+            data = self.image_cache.get(file_path)
+            if data is not None:
+                yield data
+                return
+        with open(file_path, "rb") as bin_file_reader, \
+             mmap(bin_file_reader.fileno(), 0, access=ACCESS_READ) \
+             as file_data:
+            yield file_data
+
+
+    def _read_chunks(self, file_path: str, address: int, num_bytes: int,
+                     chunk_size: int = CHUNK_SIZE):
+        '''
+        Generator that yields the data of a binary file address range by
+        chunks (a number of bytes of zero means up to the end of the
+        file), from its memory map or, for streams, read sequentially
+        (i.e. decompressed).
+        '''
+        if num_bytes == 0:
+            num_bytes = sys.maxsize
+        if not self._is_stream(file_path):
+            with self._file_data(file_path) as file_data:
+                end = min(address + num_bytes, len(file_data))
+                for offset in range(address, end, chunk_size):
+                    yield file_data[offset:min(offset + chunk_size, end)]
+            return
+        with self._open_input(file_path) as bin_file_reader:
+            self._skip_stream(bin_file_reader, address)
+            while num_bytes > 0:
+                chunk = bin_file_reader.read(min(chunk_size, num_bytes))
+                if not chunk:
+                    break
+                yield chunk
+                num_bytes = num_bytes - len(chunk)
+
+
+    def _is_stream(self, file_path: str):
+        '''
+        Check if a binary file can only be read sequentially: "-"
+        standard input, named pipes, character devices and compressed
+        files.
+        '''
+        if file_path == "-":
+            return True
+        if not os_path.isfile(file_path):
+            return os_path.exists(file_path)
+        return compression_format(file_path) is not None
+
+
+    def _same_file(self, path_file_1: str, path_file_2: str):
+        '''Check if two existing files paths (not "-") are the same file.'''
+        if ("-" in (path_file_1, path_file_2)) \
+        or (not os_path.exists(path_file_1)) \
+        or (not os_path.exists(path_file_2)):
+            return False
+        return os_path.samefile(path_file_1, path_file_2)
+
+
+    def _open_input(self, file_path: str):
+        '''
+        Open a binary file to read it sequentially, where compressed files
+        (detected by their headers) are decompressed in a background thread.
+        "-" standard input, named pipes and character devices are read in
+        a background thread through a bounded queue of chunks.
+        '''
+        if file_path == "-":
+            return open_stream(open(sys.stdin.fileno(), "rb", closefd=False))
+        if not os_path.isfile(file_path):
+            return open_stream(open(file_path, "rb"))
+        compression = compression_format(file_path)
+        if compression is None:
+            return open(file_path, "rb")
+        return open_reader(file_path, compression)
+
+
+    def _open_output(self, file_path: str, compression: str = None):
+        '''
+        Open a new binary file to write it sequentially, where files with
+        a compressed file extension (.gz, .xz, .bz2), or the provided
+        compression format, are compressed in a background thread.
+        "-" is the standard output.
+        '''
+        if file_path == "-":
+            sys.stdout.flush()
+            return open(sys.stdout.fileno(), "wb", closefd=False)
+        if compression is None:
+            compression = output_compression(file_path)
+        if compression is None:
+            return open(file_path, "wb")
+        return open_writer(file_path, compression)
+
+
+    def _skip_stream(self, bin_file_reader, num_bytes: int):
+        '''
+        Skip a number of bytes of an opened input file or stream.
+        Returns the number of bytes skipped (less than requested if the
+        end of the file is reached).
+        '''
+        if isinstance(bin_file_reader, StreamReader):
+            return bin_file_reader.skip(num_bytes)
+        position = bin_file_reader.tell()
+        end = bin_file_reader.seek(0, SEEK_END)
+        return bin_file_reader.seek(min(position + num_bytes, end)) - position
+
+
+    def _rewrite_stream(self, file_path: str, address: int, num_bytes: int,
+                        source, erase_value: int = None,
+                        path_file_output: str = ""):
+        '''
+        Rewrite a compressed binary file through streams (into a new
+        compressed file that replaces it, or into an output file if it is
+        provided), where an address range (a number of bytes of zero
+        means up to the end of the source) is replaced by a fill value
+        (only inside the file data) or by the data of a source stream
+        (extending the file if needed, padded with 0xFF). If an erase
+        value is provided, it fails if the replaced data is not erased.
+        The new compressed file is written into a unique temporary file
+        of the same directory, so concurrent rewrites don't collide.
+        '''
+        path_file_tmp = ""
+        compression = compression_format(file_path)
+        if path_file_output != "":
+            path_file_tmp = path_file_output
+            compression = None
+        success = False
+        if num_bytes == 0:
+            num_bytes = sys.maxsize
+        try:
+            if path_file_output == "":
+                with NamedTemporaryFile(
+                        dir=os_path.dirname(os_path.abspath(file_path)),
+                        prefix=f"{os_path.basename(file_path)}.",
+                        suffix=".tmp", delete=False) as tmp_file:
+                    path_file_tmp = tmp_file.name
+            with self._open_input(file_path) as bin_file_reader, \
+                 self._open_output(path_file_tmp, compression) \
+                 as bin_file_writer:
+                copied_bytes = self._copy_data(bin_file_reader,
+                                               bin_file_writer, address)
+                if copied_bytes < address:
+                    if isinstance(source, int):
+                        print("Address requested to write in binary file "
+                              "larger than file size")
+                        return False
+                    self._write_fill(bin_file_writer, address - copied_bytes,
+                                     0xFF)
+                while num_bytes > 0:
+                    to_write = min(CHUNK_SIZE, num_bytes)
+                    if isinstance(source, int):
+                        data = bin_file_reader.read(to_write)
+                        new_data = bytes([source]) * len(data)
+                    else:
+                        new_data = source.read(to_write)
+                        data = bin_file_reader.read(len(new_data))
+                    if not new_data:
+                        break
+                    if (erase_value is not None) \
+                    and data.strip(bytes([erase_value])):
+                        print(f"Target binary file {file_path} range is not "
+                              f"blank")
+                        return False
+                    bin_file_writer.write(new_data)
+                    num_bytes = num_bytes - len(new_data)
+                self._copy_data(bin_file_reader, bin_file_writer, sys.maxsize)
+            if path_file_output == "":
+                copymode(file_path, path_file_tmp)
+                os_replace(path_file_tmp, file_path)
+            success = True
+        except BrokenPipeError:
+            # The output reader has finished (i.e. "binedit ... | head")
+            pass
         except Exception:
             logger.error(format_exc())
             logger.error(f"Fail to write binary file {file_path}\n")
+        finally:
+            # Remove the temporary file or the partial output file (but not
+            # the standard output or a named pipe)
+            if (not success) and (path_file_tmp not in ("", "-")) \
+            and os_path.isfile(path_file_tmp):
+                os_remove(path_file_tmp)
+        return success
+
+
+    def _join_stream(self, path_file_src: str, address_file_src: int,
+                     num_bytes: int, path_file_target: str,
+                     address_file_target: int, check_blank: bool,
+                     erase_value: int):
+        '''
+        Insert data from a source file address range into a target file
+        address, where any of them is a compressed file (so the data is
+        streamed).
+        '''
+        try:
+            with self._open_input(path_file_src) as bin_file_reader:
+                if self._skip_stream(bin_file_reader, address_file_src) \
+                        < address_file_src:
+                    print("Address requested to read from source binary file "
+                          "larger than file size")
+                    return False
+                if compression_format(path_file_target) is not None:
+                    return self._rewrite_stream(path_file_target,
+                        address_file_target, num_bytes, bin_file_reader,
+                        erase_value if check_blank else None)
+                if num_bytes == 0:
+                    num_bytes = sys.maxsize
+                if check_blank and (not self._check_blank(path_file_target,
+                        address_file_target, num_bytes, erase_value)):
+                    return False
+                with open(path_file_target, "r+b") as bin_file_writer:
+                    file_target_size = bin_file_writer.seek(0, SEEK_END)
+                    if address_file_target > file_target_size:
+                        self._write_fill(bin_file_writer,
+                            address_file_target - file_target_size, 0xFF)
+                    bin_file_writer.seek(address_file_target)
+                    self._copy_data(bin_file_reader, bin_file_writer,
+                                    num_bytes)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to join binary file {path_file_src} into "
+                         f"{path_file_target}\n")
             return False
         return True
+
+
+    def _read_file(self, file_path: str):
+        '''Read full content of a binary file.'''
+        read_bytes = None
+        try:
+            with open(file_path, "rb") as bin_file_reader, \
+                 self._phase("read"):
+                read_bytes = bin_file_reader.read()
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to read binary file {file_path}\n")
+        return read_bytes
+
+
+    def _preallocate(self, bin_file_writer, num_bytes: int):
+        '''
+        Set the size of an opened binary file, reserving the disk space
+        for it if the system supports it (new space is zero filled).
+        '''
+        bin_file_writer.truncate(num_bytes)
+        if _posix_fallocate is not None:
+            try:
+                _posix_fallocate(bin_file_writer.fileno(), 0, num_bytes)
+            except OSError:
+                # Not supported by the file system, truncate is enough
+                pass
+
+
+    def _write_fill(self, bin_file_writer, num_bytes: int, value: int):
+        '''
+        Write the given number of bytes set to a fill value in the
+        current position of an opened binary file, using a reused chunk
+        buffer to keep memory usage constant.
+        '''
+        fill_chunk = bytes([value]) * min(num_bytes, CHUNK_SIZE)
+        with self._phase("write"):
+            while num_bytes > 0:
+                if num_bytes < len(fill_chunk):
+                    fill_chunk = fill_chunk[:num_bytes]
+                bin_file_writer.write(fill_chunk)
+                num_bytes = num_bytes - len(fill_chunk)
+
+
+    def _copy_data(self, bin_file_reader, bin_file_writer, num_bytes: int):
+        '''
+        Copy the given number of bytes from the current position of an
+        opened binary file into the current position of another one.
+        The copy is offloaded to the kernel with copy_file_range() when
+        available, otherwise it is done by chunks using a reused buffer.
+        Returns the number of copied bytes (less than requested if the
+        end of the source is reached).
+        '''
+        with self._phase("copy"):
+            return self._copy_range(bin_file_reader, bin_file_writer,
+                                    num_bytes)
+
+
+    def _copy_range(self, bin_file_reader, bin_file_writer, num_bytes: int):
+        '''Copy data between opened binary files (see _copy_data()).'''
+        copied_bytes = 0
+        if num_bytes <= 0:
+            return copied_bytes
+        if _copy_file_range is not None:
+            end_of_file = False
+            try:
+                # Streams without file descriptor (i.e. decompressors)
+                # raise UnsupportedOperation, before any seek is done
+                src_fd = bin_file_reader.fileno()
+                dst_fd = bin_file_writer.fileno()
+                bin_file_writer.flush()
+                src_offset = bin_file_reader.tell()
+                dst_offset = bin_file_writer.tell()
+                while copied_bytes < num_bytes:
+                    read_bytes = _copy_file_range(src_fd, dst_fd,
+                        min(num_bytes - copied_bytes, CHUNK_SIZE * 1024),
+                        src_offset + copied_bytes,
+                        dst_offset + copied_bytes)
+                    if not read_bytes:
+                        end_of_file = True
+                        break
+                    copied_bytes = copied_bytes + read_bytes
+                bin_file_reader.seek(src_offset + copied_bytes)
+                bin_file_writer.seek(dst_offset + copied_bytes)
+            except OSError:
+                # Not supported for these files, continue with fallback
+                if copied_bytes != 0:
+                    bin_file_reader.seek(src_offset + copied_bytes)
+                    bin_file_writer.seek(dst_offset + copied_bytes)
+            if end_of_file or (copied_bytes == num_bytes):
+                return copied_bytes
+        chunk = memoryview(bytearray(min(num_bytes, CHUNK_SIZE)))
+        while copied_bytes < num_bytes:
+            to_read = min(len(chunk), num_bytes - copied_bytes)
+            read_bytes = bin_file_reader.readinto(chunk[:to_read])
+            if not read_bytes:
+                break
+            bin_file_writer.write(chunk[:read_bytes])
+            copied_bytes = copied_bytes + read_bytes
+        return copied_bytes
+
+
+    def _write_file(self, file_path: str, data: bytearray):
+        '''Write to a binary file.'''
+        try:
+            with open(file_path, "wb") as bin_file_writer, \
+                 self._phase("write"):
+                bin_file_writer.write(data)
+        except Exception:
+            logger.error(format_exc())
+            logger.error(f"Fail to write binary file {file_path}\n")
+            return False
+        return True
+
+
+###############################################################################
+# Batch Processing Functions
+###############################################################################
+
+# Operations supported by batch mode
+BATCH_OPERATIONS = ("show", "get", "clear", "checksum", "find")
+
+# Maximum number of output characters of a file kept in a batch report
+# (the output of "show" is written to files when an output template is
+# provided, so it is not kept in memory)
+BATCH_OUTPUT_LIMIT = 64 * 1024
+
+
+class _CappedOutput(StringIO):
+    '''
+    Text buffer that keeps up to a maximum number of characters and
+    discards the rest (i.e. to capture the output of a batch task
+    without keeping all of it in memory).
+    '''
+
+    def __init__(self, limit: int):
+        '''_CappedOutput Constructor.'''
+        super().__init__()
+        self.limit = limit
+        self.truncated = False
+
+
+    def write(self, text: str):
+        '''Write a text, discarding the characters over the limit.'''
+        room = self.limit - self.tell()
+        if len(text) > room:
+            self.truncated = True
+            text = text[:max(room, 0)]
+        super().write(text)
+        return len(text)
+
+
+def _batch_task(operation: str, file_path: str, options: dict):
+    '''
+    Run a BinEdit operation over a file (used as process pool task).
+    The operation output (up to BATCH_OUTPUT_LIMIT characters, or all of
+    it streamed to a file for "show" with an output path template) and
+    error logs are captured, and exceptions are never raised, so a bad
+    file doesn't abort the batch.
+    Returns a dictionary with the file result.
+    '''
+    result = {"file": file_path, "success": False, "output": "",
+              "errors": ""}
+    errors = _CappedOutput(BATCH_OUTPUT_LIMIT)
+    log_handler = logging.StreamHandler(errors)
+    log_handler.setLevel(logging.ERROR)
+    logger.addHandler(log_handler)
+    output = _CappedOutput(BATCH_OUTPUT_LIMIT)
+    start_time = perf_counter()
+    try:
+        binedit = BinEdit()
+        address = options.get("address", 0)
+        num_bytes = options.get("size", 0)
+        base_address = options.get("base_address", 0)
+        path_file_output = ""
+        if operation in ("show", "get"):
+            file_name = os_path.basename(file_path)
+            path_file_output = options.get("output", "").format(
+                name=file_name, stem=os_path.splitext(file_name)[0])
+        with ExitStack() as stack:
+            if (operation == "show") and (path_file_output != ""):
+                result["output_file"] = path_file_output
+                stack.enter_context(redirect_stdout(stack.enter_context(
+                    open(path_file_output, "w"))))
+            else:
+                stack.enter_context(redirect_stdout(output))
+            if operation == "show":
+                result["success"] = binedit.show_file(file_path, address,
+                                                      num_bytes, base_address)
+            elif operation == "get":
+                result["output_file"] = path_file_output
+                result["success"] = binedit.extract_data(file_path, address,
+                    num_bytes, path_file_output, base_address)
+            elif operation == "clear":
+                result["success"] = binedit.clear_data(file_path, address,
+                                                       num_bytes)
+            elif operation == "checksum":
+                digests = binedit.checksum(file_path, address, num_bytes,
+                    options.get("algorithms", ("crc32",)), workers=1)
+                if digests is not None:
+                    result["checksums"] = {algorithm: digest.hex().upper()
+                        for algorithm, digest in digests.items()}
+                    result["success"] = True
+            elif operation == "find":
+                result["matches"] = [[address, pattern]
+                    for address, pattern in binedit.find(file_path,
+                        options.get("patterns", []), address, num_bytes,
+                        base_address, workers=1)]
+                result["success"] = True
+            else:
+                logger.error(f"Invalid batch operation: {operation}")
+    except Exception:
+        logger.error(format_exc())
+    finally:
+        logger.removeHandler(log_handler)
+    result["output"] = output.getvalue()
+    result["errors"] = errors.getvalue()
+    if output.truncated or errors.truncated:
+        result["truncated"] = True
+    result["seconds"] = perf_counter() - start_time
+    return result
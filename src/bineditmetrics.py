@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditmetrics.py
+Description:
+    Instrumentation for binedit library.
+    It supports the next features:
+      - Per operation metrics: elapsed time, phases timings (i.e. read,
+        hexdump, write), bytes read and written, read and write syscalls
+        counts (Linux) and peak memory usage.
+      - Hooks called with the metrics of each finished operation.
+      - Optional cProfile capture (saved as pstats file) and tracemalloc
+        capture (peak traced memory and top allocations).
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Python Profiler Library
+from cProfile import Profile
+
+# Context Utilities Library
+from contextlib import contextmanager
+
+# Resource Usage Library
+from resource import RUSAGE_SELF, getrusage
+
+# Threading Library
+from threading import get_ident
+
+# Time Library
+from time import perf_counter
+
+# Memory Allocations Tracing Library
+import tracemalloc
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Linux per process I/O counters file (bytes and syscalls)
+PROC_IO_FILE = "/proc/self/io"
+
+# I/O counters to report (/proc/self/io name: metrics name)
+IO_COUNTERS = {
+    "rchar": "read_bytes",
+    "wchar": "write_bytes",
+    "syscr": "read_syscalls",
+    "syscw": "write_syscalls",
+}
+
+# Number of top memory allocations lines to report
+TRACE_TOP_LINES = 10
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def _io_counters():
+    '''
+    Get the process I/O counters (bytes read and written, read and write
+    syscalls), or an empty dictionary if not supported by the system.
+    '''
+    try:
+        with open(PROC_IO_FILE, "r") as io_file_reader:
+            lines = io_file_reader.read().splitlines()
+    except OSError:
+        return {}
+    counters = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name in IO_COUNTERS:
+            counters[IO_COUNTERS[name]] = int(value)
+    return counters
+
+
+###############################################################################
+# Metrics Class
+###############################################################################
+
+class Metrics():
+    '''
+    Metrics collector of BinEdit operations (see BinEdit.instrument()).
+    Operations can be nested (i.e. extract_data() uses split_regions()),
+    where only the outer one is recorded.
+    '''
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False):
+        '''Metrics Constructor.'''
+        self.operations = []
+        self.hooks = []
+        self.current = None
+        self.owner = None
+        self.profiler = Profile() if profile else None
+        self.trace_memory = trace_memory
+        self.top_allocations = []
+
+
+    def add_hook(self, hook):
+        '''
+        Add a function to call with the metrics dictionary of each
+        finished operation.
+        '''
+        self.hooks.append(hook)
+
+
+    @contextmanager
+    def operation(self, name: str):
+        '''Context manager that records the metrics of an operation.'''
+        if self.current is not None:
+            yield
+            return
+        self.current = {"operation": name, "phases": {}}
+        self.owner = get_ident()
+        io_start = _io_counters()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            seconds = perf_counter() - start_time
+            if self.profiler is not None:
+                self.profiler.disable()
+            record = self.current
+            self.current = None
+            self.owner = None
+            record["seconds"] = round(seconds, 6)
+            record["phases"] = {phase: round(phase_seconds, 6)
+                                for phase, phase_seconds
+                                in record["phases"].items()}
+            io_end = _io_counters()
+            for counter, value in io_end.items():
+                record[counter] = value - io_start.get(counter, 0)
+            record["peak_rss_kb"] = getrusage(RUSAGE_SELF).ru_maxrss
+            if self.trace_memory:
+                record["peak_traced_kb"] = \
+                    tracemalloc.get_traced_memory()[1] // 1024
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self.top_allocations = [str(stat) for stat in
+                    snapshot.statistics("lineno")[:TRACE_TOP_LINES]]
+            self.operations.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+
+    @contextmanager
+    def phase(self, name: str):
+        '''
+        Context manager that adds the elapsed time to a phase of the
+        current operation (phases of other threads are ignored).
+        '''
+        if (self.current is None) or (self.owner != get_ident()):
+            yield
+            return
+        phases = self.current["phases"]
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            phases[name] = phases.get(name, 0) + perf_counter() - start_time
+
+
+    def report(self):
+        '''Get the metrics of all the recorded operations.'''
+        report = {"operations": self.operations}
+        if self.trace_memory:
+            report["top_allocations"] = self.top_allocations
+        return report
+
+
+    def save_profile(self, file_path: str):
+        '''Save the captured profile as a pstats file.'''
+        if self.profiler is not None:
+            self.profiler.dump_stats(file_path)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditserve.py
+Description:
+    Resident daemon mode for binedit tool.
+    It supports the next features:
+      - Unix socket server that runs binedit commands (the same command
+        line arguments) concurrently, without the interpreter startup
+        cost of each call (see bineditclient.py).
+      - Size bounded LRU cache of recently used images, invalidated by
+        file modification time and size.
+      - Per file locking, so concurrent commands over the same files
+        are serialized.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Error Traceback Library
+from traceback import format_exc
+
+# Collections Library
+from collections import OrderedDict
+
+# Context Utilities Library
+from contextlib import ExitStack
+
+# In-memory Text Streams Library
+from io import StringIO
+
+# JSON Library
+from json import dumps as json_dumps
+from json import loads as json_loads
+
+# Operating System Library
+from os import chmod, environ, getuid, umask, unlink
+from os import path as os_path
+from os import stat as os_stat
+
+# Signals Library
+from signal import SIGTERM, signal
+
+# Network Socket Library
+from socket import SOL_SOCKET
+
+# Peer Credentials Socket Option (not available in all systems)
+try:
+    from socket import SO_PEERCRED
+except ImportError:
+    SO_PEERCRED = None
+
+# Network Servers Library
+from socketserver import StreamRequestHandler, ThreadingUnixStreamServer
+
+# Binary Data Structures Library
+from struct import Struct
+
+# System Library
+import sys
+
+# Temporary Files Library
+from tempfile import gettempdir
+
+# Threading Library
+from threading import Lock, RLock, local
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Default maximum size of the images cache
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# Socket file name
+SOCKET_NAME = "binedit-{uid}.sock"
+
+# Peer credentials of a Unix socket connection (pid, uid and gid)
+UCRED = Struct("3i")
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def socket_owned(socket_path: str):
+    '''
+    Check if a server socket file is owned by the current user (so
+    other users can't impersonate the server).
+    '''
+    try:
+        return os_stat(socket_path).st_uid == getuid()
+    except OSError:
+        return False
+
+
+def default_socket_path():
+    '''
+    Get the default server socket path, from BINEDIT_SOCKET environment
+    variable or in the user runtime directory (or the temporary files
+    directory if it is not available).
+    '''
+    if "BINEDIT_SOCKET" in environ:
+        return environ["BINEDIT_SOCKET"]
+    runtime_dir = environ.get("XDG_RUNTIME_DIR") or gettempdir()
+    return os_path.join(runtime_dir, SOCKET_NAME.format(uid=getuid()))
+
+
+###############################################################################
+# Image Cache Class
+###############################################################################
+
+class ImageCache():
+    '''
+    Size bounded LRU cache of binary files data, where an entry is
+    invalidated if the file modification time or size changes.
+    '''
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        '''ImageCache Constructor.'''
+        self.max_size = max_size
+        self.size = 0
+        self.images = OrderedDict()
+        self.lock = Lock()
+
+
+    def get(self, file_path: str):
+        '''
+        Get the data of a binary file, from the cache if it is still
+        valid or reading it otherwise. Returns None if the file doesn't
+        fit in the cache.
+        '''
+        file_path = os_path.abspath(file_path)
+        file_stat = os_stat(file_path)
+        key = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self.lock:
+            if file_path in self.images:
+                image_key, data = self.images[file_path]
+                if image_key == key:
+                    self.images.move_to_end(file_path)
+                    return data
+                self._remove(file_path)
+        if (file_stat.st_size == 0) or (file_stat.st_size > self.max_size):
+            return None
+        with open(file_path, "rb") as bin_file_reader:
+            data = bin_file_reader.read()
+        if len(data) != file_stat.st_size:
+            return data
+        with self.lock:
+            if file_path in self.images:
+                self._remove(file_path)
+            self.images[file_path] = (key, data)
+            self.size = self.size + len(data)
+            while self.size > self.max_size:
+                self._remove(next(iter(self.images)))
+        return data
+
+
+    def invalidate(self, file_path: str):
+        '''Remove a binary file from the cache.'''
+        file_path = os_path.abspath(file_path)
+        with self.lock:
+            if file_path in self.images:
+                self._remove(file_path)
+
+
+    def _remove(self, file_path: str):
+        '''Remove an entry of the cache (the lock must be held).'''
+        _, data = self.images.pop(file_path)
+        self.size = self.size - len(data)
+
+
+###############################################################################
+# File Locks Class
+###############################################################################
+
+class FileLocks():
+    '''
+    Locks of binary files, to serialize commands over the same files.
+    The lock of a file is only kept while some command uses it.
+    '''
+
+    def __init__(self):
+        '''FileLocks Constructor.'''
+        self.locks = {}
+        self.lock = Lock()
+
+
+    def hold(self, file_paths: list):
+        '''
+        Get a context manager that holds the locks of some files (taken
+        in path order to avoid deadlocks).
+        '''
+        stack = ExitStack()
+        file_paths = sorted(set([os_path.abspath(file_path)
+                                 for file_path in file_paths]))
+        # Each lock entry is [lock, number of users]
+        with self.lock:
+            locks = []
+            for file_path in file_paths:
+                entry = self.locks.setdefault(file_path, [RLock(), 0])
+                entry[1] = entry[1] + 1
+                locks.append(entry[0])
+        stack.callback(self._release, file_paths)
+        for file_lock in locks:
+            stack.enter_context(file_lock)
+        return stack
+
+
+    def _release(self, file_paths: list):
+        '''Remove the locks of some files that are no longer used.'''
+        with self.lock:
+            for file_path in file_paths:
+                entry = self.locks[file_path]
+                entry[1] = entry[1] - 1
+                if entry[1] == 0:
+                    del self.locks[file_path]
+
+
+###############################################################################
+# Thread Local Stream Class
+###############################################################################
+
+class ThreadLocalStream():
+    '''
+    Text stream that writes into a per thread stream if it is set, or
+    into a default stream otherwise (used to capture each request
+    standard output and error).
+    '''
+
+    def __init__(self, default_stream):
+        '''ThreadLocalStream Constructor.'''
+        self.default_stream = default_stream
+        self.local = local()
+
+
+    def set_stream(self, stream):
+        '''Set (or clear with None) the stream of current thread.'''
+        self.local.stream = stream
+
+
+    def write(self, text: str):
+        '''Write text into the stream.'''
+        return self._stream().write(text)
+
+
+    def flush(self):
+        '''Flush the stream.'''
+        self._stream().flush()
+
+
+    def _stream(self):
+        '''Get the stream of current thread.'''
+        stream = getattr(self.local, "stream", None)
+        if stream is None:
+            return self.default_stream
+        return stream
+
+
+###############################################################################
+# Session Class
+###############################################################################
+
+class Session():
+    '''
+    State of a command run by the server: the client working directory,
+    the shared image cache and file locks.
+    '''
+
+    def __init__(self, cwd: str, image_cache: ImageCache,
+                 file_locks: FileLocks):
+        '''Session Constructor.'''
+        self.cwd = cwd
+        self.image_cache = image_cache
+        self.file_locks = file_locks
+
+
+###############################################################################
+# Server Classes
+###############################################################################
+
+class RequestHandler(StreamRequestHandler):
+    '''
+    Handler of a client connection: reads a JSON request line with the
+    command arguments and working directory, and writes a JSON response
+    line with the command standard output, standard error and return
+    code.
+    '''
+
+    def handle(self):
+        '''Handle a request.'''
+        server = self.server
+        stdout = StringIO()
+        stderr = StringIO()
+        server.stdout.set_stream(stdout)
+        server.stderr.set_stream(stderr)
+        try:
+            request = json_loads(self.rfile.readline())
+            session = Session(request["cwd"], server.image_cache,
+                              server.file_locks)
+            argv = list(request["argv"])
+            return_code = server.run_command(len(argv), argv, session)
+        except SystemExit as error:
+            return_code = error.code if isinstance(error.code, int) else 1
+        except Exception:
+            stderr.write(format_exc())
+            return_code = 1
+        finally:
+            server.stdout.set_stream(None)
+            server.stderr.set_stream(None)
+        response = {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(),
+                    "code": return_code}
+        self.wfile.write(json_dumps(response).encode() + b"\n")
+
+
+class Server(ThreadingUnixStreamServer):
+    '''Unix socket server of binedit commands.'''
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, cache_size: int, run_command):
+        '''Server Constructor.'''
+        self.image_cache = ImageCache(cache_size)
+        self.file_locks = FileLocks()
+        self.run_command = run_command
+        self.stdout = ThreadLocalStream(sys.stdout)
+        self.stderr = ThreadLocalStream(sys.stderr)
+        super().__init__(socket_path, RequestHandler)
+
+
+    def verify_request(self, request, client_address):
+        '''
+        Accept only the connections of processes of the server user (if
+        peer credentials are not supported, the socket file permissions
+        restrict the connections).
+        '''
+        if SO_PEERCRED is None:
+            return True
+        _, uid, _ = UCRED.unpack(request.getsockopt(SOL_SOCKET, SO_PEERCRED,
+                                                    UCRED.size))
+        if uid != getuid():
+            logger.warning(f"Rejected connection of user {uid}")
+            return False
+        return True
+
+
+###############################################################################
+# Server Functions
+###############################################################################
+
+def serve(socket_path: str, cache_size: int, run_command):
+    '''
+    Run the binedit commands server on a Unix socket until it is
+    interrupted, where run_command(argc, argv, session) runs a command.
+    '''
+    if os_path.exists(socket_path):
+        unlink(socket_path)
+    # Create the socket only accessible by the user
+    old_umask = umask(0o077)
+    try:
+        server = Server(socket_path, cache_size, run_command)
+    finally:
+        umask(old_umask)
+    chmod(socket_path, 0o600)
+    # Redirect standard output, error and log handlers to the per request
+    # streams
+    sys.stdout = server.stdout
+    sys.stderr = server.stderr
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(server.stderr)
+    # Stop the server cleanly on termination signal
+    signal(SIGTERM, lambda signal_num, frame: sys.exit(0))
+    logger.info(f"Serving binedit commands on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sys.stdout = server.stdout.default_stream
+        sys.stderr = server.stderr.default_stream
+        unlink(socket_path)
+    return 0
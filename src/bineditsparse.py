@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditsparse.py
+Description:
+    Sparse binary image model for binedit library.
+    It supports the next features:
+      - Address-tagged data segments that merges overlapping and adjacent
+        writes, without storing the gaps between them.
+      - Streaming Intel HEX and Motorola S-record files load and save.
+      - Flat binary files load and save (gaps are filled on save).
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Bisection Algorithm Library
+from bisect import bisect_right
+
+# Operating System Library
+from os import path as os_path
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# File extensions of the supported sparse image formats
+IHEX_EXTENSIONS = (".hex", ".ihex", ".ihx")
+SREC_EXTENSIONS = (".srec", ".s19", ".s28", ".s37", ".mot")
+
+# Number of data bytes per record written to HEX and S-record files
+RECORD_DATA_BYTES = 32
+
+# Size of data chunks used to write gaps of flat binary files
+CHUNK_SIZE = 1024 * 1024
+
+
+###############################################################################
+# Auxiliary Functions
+###############################################################################
+
+def sparse_format(file_path: str):
+    '''
+    Get the sparse image format of a file from its extension ("ihex",
+    "srec" or None for flat binary files).
+    '''
+    extension = os_path.splitext(file_path)[1].lower()
+    if extension in IHEX_EXTENSIONS:
+        return "ihex"
+    if extension in SREC_EXTENSIONS:
+        return "srec"
+    return None
+
+
+def _record_checksum(record: bytes):
+    '''Get the checksum of an Intel HEX record.'''
+    return (-sum(record)) & 0xFF
+
+
+###############################################################################
+# SparseImage Class
+###############################################################################
+
+class SparseImage():
+    '''
+    Sparse binary image, stored as a sorted list of non overlapping and
+    non adjacent address-tagged data segments.
+    '''
+
+    def __init__(self):
+        '''SparseImage Constructor.'''
+        self.starts = []
+        self.segments = []
+        self.start_address = None
+
+
+    def __len__(self):
+        '''Number of data bytes of the image (gaps are not counted).'''
+        return sum([len(segment) for segment in self.segments])
+
+
+    @property
+    def min_address(self):
+        '''Lowest address with data of the image.'''
+        if not self.segments:
+            return 0
+        return self.starts[0]
+
+
+    @property
+    def max_address(self):
+        '''Address next to the highest address with data of the image.'''
+        if not self.segments:
+            return 0
+        return self.starts[-1] + len(self.segments[-1])
+
+
+    def write(self, address: int, data: bytes):
+        '''
+        Write data into an image address, replacing any previous data
+        and merging it with the overlapping and adjacent segments.
+        '''
+        if len(data) == 0:
+            return
+        end = address + len(data)
+        # Fast path for sequential writes
+        if self.segments and (address == self.max_address):
+            self.segments[-1].extend(data)
+            return
+        # Get the range of segments that overlaps or are adjacent
+        first = bisect_right(self.starts, address) - 1
+        if (first < 0) \
+        or (self.starts[first] + len(self.segments[first]) < address):
+            first = first + 1
+        last = bisect_right(self.starts, end) - 1
+        if first > last:
+            self.starts.insert(first, address)
+            self.segments.insert(first, bytearray(data))
+            return
+        # Merge the segments and the new data into a single segment
+        new_start = min(self.starts[first], address)
+        new_end = max(self.starts[last] + len(self.segments[last]), end)
+        if (self.starts[first] == new_start) and (first == last):
+            segment = self.segments[first]
+            segment.extend(bytes(max(new_end - new_start - len(segment), 0)))
+        else:
+            segment = bytearray(new_end - new_start)
+            for i in range(first, last + 1):
+                offset = self.starts[i] - new_start
+                segment[offset:offset + len(self.segments[i])] = \
+                    self.segments[i]
+        offset = address - new_start
+        segment[offset:offset + len(data)] = data
+        self.starts[first:last + 1] = [new_start]
+        self.segments[first:last + 1] = [segment]
+
+
+    def segments_in(self, address: int, end: int):
+        '''
+        Generator that yields the (address, data memoryview) of the image
+        data inside an address range, without the gaps.
+        '''
+        i = max(bisect_right(self.starts, address) - 1, 0)
+        while (i < len(self.segments)) and (self.starts[i] < end):
+            seg_start = self.starts[i]
+            seg_end = seg_start + len(self.segments[i])
+            if seg_end > address:
+                start = max(seg_start, address)
+                yield (start, memoryview(self.segments[i])
+                       [start - seg_start:min(seg_end, end) - seg_start])
+            i = i + 1
+
+
+    def read(self, address: int, num_bytes: int, fill_value: int = 0xFF):
+        '''Read a range of the image, with the gaps set to a fill value.'''
+        data = bytearray([fill_value]) * num_bytes
+        for start, segment in self.segments_in(address, address + num_bytes):
+            data[start - address:start - address + len(segment)] = segment
+        return data
+
+
+    def sub_image(self, address: int, num_bytes: int):
+        '''Get a new image with the data of an address range.'''
+        image = SparseImage()
+        for start, segment in self.segments_in(address, address + num_bytes):
+            image.write(start, segment)
+        return image
+
+
+    def load(self, file_path: str, base_address: int = 0):
+        '''
+        Load a file into the image, as Intel HEX, S-record or flat binary
+        (placed at the base address) depending on the file extension.
+        '''
+        file_format = sparse_format(file_path)
+        if file_format == "ihex":
+            self.load_ihex(file_path)
+        elif file_format == "srec":
+            self.load_srec(file_path)
+        else:
+            self.load_bin(file_path, base_address)
+
+
+    def save(self, file_path: str, base_address: int = 0,
+             fill_value: int = 0xFF):
+        '''
+        Save the image to a file, as Intel HEX, S-record or flat binary
+        (from the base address) depending on the file extension.
+        '''
+        file_format = sparse_format(file_path)
+        if file_format == "ihex":
+            self.save_ihex(file_path)
+        elif file_format == "srec":
+            self.save_srec(file_path)
+        else:
+            self.save_bin(file_path, base_address, fill_value)
+
+
+    def load_bin(self, file_path: str, base_address: int = 0):
+        '''Load a flat binary file into the image base address.'''
+        with open(file_path, "rb") as bin_file_reader:
+            address = base_address
+            chunk = bin_file_reader.read(CHUNK_SIZE)
+            while chunk:
+                self.write(address, chunk)
+                address = address + len(chunk)
+                chunk = bin_file_reader.read(CHUNK_SIZE)
+
+
+    def save_bin(self, file_path: str, base_address: int = 0,
+                 fill_value: int = 0xFF):
+        '''
+        Save the image as a flat binary file that starts at the base
+        address, with the gaps set to a fill value.
+        '''
+        fill_chunk = bytes([fill_value]) * CHUNK_SIZE
+        with open(file_path, "wb") as bin_file_writer:
+            address = base_address
+            for start, segment in self.segments_in(base_address,
+                                                   self.max_address):
+                gap = start - address
+                while gap > 0:
+                    bin_file_writer.write(fill_chunk[:min(gap, CHUNK_SIZE)])
+                    gap = gap - CHUNK_SIZE
+                bin_file_writer.write(segment)
+                address = start + len(segment)
+
+
+    def load_ihex(self, file_path: str):
+        '''Load an Intel HEX file into the image (streaming by lines).'''
+        with open(file_path, "r") as hex_file_reader:
+            base = 0
+            for line_num, line in enumerate(hex_file_reader, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    if line[0] != ":":
+                        raise ValueError("Missing record start code")
+                    record = bytes.fromhex(line[1:])
+                    if (len(record) < 5) or (len(record) != record[0] + 5):
+                        raise ValueError("Invalid record length")
+                    if _record_checksum(record[:-1]) != record[-1]:
+                        raise ValueError("Invalid record checksum")
+                except ValueError as error:
+                    raise ValueError(f"{file_path}:{line_num}: {error}")
+                record_type = record[3]
+                data = record[4:-1]
+                if record_type == 0x00:
+                    address = (record[1] << 8) | record[2]
+                    self.write(base + address, data)
+                elif record_type == 0x01:
+                    break
+                elif record_type == 0x02:
+                    base = int.from_bytes(data, "big") << 4
+                elif record_type == 0x04:
+                    base = int.from_bytes(data, "big") << 16
+                elif record_type in (0x03, 0x05):
+                    self.start_address = int.from_bytes(data, "big")
+
+
+    def save_ihex(self, file_path: str):
+        '''Save the image as an Intel HEX file.'''
+        with open(file_path, "w") as hex_file_writer:
+            base = 0
+            for start, segment in self.segments_in(0, self.max_address):
+                offset = 0
+                while offset < len(segment):
+                    address = start + offset
+                    if (address >> 16) != base:
+                        base = address >> 16
+                        hex_file_writer.write(self._ihex_record(
+                            0x04, 0, base.to_bytes(2, "big")))
+                    # Records can't cross a 64KB boundary
+                    num_bytes = min(RECORD_DATA_BYTES, len(segment) - offset,
+                                    0x10000 - (address & 0xFFFF))
+                    hex_file_writer.write(self._ihex_record(0x00,
+                        address & 0xFFFF, segment[offset:offset + num_bytes]))
+                    offset = offset + num_bytes
+            if self.start_address is not None:
+                hex_file_writer.write(self._ihex_record(
+                    0x05, 0, self.start_address.to_bytes(4, "big")))
+            hex_file_writer.write(self._ihex_record(0x01, 0, b""))
+
+
+    def load_srec(self, file_path: str):
+        '''Load a Motorola S-record file into the image (streaming).'''
+        address_size = {"1": 2, "2": 3, "3": 4, "7": 4, "8": 3, "9": 2}
+        with open(file_path, "r") as srec_file_reader:
+            for line_num, line in enumerate(srec_file_reader, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    if (len(line) < 4) or (line[0] != "S"):
+                        raise ValueError("Missing record start code")
+                    record = bytes.fromhex(line[2:])
+                    if (len(record) < 3) or (len(record) != record[0] + 1):
+                        raise ValueError("Invalid record length")
+                    if (~sum(record[:-1])) & 0xFF != record[-1]:
+                        raise ValueError("Invalid record checksum")
+                except ValueError as error:
+                    raise ValueError(f"{file_path}:{line_num}: {error}")
+                record_type = line[1]
+                if record_type not in address_size:
+                    continue
+                addr_len = address_size[record_type]
+                address = int.from_bytes(record[1:1 + addr_len], "big")
+                if record_type in ("1", "2", "3"):
+                    self.write(address, record[1 + addr_len:-1])
+                else:
+                    self.start_address = address
+
+
+    def save_srec(self, file_path: str):
+        '''Save the image as a Motorola S-record file.'''
+        max_address = max(self.max_address - 1, self.start_address or 0)
+        if max_address <= 0xFFFF:
+            data_type, addr_len = ("1", 2)
+        elif max_address <= 0xFFFFFF:
+            data_type, addr_len = ("2", 3)
+        else:
+            data_type, addr_len = ("3", 4)
+        with open(file_path, "w") as srec_file_writer:
+            srec_file_writer.write(self._srec_record("0", 0, 2, b""))
+            num_records = 0
+            for start, segment in self.segments_in(0, self.max_address):
+                for offset in range(0, len(segment), RECORD_DATA_BYTES):
+                    srec_file_writer.write(self._srec_record(
+                        data_type, start + offset, addr_len,
+                        segment[offset:offset + RECORD_DATA_BYTES]))
+                    num_records = num_records + 1
+            if num_records <= 0xFFFF:
+                srec_file_writer.write(
+                    self._srec_record("5", num_records, 2, b""))
+            srec_file_writer.write(self._srec_record(
+                str(10 - int(data_type)), self.start_address or 0,
+                addr_len, b""))
+
+
+    def _ihex_record(self, record_type: int, address: int, data: bytes):
+        '''Get an Intel HEX record line.'''
+        record = bytes([len(data), address >> 8, address & 0xFF,
+                        record_type]) + bytes(data)
+        record = record + bytes([_record_checksum(record)])
+        return f":{record.hex().upper()}\n"
+
+
+    def _srec_record(self, record_type: str, address: int, addr_len: int,
+                     data: bytes):
+        '''Get a Motorola S-record line.'''
+        record = address.to_bytes(addr_len, "big") + bytes(data)
+        record = bytes([len(record) + 1]) + record
+        record = record + bytes([(~sum(record)) & 0xFF])
+        return f"S{record_type}{record.hex().upper()}\n"
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    bineditstats.py
+Description:
+    Byte statistics for binedit library.
+    It supports the next features:
+      - Byte values histogram, Shannon entropy (bits per byte) and
+        fractions of 0x00 and 0xFF bytes of data blocks (i.e. to spot
+        encrypted, compressed or corrupted regions of an image).
+      - Vectorized computation of all the blocks of a data chunk with
+        NumPy when it is available, or with bytes.count() and
+        bytes.translate() shortcuts and a C counter otherwise.
+      - Entropy characters ramp to render compact entropy strips.
+Author:
+    Jose Miguel Rios Rubio
+Creation date:
+    09/04/2023
+Last modified date:
+    09/04/2023
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Collections Library
+from collections import Counter
+
+# Math Library
+from math import log2
+
+# NumPy Library (optional, faster statistics if available)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Byte values counted apart and removed before counting the other ones,
+# as they are usually the most frequent ones (erased or zero filled data)
+FILL_VALUES = b"\x00\xFF"
+
+# Maximum number of byte value counts (number of blocks * 256) computed at
+# once with NumPy, to bound the memory of small blocks statistics
+NUMPY_MAX_COUNTS = 1 << 20
+
+# Entropy characters ramp, from 0 to 8 bits per byte
+ENTROPY_RAMP = " .:-=+*#%@"
+
+
+###############################################################################
+# Statistics Functions
+###############################################################################
+
+def block_stats(data, block_size: int):
+    '''
+    Get the statistics of the consecutive blocks of a data buffer (the
+    last one can be smaller than the block size).
+    Returns the byte values histogram of all the data (list of 256
+    counts) and a list of (number of bytes, entropy, 0x00 count, 0xFF
+    count) tuples of each block.
+    '''
+    if np is not None:
+        return _block_stats_numpy(data, block_size)
+    histogram = [0] * 256
+    blocks = []
+    with memoryview(data) as data_view:
+        for offset in range(0, len(data_view), block_size):
+            block = bytes(data_view[offset:offset + block_size])
+            counts = _block_counts(block)
+            for value, count in counts.items():
+                histogram[value] = histogram[value] + count
+            blocks.append((len(block), entropy(counts.values(), len(block)),
+                           counts.get(0x00, 0), counts.get(0xFF, 0)))
+    return (histogram, blocks)
+
+
+def _block_counts(block: bytes):
+    '''
+    Get the counts of the byte values of a block (dictionary of value:
+    count). Uniform blocks are detected with a single count, and the
+    0x00 and 0xFF bytes are counted and removed (by translate) before
+    counting the remaining ones.
+    '''
+    if not block:
+        return {}
+    if block.count(block[:1]) == len(block):
+        return {block[0]: len(block)}
+    counts = Counter(block.translate(None, FILL_VALUES))
+    for value in FILL_VALUES:
+        count = block.count(value)
+        if count:
+            counts[value] = count
+    return counts
+
+
+def _block_stats_numpy(data, block_size: int):
+    '''
+    Get the statistics of the blocks of a data buffer (see block_stats())
+    with NumPy, counting the byte values of the blocks of each slice of
+    the data with a single bincount (of block index * 256 + byte value)
+    and getting all their entropies at once. The slices have a bounded
+    number of blocks, so the counts arrays of small blocks keep a bounded
+    memory size.
+    '''
+    values = np.frombuffer(data, dtype=np.uint8)
+    histogram = np.zeros(256, dtype=np.int64)
+    blocks = []
+    slice_size = max(NUMPY_MAX_COUNTS // 256, 1) * block_size
+    for offset in range(0, len(values), slice_size):
+        slice_values = values[offset:offset + slice_size]
+        num_blocks = -(-len(slice_values) // block_size)
+        sizes = np.full(num_blocks, block_size, dtype=np.intp)
+        sizes[-1] = len(slice_values) - (num_blocks - 1) * block_size
+        keys = np.repeat(np.arange(num_blocks, dtype=np.intp) * 256, sizes)
+        keys += slice_values
+        counts = np.bincount(keys, minlength=num_blocks * 256).reshape(
+            num_blocks, 256)
+        probabilities = counts / sizes[:, None]
+        logs = np.zeros(counts.shape)
+        np.log2(probabilities, out=logs, where=(counts > 0))
+        entropies = 0.0 - (probabilities * logs).sum(axis=1)
+        blocks.extend(zip(sizes.tolist(), entropies.tolist(),
+                          counts[:, 0x00].tolist(),
+                          counts[:, 0xFF].tolist()))
+        histogram += counts.sum(axis=0)
+    return (histogram.tolist(), blocks)
+
+
+def entropy(counts, num_bytes: int):
+    '''
+    Get the Shannon entropy (bits per byte) of some data from the counts
+    of its byte values.
+    '''
+    if num_bytes == 0:
+        return 0.0
+    entropy_sum = sum([count * log2(count) for count in counts if count])
+    return max(log2(num_bytes) - entropy_sum / num_bytes, 0.0)
+
+
+def entropy_char(bits: float):
+    '''Get the character of the entropy ramp of an entropy value.'''
+    index = round(bits * (len(ENTROPY_RAMP) - 1) / 8)
+    return ENTROPY_RAMP[min(max(index, 0), len(ENTROPY_RAMP) - 1)]
@@ -0,0 +1,35 @@
+'''
+Pytest configuration: make the binedit modules (in src directory)
+importable by the tests.
+'''
+
+import subprocess
+import sys
+from os import path as os_path
+
+SRC_DIR = os_path.join(os_path.dirname(os_path.dirname(
+    os_path.abspath(__file__))), "src")
+
+sys.path.insert(0, SRC_DIR)
+
+
+def read_file(file_path):
+    '''Read all the data of a file (helper shared by the tests).'''
+    with open(file_path, "rb") as reader:
+        return reader.read()
+
+
+def write_file(file_path, data):
+    '''Write data into a file (helper shared by the tests).'''
+    with open(file_path, "wb") as writer:
+        writer.write(data)
+
+
+def run_binedit(args, stdin_data=b"", check=True):
+    '''
+    Run the binedit command line in a new process (helper shared by the
+    tests). Returns the completed process, with its stdout and stderr.
+    '''
+    return subprocess.run([sys.executable, os_path.join(SRC_DIR, "binedit.py")]
+                          + args, input=stdin_data, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=check)
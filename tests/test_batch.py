@@ -0,0 +1,39 @@
+'''
+Tests of batch mode (BinEdit.batch()).
+'''
+
+from os import urandom
+
+import bineditlib
+from bineditlib import BinEdit
+
+
+def _write_files(tmp_path, num_files, size):
+    for i in range(num_files):
+        with open(tmp_path / f"fw{i}.bin", "wb") as writer:
+            writer.write(urandom(size))
+
+
+def test_show_output_is_capped(tmp_path):
+    _write_files(tmp_path, 2, 64 * 1024)
+    report = BinEdit().batch([str(tmp_path / "*.bin")], "show", workers=2)
+    assert report["files"] == 2
+    assert report["failed"] == 0
+    for result in report["results"]:
+        assert result["success"]
+        assert result["truncated"]
+        assert len(result["output"]) == bineditlib.BATCH_OUTPUT_LIMIT
+
+
+def test_show_output_streamed_to_files(tmp_path):
+    _write_files(tmp_path, 2, 64 * 1024)
+    output_template = str(tmp_path / "{stem}.txt")
+    report = BinEdit().batch([str(tmp_path / "*.bin")], "show",
+                             {"output": output_template}, workers=2)
+    assert report["failed"] == 0
+    for result in report["results"]:
+        assert result["output"] == ""
+        assert "truncated" not in result
+        with open(result["output_file"]) as reader:
+            lines = reader.read().splitlines()
+        assert len(lines) == 64 * 1024 // 16
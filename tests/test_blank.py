@@ -0,0 +1,44 @@
+'''
+Tests of blank map command (BinEdit.blank_map()).
+'''
+
+from bineditlib import BinEdit
+from conftest import write_file
+
+
+MIB = 1024 * 1024
+
+SECTOR_SIZE = 4096
+
+
+def test_erased_sectors_partial_last_sector(tmp_path):
+    # The file size is not a multiple of the sector size
+    file_size = 3 * MIB + 777
+    data = bytearray(b"\xFF" * file_size)
+    data[100:110] = bytes(10)
+    data[2 * MIB + 5] = 0x12
+    data[file_size - 300] = 0x34
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, data)
+    blank_map = BinEdit().blank_map(file_path, sector_size=SECTOR_SIZE)
+    last_sector = file_size - file_size % SECTOR_SIZE
+    assert blank_map["used"] == [(0, SECTOR_SIZE),
+                                 (2 * MIB, 2 * MIB + SECTOR_SIZE),
+                                 (last_sector, file_size)]
+    assert blank_map["erased"] == [(SECTOR_SIZE, 2 * MIB),
+                                   (2 * MIB + SECTOR_SIZE, last_sector)]
+
+
+def test_erased_sectors_of_range(tmp_path):
+    data = bytearray(b"\xFF" * 10000)
+    data[100] = 0x00
+    data[8999] = 0x00
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, data)
+    blank_map = BinEdit().blank_map(file_path, 4000, 5000,
+                                    sector_size=SECTOR_SIZE)
+    assert blank_map["used"] == [(2 * SECTOR_SIZE, 9000)]
+    assert blank_map["erased"] == [(4000, 2 * SECTOR_SIZE)]
+    blank_map = BinEdit().blank_map(file_path, 4000, 4000,
+                                    sector_size=SECTOR_SIZE)
+    assert blank_map == {"used": [], "erased": [(4000, 8000)]}
@@ -0,0 +1,91 @@
+'''
+Tests of the buffer variants of the operations and of the editing
+sessions of binary files (BinEdit.open() and BinImage).
+'''
+
+from mmap import mmap
+from os import urandom
+
+import pytest
+
+from bineditlib import BinEdit
+from conftest import read_file, write_file
+
+
+DATA = urandom(64 * 1024)
+
+
+def test_buffer_round_trip():
+    binedit = BinEdit()
+    image = bytearray(DATA)
+    boot, app = binedit.split_buffer(image, 0x8000)
+    assert (bytes(boot), bytes(app)) == (DATA[:0x8000], DATA[0x8000:])
+    # Views share the data (no copies)
+    cleared = binedit.clear_buffer(image, 0x7C00, 4)
+    assert bytes(cleared) == b"\xFF" * 4
+    assert bytes(boot[0x7C00:0x7C04]) == b"\xFF" * 4
+    boot.release()
+    app.release()
+    cleared.release()
+    # Join back into a new buffer, extended as required
+    joined = bytearray()
+    binedit.join_buffer(image, 0, 0x8000, joined, 0).release()
+    binedit.join_buffer(image, 0x8000, 0, joined, 0x8000).release()
+    assert joined == image
+    assert bytes(binedit.extract_buffer(joined, 0x7C00, 8)) == \
+        b"\xFF" * 4 + DATA[0x7C04:0x7C08]
+
+
+def test_join_buffer_padding_and_limits():
+    binedit = BinEdit()
+    target = bytearray(b"\x00" * 4)
+    assert bytes(binedit.join_buffer(b"\xAA\xBB", 0, 0, target, 6)) == \
+        b"\xAA\xBB"
+    assert target == b"\x00" * 4 + b"\xFF" * 2 + b"\xAA\xBB"
+    # Targets other than bytearray are not extended
+    assert binedit.join_buffer(b"\xAA\xBB", 0, 0,
+                               memoryview(bytearray(4)), 3) is None
+    # Read-only targets and out of range addresses are rejected
+    assert binedit.clear_buffer(bytes(4), 0, 1) is None
+    assert binedit.extract_buffer(bytes(4), 4) is None
+
+
+def test_buffer_mmap(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, DATA)
+    with open(file_path, "r+b") as bin_file, \
+         mmap(bin_file.fileno(), 0) as data:
+        BinEdit().clear_buffer(data, 0x100, 0x10, 0x00).release()
+    assert read_file(file_path) == DATA[:0x100] + bytes(0x10) + DATA[0x110:]
+
+
+def test_session_commit(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    app_path = str(tmp_path / "app.bin")
+    write_file(file_path, DATA)
+    write_file(app_path, b"\xA0" * 16)
+    with BinEdit.open(file_path) as image:
+        assert image.clear(0x10, 4)
+        assert image.patch(0x12, b"\x01\x02")
+        assert image.join(app_path, 0, 0, len(DATA) + 4)
+        assert image.read(0x10, 4) == b"\xFF\xFF\x01\x02"
+        # Nothing is written before commit
+        assert read_file(file_path) == DATA
+    assert read_file(file_path) == DATA[:0x10] + b"\xFF\xFF\x01\x02" \
+        + DATA[0x14:] + b"\xFF" * 4 + b"\xA0" * 16
+
+
+def test_session_rollback(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, DATA)
+    with pytest.raises(RuntimeError):
+        with BinEdit.open(file_path) as image:
+            image.clear(0, 0x1000)
+            image.patch(len(DATA) + 100, b"\x01")
+            raise RuntimeError("Abort session")
+    assert read_file(file_path) == DATA
+    image = BinEdit.open(file_path)
+    image.clear(0, 0x1000)
+    image.rollback()
+    assert image.commit()
+    assert read_file(file_path) == DATA
@@ -0,0 +1,41 @@
+'''
+Tests of checksum command (BinEdit.checksum()).
+'''
+
+import hashlib
+from os import urandom
+from zlib import crc32
+
+from bineditlib import BinEdit
+
+
+def test_checksums_of_range(tmp_path):
+    data = urandom(5 * 1024 * 1024 + 123)
+    file_path = str(tmp_path / "fw.bin")
+    with open(file_path, "wb") as writer:
+        writer.write(data)
+    digests = BinEdit().checksum(file_path, 100, 0, ("crc32", "sha256"),
+                                 workers=4)
+    assert digests["crc32"] == crc32(data[100:]).to_bytes(4, "big")
+    assert digests["sha256"] == hashlib.sha256(data[100:]).digest()
+
+
+def test_repeated_crc32_algorithm(tmp_path):
+    data = urandom(3 * 1024 * 1024)
+    file_path = str(tmp_path / "fw.bin")
+    with open(file_path, "wb") as writer:
+        writer.write(data)
+    digests = BinEdit().checksum(file_path, 0, 0, ("crc32", "CRC32", "crc32"),
+                                 workers=4)
+    expected = crc32(data).to_bytes(4, "big")
+    assert digests == {"crc32": expected, "CRC32": expected}
+
+
+def test_checksum_stamp(tmp_path):
+    data = urandom(4096)
+    file_path = str(tmp_path / "fw.bin")
+    with open(file_path, "wb") as writer:
+        writer.write(data + bytes(4))
+    assert BinEdit().checksum(file_path, 0, 4096, ("crc32",), 4096)
+    with open(file_path, "rb") as reader:
+        assert reader.read()[4096:] == crc32(data).to_bytes(4, "little")
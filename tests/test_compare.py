@@ -0,0 +1,72 @@
+'''
+Tests of compare command (BinEdit.compare() and --compare option).
+'''
+
+from os import urandom
+
+from bineditlib import BinEdit
+from conftest import run_binedit, write_file
+
+
+MIB = 1024 * 1024
+
+DATA = urandom(3 * MIB + 100)
+
+
+def write_files(tmp_path, data_a, data_b):
+    path_a = str(tmp_path / "a.bin")
+    path_b = str(tmp_path / "b.bin")
+    write_file(path_a, data_a)
+    write_file(path_b, data_b)
+    return (path_a, path_b)
+
+
+def test_equal_files(tmp_path):
+    path_a, path_b = write_files(tmp_path, DATA, DATA)
+    assert BinEdit().compare(path_a, path_b) == []
+    process = run_binedit(["--compare", path_a, path_b], check=False)
+    assert process.returncode == 0
+    assert process.stdout == b"Files are equal\n"
+
+
+def test_different_files(tmp_path):
+    data_b = bytearray(DATA)
+    for offset in (10, 11, MIB - 1, MIB):
+        data_b[offset] = DATA[offset] ^ 0xFF
+    path_a, path_b = write_files(tmp_path, DATA, data_b)
+    # Ranges crossing the compared blocks boundaries are merged
+    assert BinEdit().compare(path_a, path_b) == [(10, 12), (MIB - 1, MIB + 1)]
+    process = run_binedit(["--compare", path_a, path_b], check=False)
+    assert process.returncode == 1
+    assert b"0x000FFFFF-0x00100000 (2 bytes)" in process.stdout
+
+
+def test_files_of_different_lengths(tmp_path):
+    path_a, path_b = write_files(tmp_path, DATA, DATA[:MIB + 5])
+    assert BinEdit().compare(path_a, path_b) == [(MIB + 5, len(DATA))]
+    assert BinEdit().compare(path_b, path_a) == [(MIB + 5, len(DATA))]
+    path_a, path_b = write_files(tmp_path, DATA[:100], b"")
+    assert BinEdit().compare(path_a, path_b) == [(0, 100)]
+    process = run_binedit(["--compare", path_a, path_b], check=False)
+    assert process.returncode == 1
+
+
+def test_range_options(tmp_path):
+    data_b = bytearray(DATA)
+    data_b[0x100] = DATA[0x100] ^ 0xFF
+    data_b[0x2000] = DATA[0x2000] ^ 0xFF
+    path_a, path_b = write_files(tmp_path, DATA, data_b)
+    binedit = BinEdit()
+    assert binedit.compare(path_a, path_b, 0x1000, 0x1000) == []
+    assert binedit.compare(path_a, path_b, 0x1000, 0x1001) == \
+        [(0x2000, 0x2001)]
+    assert binedit.compare(path_a, path_b, 0x101) == [(0x2000, 0x2001)]
+    process = run_binedit(["--compare", path_a, path_b, "--address",
+                           "0x08001000", "--size", "0x1000",
+                           "--base_address", "0x08000000"], check=False)
+    assert process.returncode == 0
+    process = run_binedit(["--compare", path_a, path_b, "--address",
+                           "0x08000100", "--size", "1",
+                           "--base_address", "0x08000000"], check=False)
+    assert process.returncode == 1
+    assert b"0x08000100-0x08000100 (1 bytes)" in process.stdout
@@ -0,0 +1,75 @@
+'''
+Tests of compressed files support (bineditcompress and BinEdit rewrites
+of compressed files).
+'''
+
+import bz2
+import gzip
+import lzma
+from os import chmod, listdir, stat, urandom
+
+import pytest
+
+from bineditcompress import compression_format
+from bineditlib import BinEdit
+
+
+COMPRESS = {"gz": gzip.compress, "xz": lzma.compress, "bz2": bz2.compress}
+DECOMPRESS = {"gz": gzip.decompress, "xz": lzma.decompress,
+              "bz2": bz2.decompress}
+
+
+@pytest.mark.parametrize("compression", ["gz", "xz", "bz2"])
+def test_detect_compressed_files(tmp_path, compression):
+    for data in (b"", urandom(1000)):
+        file_path = str(tmp_path / "fw.bin")
+        with open(file_path, "wb") as writer:
+            writer.write(COMPRESS[compression](data))
+        assert compression_format(file_path) == compression
+
+
+@pytest.mark.parametrize("data", [b"\x1F\x8B\x00\x00" + bytes(60),
+                                  b"BZh" + bytes(61), b"BZh9" + bytes(60)],
+                         ids=["gz", "bz2", "bz2-level"])
+def test_raw_data_with_magic_bytes(tmp_path, data):
+    file_path = str(tmp_path / "fw.bin")
+    with open(file_path, "wb") as writer:
+        writer.write(data)
+    assert compression_format(file_path) is None
+    assert BinEdit().clear_data(file_path, 4, 8)
+    with open(file_path, "rb") as reader:
+        assert reader.read() == data[:4] + b"\xFF" * 8 + data[12:]
+
+
+@pytest.mark.parametrize("compression", ["gz", "xz", "bz2"])
+def test_clear_compressed_file_in_place(tmp_path, compression):
+    data = urandom(3 * 1024 * 1024)
+    file_path = str(tmp_path / f"fw.bin.{compression}")
+    with open(file_path, "wb") as writer:
+        writer.write(COMPRESS[compression](data))
+    chmod(file_path, 0o640)
+    assert BinEdit().clear_data(file_path, 100, 1000)
+    with open(file_path, "rb") as reader:
+        assert DECOMPRESS[compression](reader.read()) == \
+            data[:100] + b"\xFF" * 1000 + data[1100:]
+    assert stat(file_path).st_mode & 0o777 == 0o640
+    assert listdir(tmp_path) == [f"fw.bin.{compression}"]
+
+
+@pytest.mark.parametrize("compression", ["gz", "xz", "bz2"])
+def test_edit_compressed_file_at_start(tmp_path, compression):
+    data = urandom(100000)
+    file_path = str(tmp_path / f"fw.bin.{compression}")
+    with open(file_path, "wb") as writer:
+        writer.write(COMPRESS[compression](data))
+    binedit = BinEdit()
+    assert binedit.clear_data(file_path, 0, 4)
+    with open(file_path, "rb") as reader:
+        assert DECOMPRESS[compression](reader.read()) == \
+            b"\xFF" * 4 + data[4:]
+    boot_path = str(tmp_path / "boot.bin")
+    with open(boot_path, "wb") as writer:
+        writer.write(b"BOOT")
+    assert binedit.join_files(boot_path, 0, 0, file_path, 0)
+    with open(file_path, "rb") as reader:
+        assert DECOMPRESS[compression](reader.read()) == b"BOOT" + data[4:]
@@ -0,0 +1,73 @@
+'''
+Tests of binary delta (diff) and patch commands.
+'''
+
+from os import urandom
+from random import Random
+
+import pytest
+
+from bineditlib import BinEdit
+from conftest import read_file, write_file
+
+
+MIB = 1024 * 1024
+
+
+def edited(old):
+    '''Get a new version of some data with inserts, removals and edits.'''
+    rand = Random(1)
+    new = bytearray(old)
+    new[1000:1000] = urandom(300)
+    del new[50000:52000]
+    new[70000:70100] = b"\xFF" * 100
+    for _ in range(20):
+        offset = rand.randrange(len(new))
+        new[offset] = rand.randrange(256)
+    return bytes(new) + urandom(777)
+
+
+NEW_VERSIONS = {
+    "edited": edited,
+    "inserted_at_start": lambda old: old[:4096] + old,
+    "removed_at_start": lambda old: old[4096:],
+    "moved_ahead": lambda old: old[:MIB] + old[:2 * MIB],
+    "truncated": lambda old: old[:len(old) // 2],
+}
+
+# New versions where a copy reads data overwritten by a previous insert
+IN_PLACE_REJECTED = ("edited",)
+
+
+@pytest.mark.parametrize("version", sorted(NEW_VERSIONS))
+@pytest.mark.parametrize("in_place", [False, True])
+def test_diff_and_patch(tmp_path, version, in_place):
+    old = urandom(3 * MIB)
+    new = NEW_VERSIONS[version](old)
+    old_path = str(tmp_path / "old.bin")
+    new_path = str(tmp_path / "new.bin")
+    patch_path = str(tmp_path / "update.bdp")
+    output_path = "" if in_place else str(tmp_path / "output.bin")
+    write_file(old_path, old)
+    write_file(new_path, new)
+    binedit = BinEdit()
+    assert binedit.diff_files(old_path, new_path, patch_path)
+    if in_place and (version in IN_PLACE_REJECTED):
+        assert not binedit.patch_file(old_path, patch_path, output_path)
+        assert read_file(old_path) == old
+        return
+    assert binedit.patch_file(old_path, patch_path, output_path)
+    assert read_file(output_path or old_path) == new
+
+
+def test_diff_skips_unmatched_data(tmp_path):
+    old = urandom(2 * MIB)
+    unmatched = urandom(MIB + 13)
+    old_path = str(tmp_path / "old.bin")
+    new_path = str(tmp_path / "new.bin")
+    patch_path = str(tmp_path / "update.bdp")
+    write_file(old_path, old)
+    write_file(new_path, unmatched + old)
+    assert BinEdit().diff_files(old_path, new_path, patch_path)
+    # The old data after the unmatched data is copied
+    assert len(read_file(patch_path)) < len(unmatched) + 1024
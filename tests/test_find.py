@@ -0,0 +1,31 @@
+'''
+Tests of find command (bineditfind.find_in_data() and BinEdit.find()).
+'''
+
+from types import GeneratorType
+
+from bineditfind import Pattern, find_in_data, find_in_file
+from bineditlib import BinEdit
+
+
+DATA = b"\x00\xDE\xAD\xBE\xEFv1.2\xDE\xAD\x00\xEF\xAD\xBEv1.2.3\xDE"
+
+
+def test_matches_sorted_by_offset():
+    patterns = [Pattern("ascii:v1.2"), Pattern("DE AD ?? EF"), Pattern("AD")]
+    matches = find_in_data(DATA, patterns, 0, len(DATA), len(DATA))
+    assert isinstance(matches, GeneratorType)
+    assert list(matches) == [(1, 1), (2, 2), (5, 0), (9, 1), (10, 2),
+                             (13, 2), (15, 0)]
+
+
+def test_file_matches(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    with open(file_path, "wb") as writer:
+        writer.write(DATA)
+    patterns = ["ascii:v1.2", "DE AD ?? EF"]
+    assert find_in_file(file_path, patterns, 0, 10, len(DATA)) == \
+        [(1, 1), (5, 0), (9, 1)]
+    assert list(BinEdit().find(file_path, patterns)) == \
+        [(1, "DE AD ?? EF"), (5, "ascii:v1.2"), (9, "DE AD ?? EF"),
+         (15, "ascii:v1.2")]
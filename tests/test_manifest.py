@@ -0,0 +1,104 @@
+'''
+Tests of layout manifest mode (BinEdit.run_manifest()).
+'''
+
+from json import dump as json_dump
+
+from bineditlib import BinEdit
+
+
+def run_manifest(tmp_path, manifest):
+    manifest_path = tmp_path / "manifest.json"
+    with open(manifest_path, "w") as manifest_writer:
+        json_dump(manifest, manifest_writer)
+    return BinEdit().run_manifest(str(manifest_path))
+
+
+def test_add_source_modified_by_later_step(tmp_path):
+    file_a = str(tmp_path / "a.bin")
+    file_b = str(tmp_path / "b.bin")
+    assert run_manifest(tmp_path, {"steps": [
+        {"op": "create", "region": file_a, "size": 16, "fill": 0x11},
+        {"op": "create", "region": file_b, "size": 16, "fill": 0x00},
+        {"op": "add", "region": file_b, "input": file_a},
+        {"op": "clear", "region": file_a, "size": 16},
+    ]})
+    with open(file_a, "rb") as reader:
+        assert reader.read() == b"\xFF" * 16
+    with open(file_b, "rb") as reader:
+        assert reader.read() == b"\x11" * 16
+
+
+def test_add_source_overwritten_by_get_step(tmp_path):
+    file_a = str(tmp_path / "a.bin")
+    file_b = str(tmp_path / "b.bin")
+    file_c = str(tmp_path / "c.bin")
+    assert run_manifest(tmp_path, {"steps": [
+        {"op": "create", "region": file_a, "size": 8, "fill": 0x22},
+        {"op": "create", "region": file_c, "size": 8, "fill": 0x33},
+        {"op": "create", "region": file_b, "size": 8, "fill": 0x00},
+        {"op": "add", "region": file_b, "input": file_a},
+        {"op": "get", "region": file_c, "output": file_a},
+    ]})
+    with open(file_a, "rb") as reader:
+        assert reader.read() == b"\x33" * 8
+    with open(file_b, "rb") as reader:
+        assert reader.read() == b"\x22" * 8
+
+
+def test_regions_and_steps(tmp_path):
+    firmware = str(tmp_path / "fw.bin")
+    boot = str(tmp_path / "boot.bin")
+    app = str(tmp_path / "app.bin")
+    with open(boot, "wb") as writer:
+        writer.write(b"\xB0" * 4)
+    with open(app, "wb") as writer:
+        writer.write(b"\xA0" * 4)
+    assert run_manifest(tmp_path, {
+        "regions": {"flash": {"file": firmware,
+                              "base_address": "0x08000000"}},
+        "steps": [
+            {"op": "create", "region": "flash", "size": 16},
+            {"op": "add", "region": "flash", "input": boot,
+             "address": "0x08000000"},
+            {"op": "add", "region": "flash", "input": app,
+             "address": "0x08000008"},
+            {"op": "clear", "region": "flash", "address": "0x08000002",
+             "size": 1},
+        ]})
+    with open(firmware, "rb") as reader:
+        assert reader.read() == (b"\xB0\xB0\xFF\xB0" + b"\xFF" * 4
+                                 + b"\xA0" * 4 + b"\xFF" * 4)
+
+
+def test_daemon_session_relative_paths(tmp_path, monkeypatch):
+    import binedit
+    from bineditserve import FileLocks, ImageCache, Session
+
+    class RecordedFileLocks(FileLocks):
+        def hold(self, file_paths):
+            self.held = sorted(file_paths)
+            return super().hold(file_paths)
+
+    with open(tmp_path / "app.bin", "wb") as writer:
+        writer.write(b"\xA0" * 4)
+    with open(tmp_path / "manifest.json", "w") as manifest_writer:
+        json_dump({
+            "regions": {"flash": {"file": "fw.bin"}},
+            "steps": [
+                {"op": "create", "region": "flash", "size": 8},
+                {"op": "add", "region": "flash", "input": "app.bin",
+                 "address": 2},
+                {"op": "get", "region": "flash", "output": "copy.bin"},
+            ]}, manifest_writer)
+    monkeypatch.chdir("/")
+    file_locks = RecordedFileLocks()
+    session = Session(str(tmp_path), ImageCache(1024 * 1024), file_locks)
+    argv = ["--manifest", "manifest.json"]
+    assert binedit.main(len(argv), argv, session) == 0
+    expected = b"\xFF" * 2 + b"\xA0" * 4 + b"\xFF" * 2
+    for name in ("fw.bin", "copy.bin"):
+        with open(tmp_path / name, "rb") as reader:
+            assert reader.read() == expected
+    assert set(file_locks.held) == {str(tmp_path / name) for name in
+        ("manifest.json", "fw.bin", "app.bin", "copy.bin")}
@@ -0,0 +1,64 @@
+'''
+Tests of per operation metrics (bineditmetrics and --metrics option).
+'''
+
+from json import loads as json_loads
+from os import urandom
+
+from bineditlib import BinEdit
+from bineditmetrics import Metrics
+from conftest import read_file, run_binedit, write_file
+
+
+OPERATION_FIELDS = {"operation", "phases", "seconds", "peak_rss_kb"}
+
+IO_FIELDS = {"read_bytes", "write_bytes", "read_syscalls", "write_syscalls"}
+
+
+def test_metrics_report_to_stderr(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, urandom(4096))
+    args = ["--show", "--input", file_path, "--size", "256"]
+    output = run_binedit(args).stdout
+    process = run_binedit(args + ["--metrics", "json", "--trace_memory"])
+    # The standard output is not polluted by the report
+    assert process.stdout == output
+    report = json_loads(process.stderr)
+    operation, = report["operations"]
+    assert OPERATION_FIELDS | {"peak_traced_kb"} <= set(operation)
+    assert operation["operation"] == "show_file"
+    assert {"read", "hexdump"} <= set(operation["phases"])
+    assert len(report["top_allocations"]) > 0
+
+
+def test_metrics_report_to_file(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    metrics_path = str(tmp_path / "metrics.json")
+    write_file(file_path, urandom(4096))
+    process = run_binedit(["--get", "--input", file_path, "--output",
+                           str(tmp_path / "app.bin"), "--address", "0x100",
+                           "--metrics", "json", "--metrics_output",
+                           metrics_path])
+    assert process.stdout == b""
+    assert process.stderr == b""
+    report = json_loads(read_file(metrics_path))
+    operation, = report["operations"]
+    assert operation["operation"] == "extract_data"
+    assert OPERATION_FIELDS <= set(operation)
+    assert "top_allocations" not in report
+
+
+def test_instrument_hooks(tmp_path):
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, urandom(64 * 1024))
+    metrics = Metrics()
+    records = []
+    metrics.add_hook(records.append)
+    binedit = BinEdit()
+    binedit.instrument(metrics)
+    assert binedit.extract_data(file_path, 0, 1024, str(tmp_path / "a.bin"))
+    # Nested operations (split_regions) are not recorded apart
+    assert [record["operation"] for record in records] == ["extract_data"]
+    assert records == metrics.report()["operations"]
+    if IO_FIELDS & set(records[0]):
+        assert records[0]["write_bytes"] >= 1024
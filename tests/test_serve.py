@@ -0,0 +1,80 @@
+'''
+Tests of daemon mode (bineditserve and bineditclient).
+'''
+
+import json
+import os
+import subprocess
+import sys
+import time
+from socket import AF_UNIX, socketpair
+from stat import S_IMODE
+
+import binedit
+import bineditclient
+import bineditserve
+from bineditserve import FileLocks, ImageCache, Server, Session, socket_owned
+from conftest import SRC_DIR, write_file
+
+
+def test_file_locks_are_pruned(tmp_path):
+    file_locks = FileLocks()
+    paths = [str(tmp_path / "a.bin"), str(tmp_path / "b.bin")]
+    with file_locks.hold(paths):
+        with file_locks.hold(paths[:1]):
+            assert set(file_locks.locks) == set(paths)
+        assert file_locks.locks[paths[0]][1] == 1
+    assert file_locks.locks == {}
+
+
+def test_reject_other_users(monkeypatch):
+    server_socket, client_socket = socketpair(AF_UNIX)
+    with server_socket, client_socket:
+        assert Server.verify_request(None, server_socket, None)
+        if bineditserve.SO_PEERCRED is not None:
+            monkeypatch.setattr(bineditserve, "getuid",
+                                lambda: os.getuid() + 1)
+            assert not Server.verify_request(None, server_socket, None)
+
+
+def test_socket_owned(tmp_path):
+    file_path = str(tmp_path / "binedit.sock")
+    assert not socket_owned(file_path)
+    write_file(file_path, b"")
+    assert socket_owned(file_path)
+
+
+def test_batch_in_session_uses_spawn(tmp_path, capsys):
+    for name in ("a.bin", "b.bin"):
+        write_file(str(tmp_path / name), b"\x11" * 1000)
+    session = Session(str(tmp_path), ImageCache(1024 * 1024), FileLocks())
+    argv = ["--batch", "checksum", "--input", "*.bin", "--workers", "2"]
+    assert binedit.main(len(argv), argv, session) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["files"] == 2
+    assert report["failed"] == 0
+
+
+def test_server_socket_permissions(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "binedit.sock")
+    file_path = str(tmp_path / "fw.bin")
+    write_file(file_path, bytes(range(16)))
+    server = subprocess.Popen([sys.executable,
+                               os.path.join(SRC_DIR, "binedit.py"),
+                               "--serve", "--socket", socket_path],
+                              preexec_fn=lambda: os.umask(0),
+                              stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        assert S_IMODE(os.stat(socket_path).st_mode) == 0o600
+        monkeypatch.setenv("BINEDIT_SOCKET", socket_path)
+        monkeypatch.chdir(tmp_path)
+        response = bineditclient.request(["--show", "--input", "fw.bin"])
+        assert response["code"] == 0
+        assert response["stdout"].startswith("00000000  00 01 02 03")
+    finally:
+        server.terminate()
+        server.wait(10)
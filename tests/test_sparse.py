@@ -0,0 +1,70 @@
+'''
+Tests of the sparse image model, Intel HEX and S-record files support.
+'''
+
+from os import urandom
+
+from bineditlib import BinEdit
+from bineditsparse import SparseImage
+from conftest import read_file, write_file
+
+
+def test_hex_and_srec_round_trip(tmp_path):
+    image = SparseImage()
+    segments = {0x08000000: urandom(1000), 0x08001000: urandom(77),
+                0x0801FFF0: urandom(64)}
+    for address, data in segments.items():
+        image.write(address, data)
+    for name in ("fw.hex", "fw.srec"):
+        file_path = str(tmp_path / name)
+        image.save(file_path)
+        loaded = SparseImage()
+        loaded.load(file_path)
+        assert [(start, bytes(segment)) for start, segment
+                in loaded.segments_in(0, loaded.max_address)] \
+            == sorted(segments.items())
+
+
+def test_bin_hex_conversion(tmp_path):
+    data = urandom(5000)
+    bin_path = str(tmp_path / "fw.bin")
+    write_file(bin_path, data)
+    binedit = BinEdit()
+    for name in ("fw.hex", "fw.srec"):
+        sparse_path = str(tmp_path / name)
+        back_path = str(tmp_path / f"{name}.bin")
+        assert binedit.extract_data(bin_path, 0, 0, sparse_path, 0x08000000)
+        assert binedit.extract_data(sparse_path, 0, 0, back_path,
+                                    0x08000000)
+        assert read_file(back_path) == data
+
+
+def test_join_hex_into_flat_target_padding(tmp_path):
+    target = str(tmp_path / "target.bin")
+    write_file(target, bytes(range(16)))
+    image = SparseImage()
+    image.write(0x2, b"\xAA\xAA")
+    image.write(0x20, b"\xBB" * 4)
+    source = str(tmp_path / "source.hex")
+    image.save(source)
+    assert BinEdit().join_files(source, 0, 0, target, 0)
+    assert read_file(target) == (bytes([0, 1, 0xAA, 0xAA])
+                                 + bytes(range(4, 16)) + b"\xFF" * 16
+                                 + b"\xBB" * 4)
+
+
+def test_join_hex_check_blank_zero_erase_value(tmp_path):
+    target = str(tmp_path / "target.bin")
+    write_file(target, bytes(8) + b"\x01" * 8)
+    image = SparseImage()
+    image.write(0x04, b"\xAA\xAA")
+    source = str(tmp_path / "source.hex")
+    image.save(source)
+    binedit = BinEdit()
+    assert not binedit.join_files(source, 0, 0, target, 8, check_blank=True,
+                                  erase_value=0x00)
+    assert read_file(target) == bytes(8) + b"\x01" * 8
+    assert binedit.join_files(source, 0, 0, target, 0, check_blank=True,
+                              erase_value=0x00)
+    assert read_file(target) == bytes(4) + b"\xAA\xAA" + bytes(2) \
+        + b"\x01" * 8
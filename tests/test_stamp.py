@@ -0,0 +1,80 @@
+'''
+Tests of per-device variants stamping (BinEdit.stamp_variants()).
+'''
+
+from os import urandom
+
+import pytest
+
+import bineditlib
+from bineditlib import BinEdit
+from conftest import read_file, write_file
+
+
+BASE = urandom(256 * 1024 + 5)
+
+FIELDS = {"serial": (0x10, "u32le"), "mac": (0x20, "hex"),
+          "name": (0x30, "ascii")}
+
+ROWS = "serial,mac,name\n" \
+       "1,00:11:22:33:44:55,dev-a\n" \
+       "0x10000,66:77:88:99:AA:BB,dev-b\n" \
+       "2,not-hex,dev-c\n" \
+       "3,CC:DD:EE:FF:00:11,dev-d\n"
+
+
+def stamped(serial, mac, name):
+    data = bytearray(BASE)
+    data[0x10:0x14] = serial.to_bytes(4, "little")
+    data[0x20:0x26] = bytes.fromhex(mac.replace(":", ""))
+    data[0x30:0x30 + len(name)] = name.encode("ascii")
+    return bytes(data)
+
+
+def fail_copy(*args):
+    raise OSError("Not supported")
+
+
+@pytest.mark.parametrize("copy_path", ["reflink", "copy_file_range",
+                                       "pwrite"])
+def test_stamp_variants(tmp_path, monkeypatch, copy_path):
+    if copy_path in ("copy_file_range", "pwrite"):
+        monkeypatch.setattr(bineditlib, "ioctl", fail_copy)
+    if copy_path == "pwrite":
+        monkeypatch.setattr(bineditlib, "_copy_file_range", fail_copy)
+    base_path = str(tmp_path / "base.bin")
+    values_path = str(tmp_path / "values.csv")
+    write_file(base_path, BASE)
+    with open(values_path, "w") as writer:
+        writer.write(ROWS)
+    report = BinEdit().stamp_variants(base_path, values_path,
+        str(tmp_path / "fw_{index}_{name}.bin"), FIELDS, workers=2)
+    assert report["files"] == 4
+    assert report["failed"] == 1
+    assert [error["index"] for error in report["errors"]] == [2]
+    assert read_file(tmp_path / "fw_0_dev-a.bin") == \
+        stamped(1, "00:11:22:33:44:55", "dev-a")
+    assert read_file(tmp_path / "fw_1_dev-b.bin") == \
+        stamped(0x10000, "66:77:88:99:AA:BB", "dev-b")
+    assert read_file(tmp_path / "fw_3_dev-d.bin") == \
+        stamped(3, "CC:DD:EE:FF:00:11", "dev-d")
+    assert not (tmp_path / "fw_2_dev-c.bin").exists()
+
+
+def test_stamp_jsonl_field_out_of_base(tmp_path):
+    base_path = str(tmp_path / "base.bin")
+    values_path = str(tmp_path / "values.jsonl")
+    write_file(base_path, BASE[:0x40])
+    with open(values_path, "w") as writer:
+        writer.write('{"serial": 7}\n\n{"serial": 8}\n')
+    fields = {"serial": (0x3E, "u16be")}
+    report = BinEdit().stamp_variants(base_path, values_path,
+        str(tmp_path / "fw_{serial}.bin"), fields)
+    assert report["failed"] == 0
+    assert read_file(tmp_path / "fw_8.bin") == BASE[:0x3E] + b"\x00\x08"
+    fields = {"serial": (0x3F, "u16be")}
+    report = BinEdit().stamp_variants(base_path, values_path,
+        str(tmp_path / "bad_{serial}.bin"), fields)
+    assert report["files"] == 2
+    assert report["failed"] == 2
+    assert "out of the base file" in report["errors"][0]["error"]
@@ -0,0 +1,54 @@
+'''
+Tests of byte statistics (bineditstats.block_stats()).
+'''
+
+from os import urandom
+
+import pytest
+
+import bineditstats
+
+
+DATA = bytes(1000) + b"\xFF" * 1000 + urandom(3000) + b"\x5A" * 77
+
+
+def test_block_stats():
+    histogram, blocks = bineditstats.block_stats(DATA, 1024)
+    assert sum(histogram) == len(DATA)
+    assert histogram[0x5A] >= 77
+    assert [block[0] for block in blocks] == [1024] * 4 + [981]
+    assert blocks[0][1] == pytest.approx(0.16, abs=0.01)
+    assert blocks[0][2] == 1000
+    assert blocks[3][1] > 7.5
+
+
+def test_numpy_and_pure_python_match(monkeypatch):
+    if bineditstats.np is None:
+        pytest.skip("NumPy not available")
+    for block_size in (1, 1000, 1024, len(DATA), 2 * len(DATA)):
+        histogram, blocks = bineditstats.block_stats(DATA, block_size)
+        with monkeypatch.context() as patch:
+            patch.setattr(bineditstats, "np", None)
+            expected_histogram, expected_blocks = \
+                bineditstats.block_stats(DATA, block_size)
+        assert histogram == expected_histogram
+        assert len(blocks) == len(expected_blocks)
+        for block, expected_block in zip(blocks, expected_blocks):
+            assert block[0] == expected_block[0]
+            assert block[1] == pytest.approx(expected_block[1])
+            assert block[2:] == expected_block[2:]
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 16])
+def test_small_blocks_stats(monkeypatch, block_size):
+    # Small slices, so the NumPy statistics of several slices are joined
+    monkeypatch.setattr(bineditstats, "NUMPY_MAX_COUNTS", 256 * 100)
+    histogram, blocks = bineditstats.block_stats(DATA, block_size)
+    assert histogram == [DATA.count(value) for value in range(256)]
+    assert len(blocks) == -(-len(DATA) // block_size)
+    for index, block in enumerate(blocks):
+        data = DATA[index * block_size:(index + 1) * block_size]
+        assert block[0] == len(data)
+        assert block[2:] == (data.count(0x00), data.count(0xFF))
+    if block_size == 1:
+        assert set([block[1] for block in blocks]) == set([0.0])
@@ -0,0 +1,88 @@
+'''
+Tests of streaming inputs and outputs: "-" standard input and output,
+named pipes and compressed files (clear, get and split commands).
+'''
+
+import gzip
+from os import mkfifo, urandom
+from threading import Thread
+
+import pytest
+
+from bineditlib import BinEdit
+from conftest import read_file, run_binedit, write_file
+
+
+DATA = urandom(3 * 1024 * 1024 + 123)
+
+
+def cleared(data, address, num_bytes):
+    return data[:address] + b"\xFF" * num_bytes + data[address + num_bytes:]
+
+
+@pytest.mark.parametrize("address", [0, 0x100])
+def test_clear_stdin_to_stdout(address):
+    output = run_binedit(["--clear", "--input", "-", "--address",
+                          str(address), "--size", "0x200000"], DATA).stdout
+    assert output == cleared(DATA, address, 0x200000)
+
+
+def test_clear_stdin_to_file(tmp_path):
+    output = str(tmp_path / "out.bin")
+    run_binedit(["--clear", "--input", "-", "--output", output, "--address",
+                 "0", "--size", "4"], DATA)
+    assert read_file(output) == cleared(DATA, 0, 4)
+    # A failed rewrite doesn't leave a partial output file
+    run_binedit(["--clear", "--input", "-", "--output", output, "--address",
+                 str(len(DATA) + 1), "--size", "4"], DATA)
+    assert not (tmp_path / "out.bin").exists()
+
+
+def test_get_and_split_stdin(tmp_path):
+    output = str(tmp_path / "app.bin")
+    run_binedit(["--get", "--input", "-", "--output", output, "--address",
+                 "0x1000", "--size", "0x1000"], DATA)
+    assert read_file(output) == DATA[0x1000:0x2000]
+    output_1 = str(tmp_path / "boot.bin")
+    output_2 = str(tmp_path / "app.bin")
+    run_binedit(["--split", "--input", "-", "--address", "0x8000",
+                 "--output", output_1, "--output2", output_2], DATA)
+    assert read_file(output_1) == DATA[:0x8000]
+    assert read_file(output_2) == DATA[0x8000:]
+
+
+def test_clear_named_pipe(tmp_path):
+    fifo_path = str(tmp_path / "fw.fifo")
+    output = str(tmp_path / "out.bin")
+    mkfifo(fifo_path)
+    writer_thread = Thread(target=write_file, args=(fifo_path, DATA))
+    writer_thread.start()
+    assert BinEdit().clear_data(fifo_path, 10, 20, output)
+    writer_thread.join()
+    assert read_file(output) == cleared(DATA, 10, 20)
+
+
+def test_compressed_get_and_split(tmp_path):
+    input_path = str(tmp_path / "fw.bin.gz")
+    write_file(input_path, gzip.compress(DATA))
+    binedit = BinEdit()
+    output = str(tmp_path / "app.bin.gz")
+    assert binedit.extract_data(input_path, 0x8000, 0x100, output)
+    assert gzip.decompress(read_file(output)) == DATA[0x8000:0x8100]
+    output_1 = str(tmp_path / "boot.bin")
+    output_2 = str(tmp_path / "app.bin")
+    assert binedit.split_files(input_path, 0x8000, output_1, output_2)
+    assert read_file(output_1) == DATA[:0x8000]
+    assert read_file(output_2) == DATA[0x8000:]
+
+
+@pytest.mark.parametrize("name", ["fw.bin", "fw.bin.gz"])
+def test_clear_output_same_as_input(tmp_path, name):
+    file_path = str(tmp_path / name)
+    compress = gzip.compress if name.endswith(".gz") else bytes
+    decompress = gzip.decompress if name.endswith(".gz") else bytes
+    write_file(file_path, compress(DATA))
+    same_path = str(tmp_path / "." / name)
+    run_binedit(["--clear", "--input", file_path, "--output", same_path,
+                 "--address", "4", "--size", "8"])
+    assert decompress(read_file(file_path)) == cleared(DATA, 4, 8)